@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+@dataclass
+class PoolStats:
+    # Checkouts served by an idle connection
+    hits: int = 0
+    # Checkouts that had to open a new connection
+    misses: int = 0
+    # Checkouts that found the pool full and had to wait, and for how long
+    waits: int = 0
+    wait_time: float = 0.0
+    timeouts: int = 0
+    # Connections thrown away as broken or past max_lifetime
+    discarded: int = 0
+    size: int = 0
+    idle: int = 0
+
+
+class ConnectionPool:
+    """
+    A small thread-safe pool of DB-API connections, local to one process.
+
+    `connect` opens a new connection. `check` tells whether an idle one can
+    be handed out again (e.g. it isn't closed or stuck in a failed
+    transaction). At most `max_size` connections exist at once; a checkout
+    beyond that waits up to `timeout` seconds for one to be returned.
+    """
+
+    def __init__(self, connect, check, max_size=10, timeout=5.0, max_lifetime=3600.0):
+        self.connect = connect
+        self.check = check
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self._idle = deque()
+        self._opened_at = {}
+        self._size = 0
+        self._stats = PoolStats()
+        self._cond = threading.Condition()
+
+    def _expired(self, connection):
+        return time.monotonic() - self._opened_at[id(connection)] > self.max_lifetime
+
+    def _discard(self, connection):
+        self._opened_at.pop(id(connection), None)
+        self._size -= 1
+        self._stats.discarded += 1
+        self._cond.notify()
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _waited(self, started):
+        if started is not None:
+            self._stats.wait_time += time.monotonic() - started
+
+    def getconn(self):
+        started = None
+        with self._cond:
+            while True:
+                while self._idle:
+                    connection = self._idle.pop()
+                    if self._expired(connection) or not self.check(connection):
+                        self._discard(connection)
+                        continue
+                    self._stats.hits += 1
+                    self._waited(started)
+                    return connection
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._stats.misses += 1
+                    self._waited(started)
+                    break
+                if started is None:
+                    started = time.monotonic()
+                    self._stats.waits += 1
+                remaining = started + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    self._waited(started)
+                    self._stats.timeouts += 1
+                    raise PoolTimeout(f"no connection available after {self.timeout}s ({self.max_size} in use)")
+                self._cond.wait(remaining)
+
+        # Connect outside the lock, it's the slow part
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._opened_at[id(connection)] = time.monotonic()
+        return connection
+
+    def putconn(self, connection, discard=False):
+        with self._cond:
+            if id(connection) not in self._opened_at:
+                connection.close()
+                return
+            if discard or self._expired(connection) or not self.check(connection):
+                self._discard(connection)
+                return
+            self._idle.append(connection)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            while self._idle:
+                self._discard(self._idle.pop())
+
+    def stats(self):
+        with self._cond:
+            self._stats.size = self._size
+            self._stats.idle = len(self._idle)
+            return asdict(self._stats)
@@ -0,0 +1,110 @@
+import threading
+
+from django.db.backends.postgresql import base
+
+from DjTodos.db.pool import ConnectionPool, PoolTimeout
+
+try:
+    from psycopg import pq
+
+    def _is_reusable(connection):
+        return not connection.closed and connection.info.transaction_status in (
+            pq.TransactionStatus.IDLE,
+            pq.TransactionStatus.INTRANS,
+        )
+
+    def _reset(connection):
+        if connection.info.transaction_status != pq.TransactionStatus.IDLE:
+            connection.rollback()
+
+except ImportError:
+    from psycopg2 import extensions
+
+    def _is_reusable(connection):
+        return not connection.closed and connection.get_transaction_status() in (
+            extensions.TRANSACTION_STATUS_IDLE,
+            extensions.TRANSACTION_STATUS_INTRANS,
+        )
+
+    def _reset(connection):
+        if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            connection.rollback()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool_stats():
+    """Hit/miss/wait counters of every pool in this process, by alias."""
+    return {alias: pool.stats() for alias, pool in list(_pools.items())}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    The postgresql backend, with connections taken from and returned to a
+    per-process ConnectionPool instead of being opened and closed.
+
+    Settings, in DATABASES[alias]["POOL"]: MAX_SIZE, TIMEOUT (seconds to
+    wait for a free connection) and MAX_LIFETIME (seconds before a connection
+    is replaced). Use with CONN_MAX_AGE = 0, so each request hands its
+    connection back when it finishes.
+    """
+
+    def get_pool(self):
+        pool = _pools.get(self.alias)
+        if pool is None:
+            with _pools_lock:
+                pool = _pools.get(self.alias)
+                if pool is None:
+                    options = self.settings_dict.get("POOL", {})
+                    conn_params = self.get_connection_params()
+                    pool = _pools[self.alias] = ConnectionPool(
+                        connect=lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+                        check=_is_reusable,
+                        max_size=options.get("MAX_SIZE", 10),
+                        timeout=options.get("TIMEOUT", 5.0),
+                        max_lifetime=options.get("MAX_LIFETIME", 3600.0),
+                    )
+        return pool
+
+    def _ping(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+        except self.Database.Error:
+            return False
+        return True
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        # An idle connection may have been dropped by the server (restart,
+        # idle timeout); with CONN_HEALTH_CHECKS, check it before using it.
+        for _ in range(pool.max_size + 1):
+            try:
+                connection = pool.getconn()
+            except PoolTimeout as e:
+                raise self.Database.OperationalError(str(e)) from e
+            if not self.settings_dict["CONN_HEALTH_CHECKS"] or self._ping(connection):
+                break
+            pool.putconn(connection, discard=True)
+        # get_new_connection normally sets this as a side effect
+        self.isolation_level = base.IsolationLevel(
+            self.settings_dict["OPTIONS"].get("isolation_level", base.IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            # Django keeps a connection closed inside an atomic block around
+            # until the block exits, so it can't be shared meanwhile.
+            discard = self.in_atomic_block
+            if not discard:
+                try:
+                    _reset(self.connection)
+                except self.Database.Error:
+                    discard = True
+            self.get_pool().putconn(self.connection, discard=discard)
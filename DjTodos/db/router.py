@@ -0,0 +1,107 @@
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+
+_pinned = ContextVar("db_pinned_to_primary", default=False)
+
+PIN_COOKIE = "db_pin"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+
+def pin_to_primary():
+    """Sends every read made by the current request/thread to the primary."""
+    _pinned.set(True)
+
+
+def is_pinned():
+    return _pinned.get()
+
+
+class PrimaryReplicaRouter:
+    """
+    Reads of models in DB_REPLICA_APPS go to a random DB_REPLICAS alias,
+    everything else to the primary ("default").
+
+    Once the current context has written, or when ReplicaPinningMiddleware
+    saw a recent write by the same client, reads stay on the primary so a
+    user always sees their own changes despite replication lag.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not settings.DB_REPLICAS or model._meta.app_label not in settings.DB_REPLICA_APPS:
+            return None
+        if _pinned.get():
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DB_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        if settings.DB_REPLICAS:
+            pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas mirror the primary, so objects from any of them may relate
+        databases = {DEFAULT_DB_ALIAS, *settings.DB_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DB_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """
+    Pins a request to the primary when it writes (an unsafe method), or when
+    the client wrote less than DB_REPLICA_PIN_SECONDS ago. The window is
+    tracked with a cookie, so it holds whichever worker serves the next
+    request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DB_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        writes = request.method not in SAFE_METHODS
+        token = _pinned.set(writes or PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        return self.remember_write(writes, response)
+
+    async def __acall__(self, request):
+        writes = request.method not in SAFE_METHODS
+        token = _pinned.set(writes or PIN_COOKIE in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        return self.remember_write(writes, response)
+
+    def remember_write(self, writes, response):
+        if writes and response.status_code < 400:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.DB_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
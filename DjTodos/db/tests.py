@@ -0,0 +1,174 @@
+import threading
+import time
+from contextvars import copy_context
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from apps.todos.models import Todo
+from DjTodos.db import router
+from DjTodos.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTest(SimpleTestCase):
+
+    def make_pool(self, **kwargs):
+        self.opened = []
+
+        def connect():
+            connection = FakeConnection()
+            self.opened.append(connection)
+            return connection
+
+        return ConnectionPool(connect, check=lambda c: not c.closed and not c.broken, **kwargs)
+
+    def test_reuses_returned_connections(self):
+        pool = self.make_pool()
+        first = pool.getconn()
+        pool.putconn(first)
+        self.assertIs(pool.getconn(), first)
+        stats = pool.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual((stats["size"], stats["idle"]), (1, 0))
+
+    def test_discards_broken_connections(self):
+        pool = self.make_pool()
+        connection = pool.getconn()
+        pool.putconn(connection)
+        connection.broken = True
+        # Checked on the way out too, not only when returned
+        replacement = pool.getconn()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        pool.putconn(replacement, discard=True)
+        self.assertEqual(pool.stats()["discarded"], 2)
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_replaces_connections_past_max_lifetime(self):
+        pool = self.make_pool(max_lifetime=60)
+        connection = pool.getconn()
+        pool.putconn(connection)
+        with mock.patch("DjTodos.db.pool.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertIsNot(pool.getconn(), connection)
+        self.assertTrue(connection.closed)
+
+    def test_waits_for_a_free_connection(self):
+        pool = self.make_pool(max_size=1, timeout=5)
+        connection = pool.getconn()
+        threading.Timer(0.05, pool.putconn, [connection]).start()
+        self.assertIs(pool.getconn(), connection)
+        stats = pool.stats()
+        self.assertEqual(stats["waits"], 1)
+        self.assertGreater(stats["wait_time"], 0)
+        self.assertEqual(len(self.opened), 1)
+
+    def test_timeout_when_exhausted(self):
+        pool = self.make_pool(max_size=1, timeout=0.01)
+        pool.getconn()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+        self.assertEqual(pool.stats()["timeouts"], 1)
+
+    def test_failed_connect_frees_its_slot(self):
+        pool = ConnectionPool(mock.Mock(side_effect=OSError), check=lambda c: True, max_size=1, timeout=0.01)
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                pool.getconn()
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_concurrent_checkouts_never_exceed_max_size(self):
+        pool = self.make_pool(max_size=3, timeout=5)
+        in_use, peak, lock = set(), [0], threading.Lock()
+
+        def worker():
+            for _ in range(20):
+                connection = pool.getconn()
+                with lock:
+                    in_use.add(connection)
+                    peak[0] = max(peak[0], len(in_use))
+                time.sleep(0.001)
+                with lock:
+                    in_use.discard(connection)
+                pool.putconn(connection)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(peak[0], 3)
+        self.assertLessEqual(len(self.opened), 3)
+        stats = pool.stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 160)
+
+
+@override_settings(DB_REPLICAS=["replica_0", "replica_1"], DB_REPLICA_PIN_SECONDS=10)
+class PrimaryReplicaRouterTest(SimpleTestCase):
+
+    def setUp(self):
+        self.router = router.PrimaryReplicaRouter()
+
+    def run_in_context(self, func, *args):
+        # Pinning is per context (request/thread), keep it out of other tests
+        return copy_context().run(func, *args)
+
+    def test_todo_reads_go_to_replicas(self):
+        self.assertIn(self.run_in_context(self.router.db_for_read, Todo), ["replica_0", "replica_1"])
+        # Sessions, users etc. stay on the primary
+        self.assertIsNone(self.run_in_context(self.router.db_for_read, User))
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        def write_then_read():
+            self.assertEqual(self.router.db_for_write(Todo), "default")
+            return self.router.db_for_read(Todo)
+
+        self.assertEqual(self.run_in_context(write_then_read), "default")
+
+    def test_no_replicas(self):
+        with self.settings(DB_REPLICAS=[]):
+            self.assertIsNone(self.run_in_context(self.router.db_for_read, Todo))
+
+    def test_never_migrates_replicas(self):
+        self.assertFalse(self.router.allow_migrate("replica_0", "todos"))
+        self.assertIsNone(self.router.allow_migrate("default", "todos"))
+
+    def test_middleware_pins_after_writes(self):
+        seen = []
+
+        def view(request):
+            seen.append(router.is_pinned())
+            return HttpResponse()
+
+        middleware = router.ReplicaPinningMiddleware(view)
+        factory = RequestFactory()
+
+        self.run_in_context(middleware, factory.get("/api/v1/todos/"))
+        response = self.run_in_context(middleware, factory.post("/api/v1/todos/"))
+        cookie = response.cookies[router.PIN_COOKIE]
+        self.assertEqual(cookie["max-age"], 10)
+
+        # The next request of the same client, whichever worker gets it
+        request = factory.get("/api/v1/todos/")
+        request.COOKIES[router.PIN_COOKIE] = cookie.value
+        self.run_in_context(middleware, request)
+
+        self.assertEqual(seen, [False, True, True])
+        # Reset once the request is over
+        self.assertFalse(router.is_pinned())
+
+    def test_failed_writes_do_not_pin(self):
+        middleware = router.ReplicaPinningMiddleware(lambda request: HttpResponse(status=422))
+        response = self.run_in_context(middleware, RequestFactory().post("/api/v1/todos/"))
+        self.assertNotIn(router.PIN_COOKIE, response.cookies)
@@ -0,0 +1,18 @@
+def accepted_encodings(request):
+    """
+    The content codings the client accepts, lowercased, from Accept-Encoding;
+    codings it lists with q=0 (or an invalid q) are left out.
+    """
+    header = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        name, _, value = params.partition("=")
+        if name.strip() == "q":
+            try:
+                if float(value) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
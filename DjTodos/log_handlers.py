@@ -0,0 +1,133 @@
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Standard LogRecord attributes; anything else on a record came from `extra=`
+RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class QueuedFileHandler(QueueHandler):
+    """
+    Logs to `filename` from a background thread: emit() only puts the record
+    on a bounded queue, and a QueueListener does the formatting and the file
+    I/O. Records are dropped (and counted) rather than blocking the request
+    when the writer falls behind.
+
+    The listener is started lazily in the process that logs, so it also works
+    when the settings are loaded before uWSGI forks its workers (threads
+    don't survive a fork). uWSGI needs `enable-threads` for this.
+    """
+
+    def __init__(self, filename, maxsize=10000, encoding="utf-8"):
+        super().__init__(queue.Queue(maxsize))
+        self.target = logging.FileHandler(filename, encoding=encoding, delay=True)
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._unreported = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def setFormatter(self, fmt):
+        # Formatting is the listener's job, see prepare()
+        self.target.setFormatter(fmt)
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._listener is not None:
+                # Forked: the parent's thread is gone, and so are its records
+                self.queue = queue.Queue(self.maxsize)
+            self._listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record):
+        # Only resolve what can't cross threads safely (args may be mutated
+        # after the call, exc_info holds a traceback); leave the formatting
+        # to the listener's handler.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self._unreported:
+                self.queue.put_nowait(
+                    logging.makeLogRecord({
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"log queue full, dropped {self._unreported} records",
+                    })
+                )
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
+
+    def close(self):
+        # Called by logging.shutdown() at exit: flushes what's still queued
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._pid = None
+        self.target.close()
+        super().close()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields are included as keys."""
+
+    def format(self, record):
+        payload = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.thread,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRS and key not in payload:
+                payload[key] = value
+        return json.dumps(payload, default=str)
+
+
+class SQLSampleFilter(logging.Filter):
+    """
+    Keeps a `rate` fraction of django.db.backends records, plus every query
+    that took at least `slow_ms`.
+    """
+
+    def __init__(self, rate=1.0, slow_ms=None):
+        super().__init__()
+        self.rate = rate
+        self.slow_ms = slow_ms
+
+    def filter(self, record):
+        duration = getattr(record, "duration", None)
+        if self.slow_ms is not None and duration is not None and duration * 1000 >= self.slow_ms:
+            return True
+        return self.rate >= 1 or random.random() < self.rate
@@ -22,6 +22,22 @@ DJANGO_FILE_PATH = os.path.abspath(os.path.join(LOG_PATH, DJANGO_FILE))
 if not os.path.exists(LOG_PATH):
     os.makedirs(LOG_PATH)
 
+# LOG_MODE=production: records are written by a background thread (see
+# DjTodos/log_handlers.py), levels default to INFO/WARNING, and formatters
+# skip the pathname/funcName lookups. Development keeps the synchronous,
+# detailed DEBUG logs below.
+LOG_MODE = env("LOG_MODE", default="development")
+PRODUCTION = LOG_MODE == "production"
+
+LOG_LEVEL = env("LOG_LEVEL", default="INFO" if PRODUCTION else "DEBUG")
+# django.db.backends logs every query at DEBUG (only when settings.DEBUG is on)
+LOG_SQL_LEVEL = env("LOG_SQL_LEVEL", default="WARNING" if PRODUCTION else "DEBUG")
+# Fraction of SQL records kept; queries slower than LOG_SQL_SLOW_MS always are
+LOG_SQL_SAMPLE_RATE = env.float("LOG_SQL_SAMPLE_RATE", default=1.0)
+LOG_SQL_SLOW_MS = env.float("LOG_SQL_SLOW_MS", default=None)
+# "json" for one JSON object per line, for log shippers
+LOG_FORMAT = env("LOG_FORMAT", default="detailed")
+
 FILE_LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -34,6 +50,19 @@ FILE_LOGGING = {
             "format": "{levelname} {message}",
             "style": "{",
         },
+        "standard": {
+            "format": "[%(asctime)s] %(levelname)s [%(name)s] %(message)s",
+        },
+        "json": {
+            "()": "DjTodos.log_handlers.JsonFormatter",
+        },
+    },
+    "filters": {
+        "sql_sample": {
+            "()": "DjTodos.log_handlers.SQLSampleFilter",
+            "rate": LOG_SQL_SAMPLE_RATE,
+            "slow_ms": LOG_SQL_SLOW_MS,
+        },
     },
     "handlers": {
         "file": {
@@ -47,6 +76,7 @@ FILE_LOGGING = {
             "class": "logging.FileHandler",
             "formatter": "detailed",
             "filename": DJANGO_FILE_PATH,
+            "filters": ["sql_sample"],
         },
         "console": {
             "class": "logging.StreamHandler",
@@ -56,13 +86,28 @@ FILE_LOGGING = {
     "loggers": {
         "": {
             "handlers": ["file"],
-            "level": "DEBUG",
+            "level": LOG_LEVEL,
             "propagate": True,
         },
         "django.db.backends": {
             "handlers": ["django_file"],
-            "level": "DEBUG",
+            "level": LOG_SQL_LEVEL,
             "propagate": False,
         },
     },
 }
+
+if LOG_FORMAT == "json":
+    for handler in ("file", "django_file"):
+        FILE_LOGGING["handlers"][handler]["formatter"] = "json"
+elif PRODUCTION:
+    for handler in ("file", "django_file"):
+        FILE_LOGGING["handlers"][handler]["formatter"] = "standard"
+
+if PRODUCTION:
+    for handler in ("file", "django_file"):
+        # A factory rather than "class": from Python 3.12 dictConfig treats
+        # QueueHandler subclasses given as "class" specially and expects a
+        # "queue"/"handlers" config this handler doesn't take.
+        del FILE_LOGGING["handlers"][handler]["class"]
+        FILE_LOGGING["handlers"][handler]["()"] = "DjTodos.log_handlers.QueuedFileHandler"
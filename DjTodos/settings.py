@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 from pathlib import Path
 import os
 import environ
+from django.core.exceptions import ImproperlyConfigured
 
 from DjTodos.loggers import FILE_LOGGING
 
@@ -29,7 +30,9 @@ env.read_env(os.path.join(BASE_DIR, ".env"))
 SECRET_KEY = "django-insecure-o_0ymkuf71@mk=&8&qrxjlpjt7%t-&lvf62^v+z(r597_f#*3i"
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# DEBUG=false also for anything measured (benchmarks/): debug mode keeps every
+# query in connection.queries and logs SQL.
+DEBUG = env.bool("DEBUG", default=True)
 
 ALLOWED_HOSTS = ["*"]
 
@@ -56,6 +59,7 @@ LOCAL_APPS = [
     "apps.vite_integration",
     "apps.todos",
     "apps.users",
+    "apps.perf",
 ]
 
 SITE_ID = 1
@@ -66,6 +70,8 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 DJANGO_MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Answers /static/ before sessions and auth run; a no-op unless SERVE_STATIC
+    "apps.vite_integration.static.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -76,7 +82,16 @@ DJANGO_MIDDLEWARE = [
 
 
 
-CUSTOM_MIDDLEWARE = []
+CUSTOM_MIDDLEWARE = [
+    # Profiles slow requests into PROFILE_DIR; a no-op unless enabled below
+    "apps.perf.middleware.ProfilingMiddleware",
+    # Server-Timing header and per-route metrics, see apps/perf/middleware.py
+    "apps.perf.middleware.ServerTimingMiddleware",
+    # Checks each request against QUERY_BUDGETS; a no-op with QUERY_BUDGET_MODE=off
+    "apps.perf.middleware.QueryBudgetMiddleware",
+    # After auth so every view runs inside it; a no-op without DB_REPLICAS
+    "DjTodos.db.router.ReplicaPinningMiddleware",
+]
 
 MIDDLEWARE = DJANGO_MIDDLEWARE + CUSTOM_MIDDLEWARE 
 
@@ -85,7 +100,8 @@ ROOT_URLCONF = "DjTodos.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # Django's backend, with render time reported by ServerTimingMiddleware
+        "BACKEND": "apps.perf.templates.DjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -114,9 +130,172 @@ DATABASES = {
         "NAME": env("DB_NAME", default=os.path.join(BASE_DIR, "db.sqlite3")),
         "HOST": env("DB_HOST", default="localhost"),
         "PORT": env("DB_PORT", default="5432"),
+        # Keep connections open across requests instead of paying for a new
+        # connection (TCP, TLS, auth) on every one, and check them before reuse.
+        "CONN_MAX_AGE": env.int("DB_CONN_MAX_AGE", default=60),
+        "CONN_HEALTH_CHECKS": env.bool("DB_CONN_HEALTH_CHECKS", default=True),
+        # Required behind pgbouncer in transaction pooling mode, where a
+        # cursor can't outlive the transaction that declared it.
+        "DISABLE_SERVER_SIDE_CURSORS": env.bool("DB_DISABLE_SERVER_SIDE_CURSORS", default=False),
     },
 }
 
+# Read replicas: DB_REPLICA_URLS=postgres://...,postgres://... adds aliases
+# replica_0, replica_1, ... Reads of the apps below go to a replica unless the
+# client wrote within DB_REPLICA_PIN_SECONDS (see DjTodos/db/router.py).
+DB_REPLICAS = []
+for index, url in enumerate(env.list("DB_REPLICA_URLS", default=[])):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **environ.Env.db_url_config(url),
+        "CONN_MAX_AGE": DATABASES["default"]["CONN_MAX_AGE"],
+        "CONN_HEALTH_CHECKS": DATABASES["default"]["CONN_HEALTH_CHECKS"],
+        "DISABLE_SERVER_SIDE_CURSORS": DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DB_REPLICAS.append(alias)
+
+DB_REPLICA_APPS = {"todos"}
+# Should comfortably exceed the replication lag
+DB_REPLICA_PIN_SECONDS = env.int("DB_REPLICA_PIN_SECONDS", default=10)
+
+DATABASE_ROUTERS = ["DjTodos.db.router.PrimaryReplicaRouter"]
+
+# DB_POOL=true swaps in DjTodos.db.postgresql_pool: connections go back to a
+# pool shared by the worker's threads at the end of each request, so
+# CONN_MAX_AGE is ignored. Hit/miss/wait counters: postgresql_pool.base.pool_stats()
+if env.bool("DB_POOL", default=False):
+    if DATABASES["default"]["ENGINE"] != "django.db.backends.postgresql":
+        raise ImproperlyConfigured("DB_POOL requires DB_ENGINE=django.db.backends.postgresql")
+    DATABASES["default"].update(
+        ENGINE="DjTodos.db.postgresql_pool",
+        CONN_MAX_AGE=0,
+        POOL={
+            "MAX_SIZE": env.int("DB_POOL_MAX_SIZE", default=10),
+            "TIMEOUT": env.float("DB_POOL_TIMEOUT", default=5.0),
+            "MAX_LIFETIME": env.float("DB_POOL_MAX_LIFETIME", default=3600.0),
+        },
+    )
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# locmem is per process: with several uWSGI workers point CACHE_URL at a shared
+# backend (e.g. redis://...), otherwise a write in one worker leaves the
+# others serving cached todos until TODOS_CACHE_TIMEOUT expires.
+
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
+# Serve /api/v1/todos/ with the native async handlers (apps/todos/async_api.py).
+# Only worth it under ASGI (DjTodos.asgi); under WSGI each call would need an
+# event loop of its own. Under ASGI also set DB_CONN_MAX_AGE=0: Django doesn't
+# support persistent connections there, see
+# https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+TODOS_ASYNC_API = env.bool("TODOS_ASYNC_API", default=False)
+
+TODOS_CACHE_ALIAS = "default"
+TODOS_CACHE_TIMEOUT = env.int("TODOS_CACHE_TIMEOUT", default=300)
+
+
+# Query budgets (apps/perf): the most queries, and database milliseconds, one
+# request to an endpoint may take, session and user lookups included.
+# Endpoints are named as in apps.perf.budgets.endpoint_name: django-ninja
+# handlers by their function name, other views by their URL name. The test
+# runner sets QUERY_BUDGET_MODE=raise so a test touching an endpoint fails
+# when it makes too many queries (db_ms isn't checked there); "log" warns for
+# a sampled fraction of requests, "off" skips the instrumentation.
+QUERY_BUDGET_MODE = env("QUERY_BUDGET_MODE", default="log")
+QUERY_BUDGET_SAMPLE_RATE = env.float("QUERY_BUDGET_SAMPLE_RATE", default=1.0 if DEBUG else 0.01)
+QUERY_BUDGETS = {
+    # apps/todos/api.py; the session and user lookups are the first two
+    "list_todos": {"queries": 3, "db_ms": 100},
+    "get_todo": {"queries": 3, "db_ms": 50},
+    "create_todo": {"queries": 3, "db_ms": 50},
+    "update_todo": {"queries": 4, "db_ms": 50},
+    "patch_todo": {"queries": 3, "db_ms": 50},
+    "delete_todo": {"queries": 4, "db_ms": 50},
+    # Constant whatever the number of items: a query per item is an N+1.
+    # import/export query per batch and stream, so they have no budget.
+    "bulk_create_todos": {"queries": 5, "db_ms": 250},
+    "bulk_update_todos": {"queries": 6, "db_ms": 250},
+    "bulk_delete_todos": {"queries": 7, "db_ms": 250},
+    # apps/users/views.py
+    # +1 when the password is rehashed with the preferred hasher
+    "auth-login": {"queries": 7, "db_ms": 50},
+    "auth-signup": {"queries": 5, "db_ms": 50},
+    "auth-logout": {"queries": 4, "db_ms": 50},
+}
+
+TEST_RUNNER = "apps.perf.testing.QueryBudgetTestRunner"
+
+# Per-request timings (apps/perf): SERVER_TIMING sends total/db/serialize/
+# template durations as a Server-Timing header, which exposes them to every
+# client; REQUEST_METRICS keeps per-route histograms in each process, served
+# in the Prometheus text format at /metrics to METRICS_ALLOWED_IPS.
+SERVER_TIMING = env.bool("SERVER_TIMING", default=DEBUG)
+REQUEST_METRICS = env.bool("REQUEST_METRICS", default=True)
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", default=["127.0.0.1", "::1"])
+
+# Profiling (apps/perf/profiling.py): PROFILE_REQUESTS=sample (stack sampler,
+# fine in production) or cprofile (slow) profiles every request and keeps the
+# ones taking PROFILE_SLOW_MS or more. With PROFILE_TOKEN set, a request with
+# the header "X-Profile: <token>" is always profiled. Summarize the files with
+# `manage.py summarize_profiles`.
+PROFILE_REQUESTS = env("PROFILE_REQUESTS", default="off")
+if PROFILE_REQUESTS not in ("off", "sample", "cprofile"):
+    raise ImproperlyConfigured("PROFILE_REQUESTS must be off, sample or cprofile")
+PROFILE_SLOW_MS = env.float("PROFILE_SLOW_MS", default=500)
+PROFILE_SAMPLE_INTERVAL_MS = env.float("PROFILE_SAMPLE_INTERVAL_MS", default=5)
+PROFILE_TOKEN = env("PROFILE_TOKEN", default="")
+PROFILE_DIR = env("PROFILE_DIR", default=os.path.join(BASE_DIR, "logs", "profiles"))
+# Oldest profiles are deleted beyond this many
+PROFILE_MAX_FILES = env.int("PROFILE_MAX_FILES", default=500)
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "apps.perf.renderers.TimedDRFJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
+
+# Password hashing (apps/users/hashers.py). PASSWORD_HASHER picks the hasher
+# new and changed passwords use: "pbkdf2" (Django's default), or the
+# memory-hard "scrypt" or "argon2" (needs argon2-cffi). At OWASP's minimum
+# parameters, which are also the floors, scrypt costs about twice PBKDF2's CPU
+# per login and 128 MiB per hash in flight, so size PASSWORD_HASH_WORKERS for
+# it. The others stay listed so existing hashes still verify; Django rehashes
+# them with the preferred hasher on each user's next login.
+PASSWORD_HASHER = env("PASSWORD_HASHER", default="pbkdf2")
+# Cost parameters; values below the floors in apps/users/hashers.py are raised
+PASSWORD_PBKDF2_ITERATIONS = env.int("PASSWORD_PBKDF2_ITERATIONS", default=600000)
+PASSWORD_SCRYPT_WORK_FACTOR = env.int("PASSWORD_SCRYPT_WORK_FACTOR", default=2**17)
+PASSWORD_ARGON2_TIME_COST = env.int("PASSWORD_ARGON2_TIME_COST", default=2)
+PASSWORD_ARGON2_MEMORY_COST = env.int("PASSWORD_ARGON2_MEMORY_COST", default=19456)  # KiB
+PASSWORD_ARGON2_PARALLELISM = env.int("PASSWORD_ARGON2_PARALLELISM", default=1)
+
+PASSWORD_HASHER_CHOICES = {
+    "pbkdf2": "apps.users.hashers.PBKDF2PasswordHasher",
+    "scrypt": "apps.users.hashers.ScryptPasswordHasher",
+    "argon2": "apps.users.hashers.Argon2PasswordHasher",
+}
+if PASSWORD_HASHER not in PASSWORD_HASHER_CHOICES:
+    raise ImproperlyConfigured(f"PASSWORD_HASHER must be one of {', '.join(PASSWORD_HASHER_CHOICES)}")
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CHOICES[PASSWORD_HASHER],
+    *(path for name, path in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+]
+
+# Hash on a pool of at most PASSWORD_HASH_WORKERS threads per process (0: in
+# the request thread), so a login storm can't take every core. Once
+# PASSWORD_HASH_MAX_PENDING more are waiting, login and signup answer 503.
+PASSWORD_HASH_WORKERS = env.int("PASSWORD_HASH_WORKERS", default=0)
+PASSWORD_HASH_MAX_PENDING = env.int("PASSWORD_HASH_MAX_PENDING", default=32)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -173,6 +352,15 @@ INTERNAL_IPS = [
 FRONTEND_DIR = os.path.join(BASE_DIR, "frontend/src")
 FRONTEND_BUILD_DIR = os.path.join(BASE_DIR, "frontend/dist")
 
+# Serve the /r/ shell from memory, rendered once per frontend build, instead of
+# rendering react_base.html per request. Must be off to use the Vite dev server.
+VITE_PRERENDER_SHELL = env.bool("VITE_PRERENDER_SHELL", default=not DEBUG)
+
+# Send the bundle's modulepreload/stylesheet list as an HTTP Link header with
+# the pre-rendered shell, and optionally prefetch lazily imported chunks.
+VITE_LINK_HEADER = env.bool("VITE_LINK_HEADER", default=True)
+VITE_PREFETCH_DYNAMIC_IMPORTS = env.bool("VITE_PREFETCH_DYNAMIC_IMPORTS", default=False)
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.1/howto/static-files/
 
@@ -188,6 +376,19 @@ STATICFILES_DIRS = [
 
 STATIC_ROOT = "staticfiles/"
 
+# collectstatic writes .gz (and .br when the brotli package is installed)
+# next to every text asset, see apps/vite_integration/storage.py
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "apps.vite_integration.storage.CompressedStaticFilesStorage"},
+}
+
+# Serve STATIC_ROOT from Django itself (precompressed, immutable caching for
+# Vite's hashed files, range requests). Turn off when a proxy or CDN serves it.
+SERVE_STATIC = env.bool("SERVE_STATIC", default=not DEBUG)
+# Cache lifetime for static files whose name carries no content hash
+STATIC_MAX_AGE = env.int("STATIC_MAX_AGE", default=60)
+
 LOGIN_URL = "/r/login/"
 
 ENABLE_DEBUG_TOOLBAR = env.bool("ENABLE_DEBUG_TOOLBAR", default=False)
@@ -0,0 +1,103 @@
+import json
+import logging
+import logging.config
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase
+
+from DjTodos.log_handlers import JsonFormatter, QueuedFileHandler, SQLSampleFilter
+
+
+class QueuedFileHandlerTest(SimpleTestCase):
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.log_dir, "test.log")
+        self.logger = logging.getLogger("DjTodos.tests.queued")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+
+    def tearDown(self):
+        self.logger.handlers.clear()
+        shutil.rmtree(self.log_dir)
+
+    def make_handler(self, **kwargs):
+        handler = QueuedFileHandler(self.path, **kwargs)
+        handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        self.logger.addHandler(handler)
+        return handler
+
+    def read(self):
+        with open(self.path) as f:
+            return f.read().splitlines()
+
+    def test_writes_from_a_background_thread(self):
+        handler = self.make_handler()
+        args = ["before"]
+        self.logger.info("value %s", args)
+        # Formatted with the arguments as they were at the call
+        args[0] = "after"
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            self.logger.exception("failed")
+        handler.close()
+
+        lines = self.read()
+        self.assertEqual(lines[0], "INFO value ['before']")
+        self.assertEqual(lines[1], "ERROR failed")
+        self.assertIn("ValueError: boom", lines[-1])
+
+    def test_dict_config(self):
+        # The way loggers.py configures it in production
+        logging.config.dictConfig({
+            "version": 1,
+            "disable_existing_loggers": False,
+            "handlers": {
+                "queued": {"()": "DjTodos.log_handlers.QueuedFileHandler", "filename": self.path, "level": "DEBUG"},
+            },
+            "loggers": {"DjTodos.tests.queued": {"handlers": ["queued"], "propagate": False}},
+        })
+        handler = self.logger.handlers[0]
+        self.assertIsInstance(handler, QueuedFileHandler)
+        self.logger.warning("configured")
+        handler.close()
+        self.assertEqual(self.read(), ["configured"])
+
+    def test_drops_instead_of_blocking(self):
+        handler = self.make_handler(maxsize=1)
+        handler._ensure_listener()
+        handler._listener.stop()  # nothing drains the queue
+        handler._pid = None
+        for i in range(5):
+            handler.enqueue(logging.makeLogRecord({"msg": str(i)}))
+        self.assertEqual(handler.dropped, 4)
+        handler.close()
+
+
+class JsonFormatterTest(SimpleTestCase):
+
+    def test_format(self):
+        record = logging.makeLogRecord(
+            {"name": "apps.todos", "levelname": "INFO", "msg": "imported %d", "args": (3,), "user_id": 7}
+        )
+        payload = json.loads(JsonFormatter().format(record))
+        self.assertEqual(payload["message"], "imported 3")
+        self.assertEqual(payload["logger"], "apps.todos")
+        self.assertEqual(payload["level"], "INFO")
+        self.assertEqual(payload["user_id"], 7)
+        self.assertNotIn("args", payload)
+
+
+class SQLSampleFilterTest(SimpleTestCase):
+
+    def test_sampling(self):
+        fast = logging.makeLogRecord({"duration": 0.001})
+        slow = logging.makeLogRecord({"duration": 0.5})
+        self.assertTrue(SQLSampleFilter().filter(fast))
+        never = SQLSampleFilter(rate=0, slow_ms=100)
+        self.assertFalse(never.filter(fast))
+        # Slow queries are always kept
+        self.assertTrue(never.filter(slow))
@@ -2,15 +2,19 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from ninja import NinjaAPI
+from apps.perf.renderers import TimedJSONRenderer
+from apps.perf.views import metrics
 from apps.todos.api import api as todos_api
+from apps.todos.async_api import api as async_todos_api
 
-api = NinjaAPI(csrf=True)
-api.add_router("/todos", todos_api)
+api = NinjaAPI(csrf=True, renderer=TimedJSONRenderer())
+api.add_router("/todos", async_todos_api if settings.TODOS_ASYNC_API else todos_api)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/auth/', include("apps.users.urls")),
     path("api/v1/", api.urls),
+    path("metrics", metrics, name="metrics"),
 ]
 
 if settings.ENABLE_DEBUG_TOOLBAR:
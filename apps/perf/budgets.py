@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised, in QUERY_BUDGET_MODE="raise", by a request that went over its budget."""
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    # Either limit may be None, meaning unlimited
+    queries: Optional[int] = None
+    db_ms: Optional[float] = None
+
+    def violations(self, stats, check_time=True):
+        """
+        Returns a description of every limit `stats` (a QueryStats) exceeds.
+        `check_time=False` checks the query count only.
+        """
+        violations = []
+        if self.queries is not None and stats.count > self.queries:
+            violations.append(f"{stats.count} queries > {self.queries}")
+        if check_time and self.db_ms is not None and stats.time_ms > self.db_ms:
+            violations.append(f"{stats.time_ms:.1f} ms in the database > {self.db_ms} ms")
+        return violations
+
+
+def endpoint_name(request):
+    """
+    The name budgets are declared under. For django-ninja that is the
+    handler's function name, e.g. "list_todos" or "create_todo": ninja
+    serves every method of a path from one URL pattern, named after the
+    first handler. Other views go by their URL name, or dotted view path.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    # ninja.operation.PathView, whose bound method is the URL pattern's view
+    operations = getattr(getattr(match.func, "__self__", None), "operations", None)
+    if operations:
+        for operation in operations:
+            if request.method in operation.methods:
+                return operation.view_func.__name__
+    return match.url_name or match.view_name
+
+
+def get_budget(name):
+    """The QueryBudget declared in settings.QUERY_BUDGETS for an endpoint, or None."""
+    if name is None:
+        return None
+    budget = settings.QUERY_BUDGETS.get(name)
+    if budget is None or isinstance(budget, QueryBudget):
+        return budget
+    return QueryBudget(**budget)
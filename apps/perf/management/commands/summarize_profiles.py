@@ -0,0 +1,93 @@
+import os
+import pstats
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.perf.profiling import COLLAPSED_SUFFIX, PROFILE_NAME, PSTATS_SUFFIX, frame_label, profile_files
+
+
+class Command(BaseCommand):
+    help = "Print the hottest functions across the request profiles in PROFILE_DIR"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", help="Directory of .pstats/.collapsed files (defaults to PROFILE_DIR)")
+        parser.add_argument("--endpoint", help="Only profiles of this endpoint, e.g. list_todos")
+        parser.add_argument("--limit", type=int, default=20, help="Functions listed per section")
+        parser.add_argument(
+            "--sort",
+            choices=["self", "cumulative"],
+            default="self",
+            help="Rank by time spent in the function itself, or including what it calls",
+        )
+
+    def handle(self, *args, **kwargs):
+        directory = kwargs["dir"] or settings.PROFILE_DIR
+        files = profile_files(directory)
+        if kwargs["endpoint"]:
+            files = [
+                path for path in files
+                if (match := PROFILE_NAME.match(os.path.basename(path))) and match["endpoint"] == kwargs["endpoint"]
+            ]
+        if not files:
+            raise CommandError(f"No profiles found in {directory}")
+
+        self.limit = kwargs["limit"]
+        self.cumulative = kwargs["sort"] == "cumulative"
+        self.summarize_endpoints(files)
+        pstats_files = [path for path in files if path.endswith(PSTATS_SUFFIX)]
+        if pstats_files:
+            self.summarize_pstats(pstats_files)
+        collapsed_files = [path for path in files if path.endswith(COLLAPSED_SUFFIX)]
+        if collapsed_files:
+            self.summarize_collapsed(collapsed_files)
+
+    def summarize_endpoints(self, files):
+        durations = {}
+        for path in files:
+            match = PROFILE_NAME.match(os.path.basename(path))
+            if match:
+                durations.setdefault(match["endpoint"], []).append(int(match["ms"]))
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{len(files)} profiles"))
+        self.stdout.write(f"{'profiles':>8} {'max ms':>8} {'median ms':>10}  endpoint")
+        for endpoint, values in sorted(durations.items(), key=lambda item: -len(item[1])):
+            values.sort()
+            self.stdout.write(f"{len(values):>8} {values[-1]:>8} {values[len(values) // 2]:>10}  {endpoint}")
+
+    def summarize_pstats(self, files):
+        stats = pstats.Stats(*files)
+        rows = []
+        for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+            rows.append((cumulative if self.cumulative else own, calls, own, cumulative, frame_label(filename, function)))
+        rows.sort(reverse=True)
+        total = stats.total_tt or 1
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\ncProfile, {len(files)} profiles, {stats.total_tt:.3f}s"))
+        self.stdout.write(f"{'calls':>10} {'self s':>9} {'cum s':>9} {'self %':>7}  function")
+        for _, calls, own, cumulative, label in rows[: self.limit]:
+            self.stdout.write(f"{calls:>10} {own:>9.3f} {cumulative:>9.3f} {own / total:>7.1%}  {label}")
+
+    def summarize_collapsed(self, files):
+        own, cumulative, total = Counter(), Counter(), 0
+        for path in files:
+            with open(path) as f:
+                for line in f:
+                    stack, _, count = line.rstrip("\n").rpartition(" ")
+                    if not stack:
+                        continue
+                    count = int(count)
+                    frames = stack.split(";")
+                    total += count
+                    own[frames[-1]] += count
+                    # Once per stack, however deep the recursion
+                    for frame in set(frames):
+                        cumulative[frame] += count
+        ranked = (cumulative if self.cumulative else own).most_common(self.limit)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nStack samples, {len(files)} profiles, {total} samples"))
+        self.stdout.write(f"{'self':>8} {'self %':>7} {'cum %':>7}  function")
+        for frame, _ in ranked:
+            self.stdout.write(
+                f"{own[frame]:>8} {own[frame] / total:>7.1%} {cumulative[frame] / total:>7.1%}  {frame}"
+            )
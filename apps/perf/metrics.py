@@ -0,0 +1,99 @@
+import threading
+from bisect import bisect_left
+
+# Prometheus' default buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense. Not thread-safe by itself."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # One count per bucket plus +Inf, not yet cumulative
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(upper bound, count) pairs, ending with ("+Inf", total)."""
+        total = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            yield bound, total
+
+
+class RequestMetrics:
+    """
+    Per-route request metrics of this process: duration and database time
+    histograms, query and response counters. Routes are endpoint names, so
+    the number of series stays bounded whatever the URLs requested.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.duration = {}
+        self.db_time = {}
+        self.queries = {}
+        self.responses = {}
+
+    def observe(self, route, method, status, duration, db_time, queries):
+        key = (route, method)
+        with self._lock:
+            if key not in self.duration:
+                self.duration[key] = Histogram(self.buckets)
+                self.db_time[key] = Histogram(self.buckets)
+                self.queries[key] = 0
+            self.duration[key].observe(duration)
+            self.db_time[key].observe(db_time)
+            self.queries[key] += queries
+            status_key = (route, method, str(status))
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.duration.clear()
+            self.db_time.clear()
+            self.queries.clear()
+            self.responses.clear()
+
+    def render(self):
+        """The metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, help_text, histograms in (
+                ("http_request_duration_seconds", "Time to produce the response.", self.duration),
+                ("http_request_db_seconds", "Time spent in database queries.", self.db_time),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (route, method), histogram in sorted(histograms.items()):
+                    labels = f'route="{_escape(route)}",method="{method}"'
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+            lines.append("# HELP http_request_queries_total Database queries made.")
+            lines.append("# TYPE http_request_queries_total counter")
+            for (route, method), count in sorted(self.queries.items()):
+                lines.append(f'http_request_queries_total{{route="{_escape(route)}",method="{method}"}} {count}')
+            lines.append("# HELP http_responses_total Responses sent, by status code.")
+            lines.append("# TYPE http_responses_total counter")
+            for (route, method, status), count in sorted(self.responses.items()):
+                lines.append(
+                    f'http_responses_total{{route="{_escape(route)}",method="{method}",status="{status}"}} {count}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_metrics = RequestMetrics()
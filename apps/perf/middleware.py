@@ -0,0 +1,220 @@
+import hmac
+import logging
+import os
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from apps.perf.budgets import QueryBudgetExceeded, endpoint_name, get_budget
+from apps.perf.metrics import request_metrics
+from apps.perf.profiling import RequestProfile
+from apps.perf.queries import record_queries
+from apps.perf.timing import collect_timings
+
+logger = logging.getLogger(__name__)
+
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts the queries and database time of each request and checks them
+    against the endpoint's budget in settings.QUERY_BUDGETS.
+
+    QUERY_BUDGET_MODE="log" logs a warning for a QUERY_BUDGET_SAMPLE_RATE
+    fraction of requests (the others aren't instrumented at all), "raise"
+    checks every request and raises QueryBudgetExceeded, which is what tests
+    want, and "off" removes the middleware. "raise" only checks query counts:
+    database time depends on the machine running the tests, so db_ms is left
+    to "log".
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.QUERY_BUDGET_MODE == "off":
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.raise_on_violation = settings.QUERY_BUDGET_MODE == "raise"
+        self.sample_rate = 1.0 if self.raise_on_violation else settings.QUERY_BUDGET_SAMPLE_RATE
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        with record_queries() as stats:
+            response = self.get_response(request)
+        self.check(request, response, stats)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        with record_queries() as stats:
+            response = await self.get_response(request)
+        self.check(request, response, stats)
+        return response
+
+    def sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def check(self, request, response, stats):
+        # A server error's count includes whatever rendering the error page
+        # queried, and raising here would hide the real exception from tests
+        if response.status_code >= 500:
+            return
+        name = endpoint_name(request)
+        budget = get_budget(name)
+        if budget is None:
+            return
+        violations = budget.violations(stats, check_time=not self.raise_on_violation)
+        if not violations:
+            return
+        message = f"{request.method} {request.path} ({name}) over its query budget: {', '.join(violations)}"
+        if self.raise_on_violation:
+            raise QueryBudgetExceeded(message)
+        logger.warning(
+            message,
+            extra={"endpoint": name, "queries": stats.count, "db_ms": round(stats.time_ms, 2)},
+        )
+
+
+class ServerTimingMiddleware:
+    """
+    Measures each request: total time, database time and query count, and
+    the "serialize" and "template" phases timed by apps.perf.renderers and
+    apps.perf.templates. With SERVER_TIMING they are sent as a Server-Timing
+    header (shown in the browser's network panel), and with REQUEST_METRICS
+    added to this process' per-route histograms, served by the metrics view.
+
+    Streaming responses are measured until the view returns, not until the
+    last chunk is sent.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING and not settings.REQUEST_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.header = settings.SERVER_TIMING
+        self.metrics = settings.REQUEST_METRICS
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with record_queries() as queries, collect_timings() as timings:
+            response = self.get_response(request)
+        return self.finish(request, response, time.perf_counter() - started, queries, timings)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with record_queries() as queries, collect_timings() as timings:
+            response = await self.get_response(request)
+        return self.finish(request, response, time.perf_counter() - started, queries, timings)
+
+    def finish(self, request, response, duration, queries, timings):
+        if self.metrics:
+            request_metrics.observe(
+                endpoint_name(request) or "unmatched",
+                request.method if request.method in METHODS else "other",
+                response.status_code,
+                duration,
+                queries.time,
+                queries.count,
+            )
+        if self.header:
+            entries = [f"total;dur={duration * 1000:.1f}", f'db;dur={queries.time_ms:.1f};desc="{queries.count} queries"']
+            entries.extend(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.phases.items())
+            response["Server-Timing"] = ", ".join(entries)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests and keeps the profiles of slow ones in PROFILE_DIR,
+    for `manage.py summarize_profiles`.
+
+    PROFILE_REQUESTS="sample" runs the statistical stack sampler during
+    every request, cheap enough for production, and "cprofile" the
+    deterministic profiler, which slows requests down considerably. Either
+    way a profile is saved only when the request took PROFILE_SLOW_MS or
+    more. Independently, a request carrying an `X-Profile: <PROFILE_TOKEN>`
+    header is always profiled and saved, and the response names the file in
+    X-Profile-File. cProfile profiles one request at a time; requests that
+    overlap it are sampled instead.
+
+    Under ASGI the sampler records the event loop thread, which may be
+    running other requests at the time, and cProfile isn't used.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.PROFILE_REQUESTS == "off" and not settings.PROFILE_TOKEN:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.mode = None if settings.PROFILE_REQUESTS == "off" else settings.PROFILE_REQUESTS
+        self.token = settings.PROFILE_TOKEN
+        self.slow = settings.PROFILE_SLOW_MS / 1000
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        requested = self.requested(request)
+        mode = "cprofile" if requested else self.mode
+        if mode is None:
+            return self.get_response(request)
+        profile = RequestProfile(mode)
+        started = time.perf_counter()
+        try:
+            profile.start()
+            response = self.get_response(request)
+        finally:
+            profile.stop()
+        return self.finish(request, response, profile, time.perf_counter() - started, requested)
+
+    async def __acall__(self, request):
+        requested = self.requested(request)
+        if not requested and self.mode is None:
+            return await self.get_response(request)
+        profile = RequestProfile("sample")
+        started = time.perf_counter()
+        try:
+            profile.start()
+            response = await self.get_response(request)
+        finally:
+            profile.stop()
+        return self.finish(request, response, profile, time.perf_counter() - started, requested)
+
+    def requested(self, request):
+        header = request.headers.get("X-Profile")
+        return bool(self.token and header and hmac.compare_digest(header, self.token))
+
+    def finish(self, request, response, profile, duration, requested):
+        if not requested and duration < self.slow:
+            return response
+        name = endpoint_name(request) or "unmatched"
+        path = profile.save(name, duration)
+        if path is not None:
+            logger.info(
+                "Profiled %s %s (%s) in %.0f ms: %s", request.method, request.path, name, duration * 1000, path
+            )
+            if requested:
+                response["X-Profile-File"] = os.path.basename(path)
+        return response
@@ -0,0 +1,189 @@
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from django.conf import settings
+
+PSTATS_SUFFIX = ".pstats"
+COLLAPSED_SUFFIX = ".collapsed"
+# <time>-<endpoint>-<duration>ms.<suffix>, see RequestProfile.save
+PROFILE_NAME = re.compile(r"^(?P<stamp>[^-]+)-(?P<endpoint>.+)-(?P<ms>\d+)ms\.\w+$")
+
+
+@lru_cache(maxsize=8192)
+def frame_label(filename, function):
+    """"path/to/module.py:function", with paths relative to the project or site-packages."""
+    for root in (str(settings.BASE_DIR), *sorted((p for p in sys.path if p), key=len, reverse=True)):
+        if filename.startswith(root + os.sep):
+            filename = filename[len(root) + 1:]
+            break
+    return f"{filename}:{function}"
+
+
+def collapse(frame):
+    """The stack of `frame`, outermost first, as one "a;b;c" line of a collapsed-stack file."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame.f_code.co_filename, frame.f_code.co_name))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """
+    A statistical profiler: one daemon thread that, every `interval`
+    seconds, records the current stack of each thread registered with
+    start(). Its cost is paid by that thread, not by the requests, and it
+    sleeps while nothing is registered.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._threads = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+
+    def start(self, thread_id):
+        samples = Counter()
+        with self._cond:
+            # A thread started before a fork doesn't exist in the child
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+            self._threads[thread_id] = samples
+            self._cond.notify()
+        return samples
+
+    def stop(self, thread_id):
+        with self._cond:
+            return self._threads.pop(thread_id, None)
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self._cond:
+                while not self._threads:
+                    self._cond.wait()
+                targets = list(self._threads.items())
+            frames = sys._current_frames()
+            for thread_id, samples in targets:
+                frame = frames.get(thread_id)
+                if frame is not None and thread_id != me:
+                    samples[collapse(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler():
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+    return _sampler
+
+
+# From Python 3.12 only one cProfile.Profile can be enabled at a time per
+# process; enable() raises ValueError while another one is.
+_cprofile_lock = threading.Lock()
+
+
+class RequestProfile:
+    """
+    Profiles the calling thread between start() and stop(): with cProfile
+    ("cprofile"), or with the shared StackSampler ("sample").
+
+    Only one request at a time is profiled with cProfile; one that starts
+    while another holds it falls back to the sampler, and `mode` says which
+    was used.
+    """
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.result = None
+        self.started = False
+
+    def start(self):
+        if self.mode == "cprofile":
+            self.mode = "sample"
+            if _cprofile_lock.acquire(blocking=False):
+                profiler = cProfile.Profile()
+                try:
+                    profiler.enable()
+                except ValueError:
+                    # Some other tool is profiling
+                    _cprofile_lock.release()
+                else:
+                    self.mode = "cprofile"
+                    self.profiler = profiler
+        if self.mode == "sample":
+            self.thread_id = threading.get_ident()
+            get_sampler().start(self.thread_id)
+        self.started = True
+
+    def stop(self):
+        if not self.started:
+            return
+        self.started = False
+        if self.mode == "cprofile":
+            try:
+                self.profiler.disable()
+            finally:
+                _cprofile_lock.release()
+            self.result = self.profiler
+        else:
+            self.result = get_sampler().stop(self.thread_id)
+
+    def save(self, name, duration):
+        """
+        Writes the profile to PROFILE_DIR as <time>-<name>-<ms>ms.pstats or
+        .collapsed, and returns the path (None when nothing was sampled).
+        """
+        if self.mode != "cprofile" and not self.result:
+            return None
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%f")
+        safe_name = re.sub(r"[^\w.-]+", "_", name)
+        path = os.path.join(settings.PROFILE_DIR, f"{stamp}-{safe_name}-{duration * 1000:.0f}ms")
+        if self.mode == "cprofile":
+            path += PSTATS_SUFFIX
+            self.result.dump_stats(path)
+        else:
+            path += COLLAPSED_SUFFIX
+            with open(path, "w") as f:
+                for stack, count in self.result.most_common():
+                    f.write(f"{stack} {count}\n")
+        prune(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
+        return path
+
+
+def profile_files(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith((PSTATS_SUFFIX, COLLAPSED_SUFFIX))
+    )
+
+
+def prune(directory, max_files):
+    """Deletes the oldest profiles beyond `max_files`; names sort by time."""
+    files = profile_files(directory)
+    for path in files[: max(0, len(files) - max_files)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
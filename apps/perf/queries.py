@@ -0,0 +1,49 @@
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+
+from django.db import connections
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    # Seconds spent in the database driver, summed over the queries
+    time: float = 0.0
+
+    @property
+    def time_ms(self):
+        return self.time * 1000
+
+
+class QueryRecorder:
+    """
+    A connection execute wrapper (see Django's "Database instrumentation")
+    that counts queries and their time. Unlike CaptureQueriesContext it
+    keeps no SQL and doesn't force the debug cursor, so it is cheap enough to
+    run on every request.
+    """
+
+    def __init__(self):
+        self.stats = QueryStats()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.stats.count += 1
+            self.stats.time += time.perf_counter() - started
+
+
+@contextmanager
+def record_queries():
+    """
+    Records the queries made on every database alias by the current thread
+    (or async context) until the block exits, and yields their QueryStats.
+    """
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder.stats
@@ -0,0 +1,20 @@
+from ninja.renderers import JSONRenderer
+from rest_framework import renderers
+
+from apps.perf.timing import timed
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """django-ninja's JSON renderer, counted in the request's "serialize" timing."""
+
+    def render(self, request, data, *, response_status):
+        with timed("serialize"):
+            return super().render(request, data, response_status=response_status)
+
+
+class TimedDRFJSONRenderer(renderers.JSONRenderer):
+    """Django REST framework's JSON renderer, counted in the request's "serialize" timing."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed("serialize"):
+            return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,19 @@
+from django.template.backends import django
+
+from apps.perf.timing import timed
+
+
+class TimedTemplate(django.Template):
+    def render(self, context=None, request=None):
+        with timed("template"):
+            return super().render(context, request)
+
+
+class DjangoTemplates(django.DjangoTemplates):
+    """The Django template backend, with rendering counted in the request's "template" timing."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,19 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """
+    Runs the tests with QUERY_BUDGET_MODE="raise": any request a test makes
+    through the test client fails with QueryBudgetExceeded when it goes over
+    its endpoint's budget in settings.QUERY_BUDGETS.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._budget_override = override_settings(QUERY_BUDGET_MODE="raise")
+        self._budget_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._budget_override.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,405 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.urls import resolve
+from apps.perf.budgets import QueryBudget, QueryBudgetExceeded, endpoint_name, get_budget
+from apps.perf.metrics import Histogram, RequestMetrics, request_metrics
+from apps.perf.middleware import ProfilingMiddleware
+from apps.perf.profiling import RequestProfile, StackSampler, profile_files, prune
+from apps.perf.queries import QueryStats, record_queries
+from apps.perf.timing import collect_timings, timed
+from apps.todos.models import Todo
+
+
+class RecordQueriesTest(TestCase):
+
+    def test_counts_queries_and_time(self):
+        with record_queries() as stats:
+            list(User.objects.all())
+            User.objects.filter(username='nobody').exists()
+        self.assertEqual(stats.count, 2)
+        self.assertGreater(stats.time, 0)
+
+        # The wrapper is removed on exit
+        list(User.objects.all())
+        self.assertEqual(stats.count, 2)
+
+
+class QueryBudgetTest(TestCase):
+
+    def test_violations(self):
+        stats = QueryStats(count=3, time=0.020)
+        self.assertEqual(QueryBudget(queries=3, db_ms=50).violations(stats), [])
+        self.assertEqual(QueryBudget(queries=2).violations(stats), ['3 queries > 2'])
+        self.assertEqual(QueryBudget(db_ms=10).violations(stats), ['20.0 ms in the database > 10 ms'])
+        self.assertEqual(QueryBudget().violations(stats), [])
+        self.assertEqual(QueryBudget(queries=2, db_ms=10).violations(stats, check_time=False), ['3 queries > 2'])
+
+    def test_get_budget_from_settings(self):
+        with self.settings(QUERY_BUDGETS={'list_todos': {'queries': 2}}):
+            self.assertEqual(get_budget('list_todos'), QueryBudget(queries=2))
+            self.assertIsNone(get_budget('get_todo'))
+            self.assertIsNone(get_budget(None))
+
+    def test_endpoint_name_is_the_ninja_handler(self):
+        # One URL pattern serves both, named after the list handler
+        factory = RequestFactory()
+        for method, name in (('get', 'list_todos'), ('post', 'create_todo')):
+            request = getattr(factory, method)('/api/v1/todos/')
+            request.resolver_match = resolve('/api/v1/todos/')
+            self.assertEqual(endpoint_name(request), name)
+        for method, name in (('get', 'get_todo'), ('put', 'update_todo'), ('patch', 'patch_todo'), ('delete', 'delete_todo')):
+            request = getattr(factory, method)('/api/v1/todos/1')
+            request.resolver_match = resolve('/api/v1/todos/1')
+            self.assertEqual(endpoint_name(request), name)
+
+        request = factory.post('/api/v1/auth/login/')
+        request.resolver_match = resolve('/api/v1/auth/login/')
+        self.assertEqual(endpoint_name(request), 'auth-login')
+
+
+class QueryBudgetMiddlewareTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='user1', password='password1')
+        self.todo = Todo.objects.create(user=self.user, title='Todo', description='desc')
+        self.client.login(username='user1', password='password1')
+
+    def test_tests_run_in_raise_mode(self):
+        # Set by apps.perf.testing.QueryBudgetTestRunner
+        self.assertEqual(settings.QUERY_BUDGET_MODE, 'raise')
+
+    def test_raises_over_budget(self):
+        with self.settings(QUERY_BUDGETS={'list_todos': {'queries': 2}}):
+            with self.assertRaisesMessage(QueryBudgetExceeded, 'GET /api/v1/todos/ (list_todos) over its query budget: 3 queries > 2'):
+                self.client.get('/api/v1/todos/')
+
+    def test_within_budget(self):
+        with self.settings(QUERY_BUDGETS={'list_todos': {'queries': 3}}):
+            response = self.client.get('/api/v1/todos/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_raise_mode_ignores_db_time(self):
+        with self.settings(QUERY_BUDGETS={'list_todos': {'queries': 3, 'db_ms': 0}}):
+            response = self.client.get('/api/v1/todos/')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_BUDGET_MODE='log', QUERY_BUDGETS={'get_todo': {'queries': 3, 'db_ms': 0}})
+    def test_logs_db_time_over_budget(self):
+        with self.assertLogs('apps.perf.middleware', 'WARNING') as logs:
+            self.client.get(f'/api/v1/todos/{self.todo.id}')
+        self.assertIn('ms in the database > 0 ms', logs.output[0])
+
+    def test_cache_hits_use_fewer_queries(self):
+        self.client.get('/api/v1/todos/')
+        with self.settings(QUERY_BUDGETS={'list_todos': {'queries': 2}}):
+            response = self.client.get('/api/v1/todos/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_budget_is_per_method(self):
+        with self.settings(QUERY_BUDGETS={'list_todos': {'queries': 0}}):
+            response = self.client.post(
+                '/api/v1/todos/', json.dumps({'title': 'New', 'description': ''}), content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_BUDGET_MODE='log', QUERY_BUDGETS={'get_todo': {'queries': 1}})
+    def test_logs_over_budget(self):
+        with self.assertLogs('apps.perf.middleware', 'WARNING') as logs:
+            response = self.client.get(f'/api/v1/todos/{self.todo.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'GET /api/v1/todos/{self.todo.id} (get_todo) over its query budget: 3 queries > 1', logs.output[0])
+        self.assertEqual(logs.records[0].queries, 3)
+
+    @override_settings(QUERY_BUDGET_MODE='log', QUERY_BUDGET_SAMPLE_RATE=0, QUERY_BUDGETS={'get_todo': {'queries': 1}})
+    def test_unsampled_requests_are_not_checked(self):
+        with self.assertNoLogs('apps.perf.middleware'):
+            self.client.get(f'/api/v1/todos/{self.todo.id}')
+
+    @override_settings(QUERY_BUDGET_MODE='off', QUERY_BUDGETS={'get_todo': {'queries': 1}})
+    def test_off(self):
+        response = self.client.get(f'/api/v1/todos/{self.todo.id}')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(ROOT_URLCONF='apps.todos.tests.async_urls', QUERY_BUDGETS={'get_todo': {'queries': 2}})
+    def test_async_handlers(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, '3 queries > 2'):
+            self.client.get(f'/api/v1/todos/{self.todo.id}')
+
+    def test_server_errors_are_not_checked(self):
+        # The view's own exception reaches the test, not an over-budget error
+        with self.settings(QUERY_BUDGETS={'list_todos': {'queries': 0}}):
+            with mock.patch('apps.todos.api.filter_todos', side_effect=RuntimeError('boom')):
+                with self.assertRaisesMessage(RuntimeError, 'boom'):
+                    self.client.get('/api/v1/todos/')
+
+    def test_declared_budgets_hold(self):
+        # The endpoints in QUERY_BUDGETS, exercised here in one place; every
+        # other test going through the client is checked too.
+        self.client.post('/api/v1/auth/logout/')
+        response = self.client.post(
+            '/api/v1/auth/signup/',
+            json.dumps({'username': 'new', 'email': 'new@example.com', 'password': 'pw', 'password2': 'pw'}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post(
+            '/api/v1/auth/login/', json.dumps({'username': 'new', 'password': 'pw'}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        todo = self.client.post(
+            '/api/v1/todos/', json.dumps({'title': 'New', 'description': ''}), content_type='application/json'
+        ).json()
+        url = f'/api/v1/todos/{todo["id"]}'
+        self.assertEqual(self.client.get('/api/v1/todos/').status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        body = json.dumps({'title': 'Updated', 'description': '', 'completed': True})
+        self.assertEqual(self.client.put(url, body, content_type='application/json').status_code, 200)
+        self.assertEqual(self.client.patch(url, json.dumps({'completed': False}), content_type='application/json').status_code, 200)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+
+        items = [{'title': f'Bulk {i}', 'description': ''} for i in range(100)]
+        results = self.client.post('/api/v1/todos/bulk', json.dumps({'items': items}), content_type='application/json').json()['results']
+        ids = [result['id'] for result in results]
+        body = json.dumps({'items': [{'id': id, 'completed': True} for id in ids]})
+        self.assertEqual(self.client.patch('/api/v1/todos/bulk', body, content_type='application/json').status_code, 200)
+        body = json.dumps({'ids': ids})
+        self.assertEqual(self.client.delete('/api/v1/todos/bulk', body, content_type='application/json').status_code, 200)
+        self.assertEqual(self.client.post('/api/v1/auth/logout/').status_code, 200)
+
+
+class TimingTest(TestCase):
+
+    def test_timed_outside_a_request_is_a_no_op(self):
+        with timed('serialize'):
+            pass
+
+    def test_nested_phase_counted_once(self):
+        with collect_timings() as timings:
+            with timed('template'):
+                with timed('template'):
+                    pass
+            with timed('serialize'):
+                pass
+        self.assertEqual(sorted(timings.phases), ['serialize', 'template'])
+
+
+class RequestMetricsTest(TestCase):
+
+    def test_histogram_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.cumulative()), [(0.1, 2), (1.0, 3), ('+Inf', 4)])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 2.65)
+
+    def test_render(self):
+        metrics = RequestMetrics(buckets=(0.1,))
+        metrics.observe('list_todos', 'GET', 200, 0.05, 0.01, 3)
+        metrics.observe('list_todos', 'GET', 304, 0.2, 0.0, 2)
+        text = metrics.render()
+        self.assertIn('http_request_duration_seconds_bucket{route="list_todos",method="GET",le="0.1"} 1', text)
+        self.assertIn('http_request_duration_seconds_bucket{route="list_todos",method="GET",le="+Inf"} 2', text)
+        self.assertIn('http_request_duration_seconds_count{route="list_todos",method="GET"} 2', text)
+        self.assertIn('http_request_db_seconds_sum{route="list_todos",method="GET"} 0.010000', text)
+        self.assertIn('http_request_queries_total{route="list_todos",method="GET"} 5', text)
+        self.assertIn('http_responses_total{route="list_todos",method="GET",status="304"} 1', text)
+
+
+@override_settings(SERVER_TIMING=True, REQUEST_METRICS=True)
+class ServerTimingMiddlewareTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        request_metrics.reset()
+        self.client = Client()
+        self.user = User.objects.create_user(username='user1', password='password1')
+        Todo.objects.create(user=self.user, title='Todo', description='desc')
+        self.client.login(username='user1', password='password1')
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/v1/todos/')
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="3 queries", serialize;dur=[\d.]+$',
+        )
+
+    def test_ninja_and_drf_serialization_are_timed(self):
+        todo = self.client.post(
+            '/api/v1/todos/', json.dumps({'title': 'New', 'description': ''}), content_type='application/json'
+        )
+        self.assertIn('serialize;dur=', todo['Server-Timing'])
+        response = self.client.post('/api/v1/auth/logout/')
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+
+    # Rendered per request, against the Vite dev server
+    @override_settings(VITE_PRERENDER_SHELL=False, DEBUG=True, INTERNAL_IPS=['127.0.0.1'])
+    def test_template_rendering_is_timed(self):
+        response = self.client.get('/r/todos')
+        self.assertIn('template;dur=', response['Server-Timing'])
+
+    @override_settings(SERVER_TIMING=False)
+    def test_header_off(self):
+        response = self.client.get('/api/v1/todos/')
+        self.assertNotIn('Server-Timing', response)
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/v1/todos/')
+        self.client.get('/api/v1/todos/')
+        response = self.client.get('/metrics', REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{route="list_todos",method="GET"} 2', text)
+        self.assertIn('http_responses_total{route="list_todos",method="GET",status="200"} 2', text)
+
+    def test_metrics_endpoint_is_restricted(self):
+        response = self.client.get('/metrics', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 404)
+
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class ProfilingTest(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def test_stack_sampler(self):
+        sampler = StackSampler(interval=0.001)
+        sampler.start(threading.get_ident())
+        busy(0.1)
+        samples = sampler.stop(threading.get_ident())
+        self.assertGreater(sum(samples.values()), 5)
+        stack = samples.most_common(1)[0][0]
+        self.assertIn('apps/perf/tests.py:test_stack_sampler;apps/perf/tests.py:busy', stack)
+        self.assertIsNone(sampler.stop(threading.get_ident()))
+
+    def test_save_and_prune(self):
+        with self.settings(PROFILE_DIR=self.dir.name, PROFILE_MAX_FILES=2):
+            for mode in ('cprofile', 'cprofile', 'sample'):
+                profile = RequestProfile(mode)
+                profile.start()
+                busy(0.02)
+                profile.stop()
+                path = profile.save('list_todos', 0.02)
+            self.assertRegex(os.path.basename(path), r'^\d{8}T[\d.]+-list_todos-20ms\.collapsed$')
+            self.assertEqual(len(profile_files(self.dir.name)), 2)
+            prune(self.dir.name, 0)
+            self.assertEqual(profile_files(self.dir.name), [])
+
+    def test_one_cprofile_at_a_time(self):
+        first, second = RequestProfile('cprofile'), RequestProfile('cprofile')
+        first.start()
+        try:
+            second.start()
+            second.stop()
+        finally:
+            first.stop()
+        self.assertEqual((first.mode, second.mode), ('cprofile', 'sample'))
+        # Released again
+        third = RequestProfile('cprofile')
+        third.start()
+        third.stop()
+        self.assertEqual(third.mode, 'cprofile')
+
+    def test_summarize_profiles(self):
+        with self.settings(PROFILE_DIR=self.dir.name):
+            for mode, name in (('cprofile', 'list_todos'), ('sample', 'list_todos'), ('cprofile', 'auth-login')):
+                profile = RequestProfile(mode)
+                profile.start()
+                busy(0.05)
+                profile.stop()
+                profile.save(name, 0.05)
+
+            out = StringIO()
+            call_command('summarize_profiles', stdout=out)
+            output = out.getvalue()
+            self.assertIn('3 profiles', output)
+            self.assertRegex(output, r'2 +50 +50  list_todos')
+            self.assertIn('cProfile, 2 profiles', output)
+            self.assertIn('Stack samples, 1 profiles', output)
+            self.assertIn('apps/perf/tests.py:busy', output)
+
+            out = StringIO()
+            call_command('summarize_profiles', endpoint='auth-login', sort='cumulative', stdout=out)
+            self.assertIn('1 profiles', out.getvalue())
+            self.assertNotIn('Stack samples', out.getvalue())
+
+
+class ProfilingMiddlewareTest(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        cache.clear()
+        self.client = Client()
+        User.objects.create_user(username='user1', password='password1')
+        self.client.login(username='user1', password='password1')
+
+    def test_header_profiles_the_request(self):
+        with self.settings(PROFILE_TOKEN='secret', PROFILE_DIR=self.dir.name):
+            response = self.client.get('/api/v1/todos/', HTTP_X_PROFILE='secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['X-Profile-File'], r'-list_todos-\d+ms\.pstats$')
+        self.assertEqual(os.listdir(self.dir.name), [response['X-Profile-File']])
+
+    def test_wrong_token(self):
+        with self.settings(PROFILE_TOKEN='secret', PROFILE_DIR=self.dir.name):
+            response = self.client.get('/api/v1/todos/', HTTP_X_PROFILE='guess')
+        self.assertNotIn('X-Profile-File', response)
+        self.assertEqual(profile_files(self.dir.name), [])
+
+    def test_overlapping_cprofile_requests(self):
+        both_in = threading.Barrier(2, timeout=5)
+
+        def get_response(request):
+            both_in.wait()
+            busy(0.05)
+            return HttpResponse()
+
+        with self.settings(PROFILE_REQUESTS='cprofile', PROFILE_SLOW_MS=0, PROFILE_DIR=self.dir.name):
+            middleware = ProfilingMiddleware(get_response)
+            responses = []
+            threads = [
+                threading.Thread(target=lambda: responses.append(middleware(RequestFactory().get('/'))))
+                for _ in range(2)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual([response.status_code for response in responses], [200, 200])
+            suffixes = sorted(os.path.splitext(path)[1] for path in profile_files(self.dir.name))
+            self.assertEqual(suffixes, ['.collapsed', '.pstats'])
+
+    def test_only_slow_requests_are_kept(self):
+        with self.settings(PROFILE_REQUESTS='cprofile', PROFILE_SLOW_MS=60000, PROFILE_DIR=self.dir.name):
+            self.client.get('/api/v1/todos/')
+        self.assertEqual(profile_files(self.dir.name), [])
+        # Middleware settings are read once per handler, so a fresh client
+        client = Client()
+        client.login(username='user1', password='password1')
+        with self.settings(PROFILE_REQUESTS='cprofile', PROFILE_SLOW_MS=0, PROFILE_DIR=self.dir.name):
+            response = client.get('/api/v1/todos/')
+        self.assertNotIn('X-Profile-File', response)
+        self.assertEqual(len(profile_files(self.dir.name)), 1)
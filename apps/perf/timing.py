@@ -0,0 +1,47 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_timings = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Seconds spent per phase ("serialize", "template", ...) by one request."""
+
+    def __init__(self):
+        self.phases = {}
+        self._active = set()
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+@contextmanager
+def collect_timings():
+    """Collects the timed() phases of the current request into a RequestTimings."""
+    timings = RequestTimings()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """
+    Adds the time spent in the block to the current request's `name` phase.
+    Free outside collect_timings(); a phase nested in itself (e.g. a template
+    rendered while rendering another) is only counted once.
+    """
+    timings = _timings.get()
+    if timings is None or name in timings._active:
+        yield
+        return
+    timings._active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+        timings._active.discard(name)
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from apps.perf.metrics import request_metrics
+
+
+def db_pool_metrics():
+    """Gauges/counters for DjTodos.db.postgresql_pool pools, when that backend is in use."""
+    if not any(db["ENGINE"] == "DjTodos.db.postgresql_pool" for db in settings.DATABASES.values()):
+        return ""
+    from DjTodos.db.postgresql_pool.base import pool_stats
+
+    lines = []
+    for alias, stats in sorted(pool_stats().items()):
+        for field, value in stats.items():
+            lines.append(f'db_pool_{field}{{alias="{alias}"}} {value}')
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def metrics(request):
+    """
+    Prometheus-style metrics of the process that serves the request, for
+    METRICS_ALLOWED_IPS only. Each worker process keeps its own numbers.
+    """
+    if not settings.REQUEST_METRICS or request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(
+        request_metrics.render() + db_pool_metrics(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
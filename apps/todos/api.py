@@ -1,25 +1,141 @@
-from typing import List
-from ninja import Router
+from typing import Literal, Optional
+from ninja import Router, Query, File
+from ninja.files import UploadedFile
+from ninja.decorators import decorate_view
+from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from apps.todos import cache as todo_cache
+from apps.todos.exports import CONTENT_TYPES, export_stream
+from apps.todos.filters import ORDERINGS, filter_todos
+from apps.todos.imports import detect_format, import_todos as run_import
 from apps.todos.models import Todo
-from apps.todos.schemas import TodoSchema, TodoCreateSchema
+from apps.todos.pagination import paginate_keyset
+from apps.todos.serializers import TODO_FIELDS, dumps_page
+from apps.todos.schemas import (
+    TodoSchema,
+    TodoCreateSchema,
+    TodoPatchSchema,
+    TodoListQuery,
+    TodoExportQuery,
+    TodoPageSchema,
+    TodoBulkCreateSchema,
+    TodoBulkUpdateSchema,
+    TodoBulkDeleteSchema,
+    TodoBulkResponseSchema,
+    TodoImportResultSchema,
+)
 from ninja.security import SessionAuth
+from DjTodos.http import accepted_encodings
 
 api = Router(auth=SessionAuth())
 
-@api.get("/", response=List[TodoSchema])
-def list_todos(request):
-    return Todo.objects.filter(user=request.auth)
+# Clients must revalidate; conditional GETs are answered from the version
+# counter with a 304 before the view runs.
+revalidate = cache_control(private=True, no_cache=True)
+
+@api.get("/", response=TodoPageSchema)
+@decorate_view(condition(etag_func=todo_cache.list_etag), todo_cache.without_validators_on_error, revalidate)
+def list_todos(request, params: TodoListQuery = Query(...)):
+    # Rendered to JSON bytes straight from .values() rows and cached as such;
+    # the response bypasses ninja's per-item TodoSchema validation.
+    def build():
+        queryset = filter_todos(Todo.objects.filter(user=request.auth), params).values(*TODO_FIELDS)
+        page = paginate_keyset(
+            queryset, limit=params.limit, cursor=params.cursor, ordering=ORDERINGS[params.ordering]
+        )
+        return dumps_page(page)
+
+    content = todo_cache.get_or_build(request.auth.id, "list-json", params.dict(), build)
+    return HttpResponse(content, content_type="application/json; charset=utf-8")
 
 @api.post("/", response=TodoSchema)
 def create_todo(request, payload: TodoCreateSchema):
     todo = Todo.objects.create(**payload.dict(), user=request.auth)
     return todo
 
+# Bulk, export and import routes are registered before "/{todo_id}" so their paths are never parsed as an id
+
+@api.post("/bulk", response={201: TodoBulkResponseSchema})
+def bulk_create_todos(request, payload: TodoBulkCreateSchema):
+    todos = [Todo(**item.dict(), user=request.auth) for item in payload.items]
+    with transaction.atomic():
+        todos = Todo.objects.bulk_create(todos)
+    todo_cache.invalidate_user_todos(request.auth.id)
+    return 201, {"results": [{"id": todo.id, "status": "created", "todo": todo} for todo in todos]}
+
+@api.patch("/bulk", response=TodoBulkResponseSchema)
+def bulk_update_todos(request, payload: TodoBulkUpdateSchema):
+    changes = {}
+    for item in payload.items:
+        changes.setdefault(item.id, {}).update(item.dict(exclude_unset=True, exclude={"id"}))
+    fields = sorted({field for values in changes.values() for field in values})
+
+    with transaction.atomic():
+        todos = Todo.objects.select_for_update().filter(user=request.auth, id__in=changes).in_bulk()
+        for todo_id, todo in todos.items():
+            for attr, value in changes[todo_id].items():
+                setattr(todo, attr, value)
+        if todos and fields:
+            Todo.objects.bulk_update(todos.values(), fields)
+    todo_cache.invalidate_user_todos(request.auth.id)
+
+    return {
+        "results": [
+            {"id": item.id, "status": "updated", "todo": todos[item.id]}
+            if item.id in todos
+            else {"id": item.id, "status": "not_found"}
+            for item in payload.items
+        ]
+    }
+
+@api.delete("/bulk", response=TodoBulkResponseSchema)
+def bulk_delete_todos(request, payload: TodoBulkDeleteSchema):
+    # The delete sends post_delete per row; the batch turns that into one bump
+    with todo_cache.invalidation_batch(), transaction.atomic():
+        todos = Todo.objects.filter(user=request.auth, id__in=payload.ids)
+        existing = set(todos.select_for_update().values_list("id", flat=True))
+        Todo.objects.filter(id__in=existing).delete()
+    return {
+        "results": [
+            {"id": todo_id, "status": "deleted" if todo_id in existing else "not_found"}
+            for todo_id in payload.ids
+        ]
+    }
+
+@api.get("/export")
+def export_todos(request, params: TodoExportQuery = Query(...)):
+    queryset = filter_todos(Todo.objects.filter(user=request.auth), params)
+    # The body is produced after the view returns: pick the database now,
+    # while the request's replica pinning still applies.
+    queryset = queryset.using(queryset.db)
+    use_gzip = "gzip" in accepted_encodings(request)
+    response = StreamingHttpResponse(
+        export_stream(queryset, params.format, gzip=use_gzip),
+        content_type=CONTENT_TYPES[params.format],
+    )
+    response["Content-Disposition"] = f'attachment; filename="todos.{params.format}"'
+    response["Vary"] = "Accept-Encoding"
+    if use_gzip:
+        response["Content-Encoding"] = "gzip"
+    return response
+
+@api.post("/import", response=TodoImportResultSchema)
+def import_todos(request, file: UploadedFile = File(...), format: Optional[Literal["ndjson", "csv"]] = None):
+    report = run_import(file.file, request.auth, format=format or detect_format(file.name))
+    todo_cache.invalidate_user_todos(request.auth.id)
+    return report
+
 @api.get("/{todo_id}", response=TodoSchema)
+@decorate_view(condition(etag_func=todo_cache.detail_etag), todo_cache.without_validators_on_error, revalidate)
 def get_todo(request, todo_id: int):
-    todo = get_object_or_404(Todo, id=todo_id, user=request.auth)
-    return todo
+    def build():
+        todo = get_object_or_404(Todo, id=todo_id, user=request.auth)
+        return TodoSchema.from_orm(todo).dict()
+
+    return todo_cache.get_or_build(request.auth.id, "detail", todo_id, build)
 
 @api.put("/{todo_id}", response=TodoSchema)
 def update_todo(request, todo_id: int, payload: TodoCreateSchema):
@@ -29,6 +145,18 @@ def update_todo(request, todo_id: int, payload: TodoCreateSchema):
     todo.save()
     return todo
 
+@api.patch("/{todo_id}", response=TodoSchema)
+def patch_todo(request, todo_id: int, payload: TodoPatchSchema):
+    todos = Todo.objects.filter(id=todo_id, user=request.auth)
+    changes = payload.dict(exclude_unset=True)
+    if not changes:
+        return get_object_or_404(todos)
+    updated = todos.update_returning(**changes)
+    todo_cache.invalidate_user_todos(request.auth.id)
+    if not updated:
+        raise Http404("No Todo matches the given query.")
+    return updated[0]
+
 @api.delete("/{todo_id}", response={204: None})
 def delete_todo(request, todo_id: int):
     todo = get_object_or_404(Todo, id=todo_id, user=request.auth)
@@ -0,0 +1,129 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from ninja import Router, Query
+from ninja.security import SessionAuth
+from apps.todos import api as sync_api
+from apps.todos import cache as todo_cache
+from apps.todos.filters import ORDERINGS, filter_todos
+from apps.todos.models import Todo
+from apps.todos.pagination import apaginate_keyset
+from apps.todos.serializers import TODO_FIELDS, dumps_page
+from apps.todos.schemas import (
+    TodoSchema,
+    TodoCreateSchema,
+    TodoListQuery,
+    TodoPageSchema,
+    TodoBulkResponseSchema,
+    TodoImportResultSchema,
+)
+
+# Native async versions of the todos endpoints, mounted instead of
+# apps.todos.api when TODOS_ASYNC_API is set (for ASGI deployments, see
+# DjTodos/asgi.py). Under ASGI a sync handler costs a thread hop per request;
+# these run on the event loop. Bulk, export, import and PATCH are shared with
+# the sync API and still run in a thread.
+
+
+class AsyncSessionAuth(SessionAuth):
+    "Session authentication that doesn't block the event loop"
+
+    async def authenticate(self, request, key):
+        if hasattr(request, "auser"):  # Django 5.0+
+            user = await request.auser()
+            return user if user.is_authenticated else None
+        # Session and user lookups are sync-only before Django 5.0: one thread
+        # hop loads both, request.user is cached afterwards.
+        if await sync_to_async(lambda: request.user.is_authenticated)():
+            return request.user
+        return None
+
+
+api = Router(auth=AsyncSessionAuth())
+
+# For the shared sync handlers, which run in a thread where blocking is fine
+sync_auth = SessionAuth()
+
+
+async def aget_todo_or_404(**lookup):
+    try:
+        return await Todo.objects.aget(**lookup)
+    except Todo.DoesNotExist:
+        raise Http404("No Todo matches the given query.")
+
+
+async def not_modified(request, response, etag_for_version):
+    """
+    Async counterpart of the condition()/cache_control() decorators on the
+    sync views: returns a 304 when the client's copy is current, otherwise
+    sets the validators on `response` and returns None.
+    """
+    etag = quote_etag(etag_for_version(await todo_cache.aget_version(request.auth.id)))
+
+    conditional = get_conditional_response(request, etag=etag)
+    for target in (conditional, response):
+        if target is not None:
+            target["ETag"] = etag
+            patch_cache_control(target, private=True, no_cache=True)
+    return conditional
+
+
+@api.get("/", response=TodoPageSchema)
+async def list_todos(request, response: HttpResponse, params: TodoListQuery = Query(...)):
+    unchanged = await not_modified(
+        request, response, lambda version: todo_cache.make_list_etag(request, request.auth.id, version)
+    )
+    if unchanged:
+        return unchanged
+
+    async def build():
+        queryset = filter_todos(Todo.objects.filter(user=request.auth), params).values(*TODO_FIELDS)
+        page = await apaginate_keyset(
+            queryset, limit=params.limit, cursor=params.cursor, ordering=ORDERINGS[params.ordering]
+        )
+        return dumps_page(page)
+
+    response.content = await todo_cache.aget_or_build(request.auth.id, "list-json", params.dict(), build)
+    response["Content-Type"] = "application/json; charset=utf-8"
+    return response
+
+@api.post("/", response=TodoSchema)
+async def create_todo(request, payload: TodoCreateSchema):
+    return await Todo.objects.acreate(**payload.dict(), user=request.auth)
+
+api.post("/bulk", response={201: TodoBulkResponseSchema}, auth=sync_auth)(sync_api.bulk_create_todos)
+api.patch("/bulk", response=TodoBulkResponseSchema, auth=sync_auth)(sync_api.bulk_update_todos)
+api.delete("/bulk", response=TodoBulkResponseSchema, auth=sync_auth)(sync_api.bulk_delete_todos)
+api.get("/export", auth=sync_auth)(sync_api.export_todos)
+api.post("/import", response=TodoImportResultSchema, auth=sync_auth)(sync_api.import_todos)
+
+@api.get("/{todo_id}", response=TodoSchema)
+async def get_todo(request, response: HttpResponse, todo_id: int):
+    unchanged = await not_modified(
+        request, response, lambda version: todo_cache.make_detail_etag(request.auth.id, version, todo_id)
+    )
+    if unchanged:
+        return unchanged
+
+    async def build():
+        todo = await aget_todo_or_404(id=todo_id, user=request.auth)
+        return TodoSchema.from_orm(todo).dict()
+
+    return await todo_cache.aget_or_build(request.auth.id, "detail", todo_id, build)
+
+@api.put("/{todo_id}", response=TodoSchema)
+async def update_todo(request, todo_id: int, payload: TodoCreateSchema):
+    todo = await aget_todo_or_404(id=todo_id, user=request.auth)
+    for attr, value in payload.dict().items():
+        setattr(todo, attr, value)
+    await todo.asave()
+    return todo
+
+api.patch("/{todo_id}", response=TodoSchema, auth=sync_auth)(sync_api.patch_todo)
+
+@api.delete("/{todo_id}", response={204: None})
+async def delete_todo(request, todo_id: int):
+    todo = await aget_todo_or_404(id=todo_id, user=request.auth)
+    await todo.adelete()
+    return 204, None
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from DjTodos.db.router import is_pinned, pin_to_primary
+
+# Every cached todos response is keyed by the owner's version counter. A write
+# bumps the counter, so earlier entries are never read again and simply expire.
+#
+# The counter must live in a cache shared by all workers: with the default
+# locmem backend, invalidation is only visible inside the process that wrote.
+
+_local = threading.local()
+
+
+def _cache():
+    return caches[settings.TODOS_CACHE_ALIAS]
+
+
+def _version_key(user_id):
+    return f"todos:version:{user_id}"
+
+
+def _modified_key(user_id):
+    return f"todos:modified:{user_id}"
+
+
+def _initial_version():
+    # Seeded from the clock so a counter that was evicted and re-created can
+    # never fall back to a version that still has entries cached under it.
+    return time.time_ns() // 1000
+
+
+def get_version(user_id):
+    cache = _cache()
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(_modified_key(user_id), time.time(), timeout=None)
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(user_id):
+    cache = _cache()
+    key = _version_key(user_id)
+    cache.set(_modified_key(user_id), time.time(), timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), timeout=None)
+        return cache.get(key)
+
+
+async def aget_version(user_id):
+    cache = _cache()
+    key = _version_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(_modified_key(user_id), time.time(), timeout=None)
+        await cache.aadd(key, _initial_version(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def invalidate_user_todos(user_id):
+    """
+    Bumps the user's version now, so nothing cached before the write is served
+    again, and once more on commit, so a read that raced the transaction and
+    cached pre-commit rows under the intermediate version is discarded too.
+    """
+    if getattr(_local, "batching", False):
+        _local.pending.add(user_id)
+        return
+    bump_version(user_id)
+    transaction.on_commit(lambda: bump_version(user_id))
+
+
+@contextmanager
+def invalidation_batch():
+    """
+    Collapses the per-row signals of a bulk write into one bump per user.
+    """
+    if getattr(_local, "batching", False):
+        yield
+        return
+    _local.batching, _local.pending = True, set()
+    try:
+        yield
+    finally:
+        pending, _local.batching, _local.pending = _local.pending, False, set()
+        for user_id in pending:
+            invalidate_user_todos(user_id)
+
+
+def _params_digest(params):
+    encoded = json.dumps(params, sort_keys=True, default=str).encode()
+    return hashlib.md5(encoded, usedforsecurity=False).hexdigest()
+
+
+def _entry_key(user_id, version, kind, params):
+    return f"todos:{kind}:{user_id}:{version}:{_params_digest(params)}"
+
+
+def _pin_after_recent_write(modified):
+    """
+    Sends the rest of the request's reads to the primary when the user last
+    wrote (at the `modified` timestamp) less than DB_REPLICA_PIN_SECONDS ago:
+    a replica may not have that write yet. The cookie-based pinning only
+    covers the client that wrote, and a value built from stale rows would
+    be cached, and validated by the ETag, under the new version.
+    """
+    if not settings.DB_REPLICAS or is_pinned() or modified is None:
+        return
+    if time.time() - modified < settings.DB_REPLICA_PIN_SECONDS:
+        pin_to_primary()
+
+
+def get_or_build(user_id, kind, params, build):
+    """
+    Returns the cached value for (user, version, kind, params), calling
+    `build` and caching its result on a miss.
+    """
+    cache = _cache()
+    key = _entry_key(user_id, get_version(user_id), kind, params)
+    value = cache.get(key)
+    if value is None:
+        _pin_after_recent_write(cache.get(_modified_key(user_id)))
+        value = build()
+        cache.set(key, value, settings.TODOS_CACHE_TIMEOUT)
+    return value
+
+
+async def aget_or_build(user_id, kind, params, build):
+    """get_or_build for async views; `build` is a coroutine function."""
+    cache = _cache()
+    key = _entry_key(user_id, await aget_version(user_id), kind, params)
+    value = await cache.aget(key)
+    if value is None:
+        _pin_after_recent_write(await cache.aget(_modified_key(user_id)))
+        value = await build()
+        await cache.aset(key, value, settings.TODOS_CACHE_TIMEOUT)
+    return value
+
+
+# Conditional GET support, for use with django.views.decorators.http.condition.
+# These only read the version counter, so a 304 never touches the todos table.
+# There is deliberately no Last-Modified: at one-second resolution, a write in
+# the same second as the previous response would be answered with a 304.
+
+
+def without_validators_on_error(view):
+    """
+    Applied outside condition(), which sets the ETag whatever the status:
+    drops it from error responses, such as the 404 for a todo that doesn't
+    exist or the 422 for invalid filters, which must not be revalidated into
+    a 304.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if response.status_code >= 400:
+            del response["ETag"]
+        return response
+
+    return wrapper
+
+
+def _user_id(request):
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return None
+    return user.id
+
+
+def make_list_etag(request, user_id, version):
+    return f"{user_id}-{version}-{_params_digest(sorted(request.GET.lists()))}"
+
+
+def make_detail_etag(user_id, version, todo_id):
+    return f"{user_id}-{version}-{todo_id}"
+
+
+def list_etag(request, **kwargs):
+    user_id = _user_id(request)
+    if user_id is None:
+        return None
+    return make_list_etag(request, user_id, get_version(user_id))
+
+
+def detail_etag(request, todo_id, **kwargs):
+    user_id = _user_id(request)
+    if user_id is None:
+        return None
+    return make_detail_etag(user_id, get_version(user_id), todo_id)
@@ -0,0 +1,77 @@
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FIELDS = ("id", "title", "description", "completed", "created_at")
+
+# Rows fetched per round trip (per FETCH from the server-side cursor on PostgreSQL)
+EXPORT_CHUNK_SIZE = 2000
+
+# Lines are joined into blocks of roughly this size before being written, so
+# the server does not flush one tiny chunk per row.
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def export_rows(queryset):
+    """
+    Streams rows as plain tuples: no model instances, and the whole result is
+    never held in memory.
+    """
+    return queryset.order_by("id").values_list(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def ndjson_lines(rows):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(EXPORT_FIELDS, row))) + "\n"
+
+
+class _Echo:
+    """File-like object whose write() hands the line straight back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        *values, created_at = row
+        yield writer.writerow([*values, encoder.default(created_at)])
+
+
+def buffered(lines, size=EXPORT_BUFFER_SIZE):
+    block, block_size = [], 0
+    for line in lines:
+        data = line.encode()
+        block.append(data)
+        block_size += len(data)
+        if block_size >= size:
+            yield b"".join(block)
+            block, block_size = [], 0
+    if block:
+        yield b"".join(block)
+
+
+def gzipped(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(queryset, format, gzip=False):
+    lines = ndjson_lines if format == "ndjson" else csv_lines
+    stream = buffered(lines(export_rows(queryset)))
+    return gzipped(stream) if gzip else stream
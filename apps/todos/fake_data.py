@@ -0,0 +1,40 @@
+"""
+Fake todo rows for the create_todos command.
+
+Worker processes import this module to unpickle generate_batch. With the
+spawn start method (the default on macOS and Windows) that happens in a
+fresh interpreter where Django isn't set up, so keep it free of Django
+imports, models included.
+"""
+import random
+from datetime import timezone
+
+from faker import Faker
+
+_faker = None
+
+
+def generate_batch(batch_index, size, user_count, seed=None):
+    """
+    Generates one batch of (user index, title, description, completed,
+    created_at) rows. Runs in worker processes, so it only takes and returns
+    plain picklable values. With a seed, the output depends on the batch index
+    alone, not on which worker produced it.
+    """
+    global _faker
+    if _faker is None:
+        _faker = Faker()
+    rng = random.Random(None if seed is None else seed + batch_index)
+    if seed is not None:
+        _faker.seed_instance(seed + batch_index)
+
+    return [
+        (
+            rng.randrange(user_count),
+            _faker.sentence(nb_words=5),
+            _faker.paragraph(nb_sentences=3),
+            rng.random() < 0.5,
+            _faker.date_time_this_year(tzinfo=timezone.utc),
+        )
+        for _ in range(size)
+    ]
@@ -0,0 +1,42 @@
+from django.db import connections
+from django.db.models import Q
+from apps.todos.models import todo_search_vector
+
+# Public `ordering` values mapped to keyset orderings. Each one ends in `id`
+# so pagination cursors stay unambiguous.
+ORDERINGS = {
+    "created_at": ("created_at", "id"),
+    "-created_at": ("-created_at", "-id"),
+    "title": ("title", "id"),
+    "-title": ("-title", "-id"),
+}
+
+
+def search_todos(queryset, q):
+    """
+    Full-text search over title and description. PostgreSQL matches against the
+    GIN-indexed tsvector; other backends fall back to icontains on every term.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery
+
+        return queryset.annotate(search=todo_search_vector()).filter(
+            search=SearchQuery(q, config="english", search_type="websearch")
+        )
+
+    for term in q.split():
+        queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+    return queryset
+
+
+def filter_todos(queryset, params):
+    if params.completed is not None:
+        queryset = queryset.filter(completed=params.completed)
+    if params.created_after is not None:
+        queryset = queryset.filter(created_at__gte=params.created_after)
+    if params.created_before is not None:
+        queryset = queryset.filter(created_at__lt=params.created_before)
+    if params.q and params.q.strip():
+        queryset = search_todos(queryset, params.q.strip())
+    return queryset
+
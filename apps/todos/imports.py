@@ -0,0 +1,215 @@
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+from pydantic import ValidationError
+
+from apps.todos.models import Todo
+from apps.todos.schemas import TodoCreateSchema
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Every failed row is counted, but only the first ones are kept with details
+MAX_REPORTED_ERRORS = 100
+
+COPY_COLUMNS = ("user_id", "title", "description", "completed", "created_at")
+
+
+@dataclass
+class RowError:
+    batch: int
+    line: Optional[int]
+    error: str
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    failed: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+    errors: List[RowError] = field(default_factory=list)
+
+    @property
+    def rows_per_sec(self):
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, batch, line, error, rows=1):
+        self.failed += rows
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(batch=batch, line=line, error=error))
+
+
+def detect_format(filename):
+    return "csv" if filename and filename.lower().endswith(".csv") else "ndjson"
+
+
+def parse_ndjson(text):
+    """Yields (line number, record or error message)."""
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, "expected a JSON object"
+            continue
+        yield line_no, record
+
+
+# An empty CSV cell is an empty string for text columns, and "not provided"
+# (so the schema default applies) for everything else.
+TEXT_FIELDS = {name for name, info in TodoCreateSchema.model_fields.items() if info.annotation is str}
+
+
+def parse_csv(text):
+    reader = csv.DictReader(text)
+    try:
+        for record in reader:
+            yield reader.line_num, {
+                key: value
+                for key, value in record.items()
+                if key and (value != "" or key in TEXT_FIELDS)
+            }
+    except csv.Error as e:
+        # The reader cannot resynchronise after a malformed record
+        yield reader.line_num, f"malformed CSV, stopped reading: {e}"
+
+
+PARSERS = {"ndjson": parse_ndjson, "csv": parse_csv}
+
+
+def _format_validation_error(error):
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
+
+
+def _copy_csv(rows):
+    """
+    The COPY ... WITH (FORMAT csv) input for rows. Every field is quoted:
+    COPY reads a bare empty field as NULL, and an empty title or description
+    must stay an empty string.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+    for user_id, title, description, completed, created_at in rows:
+        writer.writerow([user_id, title, description, "t" if completed else "f", created_at.isoformat()])
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_rows(connection, rows):
+    """Loads rows with COPY ... FROM STDIN, PostgreSQL's fastest bulk path."""
+    buffer = _copy_csv(rows)
+
+    table = connection.ops.quote_name(Todo._meta.db_table)
+    sql = f"COPY {table} ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):  # psycopg2
+            raw.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def _insert_rows(connection, rows):
+    fields = [Todo._meta.get_field(column.removesuffix("_id")) for column in COPY_COLUMNS]
+    qn = connection.ops.quote_name
+    sql = "INSERT INTO %s (%s) VALUES (%s)" % (
+        qn(Todo._meta.db_table),
+        ", ".join(qn(column) for column in COPY_COLUMNS),
+        ", ".join(["%s"] * len(COPY_COLUMNS)),
+    )
+    params = [
+        [field.get_db_prep_save(value, connection) for field, value in zip(fields, row)]
+        for row in rows
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def insert_rows(rows, using="default"):
+    """
+    Inserts (user_id, title, description, completed, created_at) tuples in one
+    transaction. Unlike bulk_create, created_at is written as given rather
+    than overwritten by auto_now_add, and no model instances are built.
+    """
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if connection.vendor == "postgresql":
+            _copy_rows(connection, rows)
+        else:
+            _insert_rows(connection, rows)
+
+
+def insert_batch(rows, user, using="default"):
+    now = timezone.now()
+    insert_rows(
+        [(user.pk, row.title, row.description, row.completed, now) for row in rows], using=using
+    )
+
+
+def import_todos(
+    stream,
+    user,
+    format="ndjson",
+    batch_size=DEFAULT_BATCH_SIZE,
+    using="default",
+    on_batch: Optional[Callable[[ImportReport], None]] = None,
+):
+    """
+    Stream-parses `stream` (a binary file object), validates every record
+    against TodoCreateSchema and inserts valid rows for `user` in batches of
+    `batch_size`, each in its own transaction. Memory use is bounded by one
+    batch whatever the input size.
+
+    A failing batch is rolled back and reported; the import carries on with
+    the next one.
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    text = io.TextIOWrapper(stream, encoding="utf-8", errors="replace", newline="")
+    batch = []
+
+    def flush():
+        report.batches += 1
+        try:
+            insert_batch(batch, user, using=using)
+        except DatabaseError as e:
+            report.add_error(report.batches, None, f"batch rejected by the database: {e}", rows=len(batch))
+        else:
+            report.imported += len(batch)
+        batch.clear()
+        report.elapsed = time.perf_counter() - started
+        if on_batch:
+            on_batch(report)
+
+    try:
+        for line_no, record in PARSERS[format](text):
+            if isinstance(record, str):
+                report.add_error(report.batches + 1, line_no, record)
+                continue
+            try:
+                batch.append(TodoCreateSchema(**record))
+            except ValidationError as e:
+                report.add_error(report.batches + 1, line_no, _format_validation_error(e))
+                continue
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        text.detach()
+
+    report.elapsed = time.perf_counter() - started
+    return report
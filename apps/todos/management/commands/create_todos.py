@@ -1,47 +1,109 @@
-from django.core.management.base import BaseCommand
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
-from faker import Faker
-from apps.todos.models import Todo  # Replace 'todos' with the correct app name
+from apps.todos.cache import invalidate_user_todos
+from apps.todos.fake_data import generate_batch
+from apps.todos.imports import insert_rows
 
+LOADTEST_USERNAME = "loadtest_user_{}"
+LOADTEST_PASSWORD = "loadtest"
 
 class Command(BaseCommand):
-    help = "Generate fake todos for the first user"
+    help = "Generate fake todos, optionally spread over many generated users, for load testing"
 
     def add_arguments(self, parser):
         parser.add_argument(
             "count", type=int, help="Indicates the number of todos to be created"
         )
+        parser.add_argument(
+            "--users",
+            type=int,
+            help=(
+                f"Spread the todos over N users named {LOADTEST_USERNAME.format('<i>')} "
+                f"(password {LOADTEST_PASSWORD!r}), creating any that are missing. "
+                "By default every todo goes to the first user."
+            ),
+        )
+        parser.add_argument("--batch-size", type=int, default=10000, help="Rows generated and inserted per batch")
+        parser.add_argument(
+            "--workers", type=int, default=1, help="Processes generating fake data; 1 generates in-process"
+        )
+        parser.add_argument("--seed", type=int, help="Seed for reproducible datasets")
+        parser.add_argument("--database", default="default")
+
+    def get_users(self, count):
+        users = User.objects.using(self.database)
+        if count is None:
+            user = users.order_by("pk").first()
+            if not user:
+                raise CommandError("No user found in the auth_user table")
+            return [user.pk]
+
+        usernames = [LOADTEST_USERNAME.format(i) for i in range(count)]
+        existing = set(users.filter(username__in=usernames).values_list("username", flat=True))
+        missing = [name for name in usernames if name not in existing]
+        if missing:
+            # Hashing once instead of per user keeps this from being CPU bound
+            password = make_password(LOADTEST_PASSWORD)
+            users.bulk_create(
+                [User(username=name, password=password) for name in missing],
+                batch_size=self.batch_size,
+            )
+            self.stdout.write(f"Created {len(missing)} users")
+        ids = dict(users.filter(username__in=usernames).values_list("username", "pk"))
+        return [ids[name] for name in usernames]
+
+    def batches(self, count):
+        full, rest = divmod(count, self.batch_size)
+        return [self.batch_size] * full + ([rest] if rest else [])
+
+    def generated(self, sizes, user_count, seed, workers):
+        if workers <= 1:
+            for index, size in enumerate(sizes):
+                yield generate_batch(index, size, user_count, seed)
+            return
+
+        # Keep only a couple of batches in flight per worker so memory stays
+        # bounded when generation outpaces the database.
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for index, size in enumerate(sizes):
+                pending.append(pool.submit(generate_batch, index, size, user_count, seed))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
 
     def handle(self, *args, **kwargs):
         count = kwargs["count"]
-        fake = Faker()
+        self.database = kwargs["database"]
+        self.batch_size = kwargs["batch_size"]
+        if self.batch_size < 1:
+            raise CommandError("--batch-size must be positive")
 
-        # Get the first user in the auth_user table
-        try:
-            user = User.objects.first()
-            if not user:
-                self.stdout.write(
-                    self.style.ERROR("No user found in the auth_user table")
-                )
-                return
-        except User.DoesNotExist:
-            self.stdout.write(self.style.ERROR("No user found in the auth_user table"))
-            return
+        user_ids = self.get_users(kwargs["users"])
 
-        todos = []
-        for _ in range(count):
-            todo = Todo(
-                user=user,
-                title=fake.sentence(nb_words=5),
-                description=fake.paragraph(nb_sentences=3),
-                completed=fake.boolean(),
-                created_at=fake.date_time_this_year(),
+        started = time.perf_counter()
+        created = 0
+        for rows in self.generated(self.batches(count), len(user_ids), kwargs["seed"], kwargs["workers"]):
+            insert_rows(
+                [(user_ids[user_index], *values) for user_index, *values in rows],
+                using=self.database,
             )
-            todos.append(todo)
+            created += len(rows)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{created}/{count} todos ({created / elapsed:,.0f} rows/sec)")
+
+        for user_id in user_ids:
+            invalidate_user_todos(user_id)
 
-        Todo.objects.bulk_create(todos)
         self.stdout.write(
             self.style.SUCCESS(
-                f"Successfully created {count} todos for user {user.username}"
+                f"Successfully created {count} todos for {len(user_ids)} user(s) "
+                f"in {time.perf_counter() - started:.1f}s"
             )
         )
@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.models import Count
+from apps.todos.models import Todo
+from apps.todos.pagination import DEFAULT_ORDERING, DEFAULT_PAGE_SIZE, keyset_filter
+
+
+class Command(BaseCommand):
+    help = "Print the query plan of every query issued by the todos API"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username", help="User whose todos are explained (defaults to the user with the most todos)"
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run the queries and report actual timings (EXPLAIN ANALYZE on PostgreSQL)",
+        )
+        parser.add_argument("--database", default="default")
+
+    def get_user(self, username):
+        if username:
+            try:
+                return User.objects.using(self.database).get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"User {username!r} does not exist")
+
+        user = (
+            User.objects.using(self.database)
+            .annotate(todo_count=Count("todo"))
+            .order_by("-todo_count")
+            .first()
+        )
+        if user is None:
+            raise CommandError("No user found in the auth_user table")
+        return user
+
+    def api_queries(self, user):
+        todos = Todo.objects.using(self.database).filter(user=user)
+        ordering = list(DEFAULT_ORDERING)
+
+        # A row roughly in the middle of the user's todos stands in for a deep cursor
+        count = todos.count()
+        middle = todos.order_by(*ordering).values_list(*ordering)[count // 2 : count // 2 + 1]
+        todo_id = todos.values_list("id", flat=True).first() or 0
+
+        queries = [
+            ("list_todos (first page)", todos.order_by(*ordering)[: DEFAULT_PAGE_SIZE + 1]),
+        ]
+        if middle:
+            queries.append(
+                (
+                    "list_todos (deep cursor)",
+                    todos.filter(keyset_filter(ordering, list(middle[0]))).order_by(*ordering)[
+                        : DEFAULT_PAGE_SIZE + 1
+                    ],
+                )
+            )
+        queries += [
+            ("list_todos (completed=true)", todos.filter(completed=True).order_by(*ordering)[: DEFAULT_PAGE_SIZE + 1]),
+            ("get_todo / update_todo / delete_todo", todos.filter(id=todo_id)),
+        ]
+        return queries
+
+    def handle(self, *args, **kwargs):
+        self.database = kwargs["database"]
+        user = self.get_user(kwargs["username"])
+        vendor = connections[self.database].vendor
+
+        explain_options = {}
+        if kwargs["analyze"]:
+            if vendor == "postgresql":
+                explain_options = {"analyze": True, "buffers": True}
+            elif vendor != "sqlite":
+                explain_options = {"analyze": True}
+
+        self.stdout.write(f"Explaining todos API queries for user {user.username} on {vendor}\n")
+        for label, queryset in self.api_queries(user):
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write("")
@@ -0,0 +1,65 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from apps.todos.cache import invalidate_user_todos
+from apps.todos.imports import DEFAULT_BATCH_SIZE, detect_format, import_todos
+
+
+class Command(BaseCommand):
+    help = "Stream todos from an NDJSON or CSV file into the database in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - to read from stdin")
+        parser.add_argument("--username", required=True, help="Owner of the imported todos")
+        parser.add_argument(
+            "--format", choices=["ndjson", "csv"], help="Input format (defaults to the file extension)"
+        )
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--database", default="default")
+
+    def report_batch(self, report):
+        self.stdout.write(
+            f"batch {report.batches}: {report.imported} imported, {report.failed} failed, "
+            f"{report.rows_per_sec:,.0f} rows/sec"
+        )
+
+    def handle(self, *args, **kwargs):
+        try:
+            user = User.objects.using(kwargs["database"]).get(username=kwargs["username"])
+        except User.DoesNotExist:
+            raise CommandError(f"User {kwargs['username']!r} does not exist")
+
+        path = kwargs["path"]
+        format = kwargs["format"] or detect_format(path)
+        options = dict(
+            user=user,
+            format=format,
+            batch_size=kwargs["batch_size"],
+            using=kwargs["database"],
+            on_batch=self.report_batch,
+        )
+        if path == "-":
+            report = import_todos(sys.stdin.buffer, **options)
+        else:
+            try:
+                with open(path, "rb") as stream:
+                    report = import_todos(stream, **options)
+            except OSError as e:
+                raise CommandError(f"Cannot read {path}: {e}")
+
+        invalidate_user_todos(user.id)
+
+        for error in report.errors:
+            line = f"line {error.line}" if error.line else "whole batch"
+            self.stderr.write(f"batch {error.batch}, {line}: {error.error}")
+        if report.failed > len(report.errors):
+            self.stderr.write(f"... and {report.failed - len(report.errors)} more failed rows")
+
+        style = self.style.SUCCESS if not report.failed else self.style.WARNING
+        self.stdout.write(
+            style(
+                f"Imported {report.imported} todos for user {user.username} in {report.elapsed:.2f}s "
+                f"({report.rows_per_sec:,.0f} rows/sec), {report.failed} failed"
+            )
+        )
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+from apps.todos.operations import AddIndexConcurrentlyIfPostgres
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('todos', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfPostgres(
+            model_name='todo',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='todo_user_created_idx'),
+        ),
+        AddIndexConcurrentlyIfPostgres(
+            model_name='todo',
+            index=models.Index(fields=['user', 'completed'], name='todo_user_completed_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+from apps.todos.operations import AddPostgresIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('todos', '0002_todo_indexes'),
+    ]
+
+    operations = [
+        AddPostgresIndexConcurrently(
+            model_name='todo',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector('title', 'description', config='english'),
+                name='todo_search_gin_idx',
+            ),
+        ),
+    ]
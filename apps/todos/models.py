@@ -1,5 +1,72 @@
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import sql
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+
+
+def todo_search_vector():
+    # Shared by the GIN index and the search query so PostgreSQL can match the
+    # query expression against the indexed one.
+    return SearchVector("title", "description", config="english")
+
+
+class TodoQuerySet(models.QuerySet):
+    def update_returning(self, **kwargs):
+        """
+        Like update(), but returns the updated rows as model instances.
+
+        On PostgreSQL and SQLite this is a single UPDATE ... RETURNING statement
+        with no preliminary SELECT. Other backends get update() followed by a
+        SELECT of the affected primary keys.
+        """
+        # Before self.db is read, or the router picks a read (replica) alias
+        self._for_write = True
+        db = self.db
+        connection = connections[db]
+        if not (
+            connection.vendor in ("postgresql", "sqlite")
+            and connection.features.can_return_columns_from_insert
+        ):
+            pks = list(self.using(db).values_list("pk", flat=True))
+            self.model._default_manager.using(db).filter(pk__in=pks).update(**kwargs)
+            return list(self.model._default_manager.using(db).filter(pk__in=pks))
+
+        query = self.query.chain(sql.UpdateQuery)
+        query.add_update_values(kwargs)
+        query.annotations = {}
+        compiler = query.get_compiler(db)
+        compiler.pre_sql_setup()
+        update_sql, params = compiler.as_sql()
+
+        opts = self.model._meta
+        fields = opts.concrete_fields
+        qn = connection.ops.quote_name
+        returning = ", ".join(qn(field.column) for field in fields)
+
+        cols = [field.get_col(opts.db_table) for field in fields]
+        converters = [
+            connection.ops.get_db_converters(col) + col.get_db_converters(connection) for col in cols
+        ]
+
+        with transaction.mark_for_rollback_on_error(using=db):
+            with connection.cursor() as cursor:
+                cursor.execute(f"{update_sql} RETURNING {returning}", params)
+                rows = cursor.fetchall()
+
+        attnames = [field.attname for field in fields]
+        instances = []
+        for row in rows:
+            values = []
+            for value, col, col_converters in zip(row, cols, converters):
+                for converter in col_converters:
+                    value = converter(value, col, connection)
+                values.append(value)
+            instances.append(self.model.from_db(db, attnames, values))
+        return instances
+
+    update_returning.alters_data = True
+
 
 class Todo(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -8,5 +75,16 @@ class Todo(models.Model):
     completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = TodoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Serves the keyset-paginated list: WHERE user_id = ? ORDER BY created_at, id
+            models.Index(fields=["user", "created_at", "id"], name="todo_user_created_idx"),
+            models.Index(fields=["user", "completed"], name="todo_user_completed_idx"),
+            # PostgreSQL only, see migration 0003
+            GinIndex(todo_search_vector(), name="todo_search_gin_idx"),
+        ]
+
     def __str__(self):
         return self.title
\ No newline at end of file
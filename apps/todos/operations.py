@@ -0,0 +1,88 @@
+from django.db.migrations.operations import AddIndex, RemoveIndex
+
+
+def _is_postgres(schema_editor):
+    return schema_editor.connection.vendor == "postgresql"
+
+
+def _ensure_not_in_transaction(schema_editor):
+    if schema_editor.connection.in_atomic_block:
+        raise Exception(
+            "Building an index CONCURRENTLY is not supported inside a transaction. "
+            "Set `atomic = False` on the migration."
+        )
+
+
+class AddIndexConcurrentlyIfPostgres(AddIndex):
+    """
+    Builds the index with CREATE INDEX CONCURRENTLY on PostgreSQL so the table
+    stays writable while it is built, and with a plain CREATE INDEX elsewhere.
+
+    Unlike django.contrib.postgres.operations.AddIndexConcurrently this does not
+    import psycopg, so the migration still runs on SQLite-only installs.
+    The migration using it must set `atomic = False`.
+    """
+
+    def describe(self):
+        return "Create index %s on %s (concurrently on PostgreSQL)" % (
+            self.index.name,
+            self.model_name,
+        )
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not _is_postgres(schema_editor):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        _ensure_not_in_transaction(schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not _is_postgres(schema_editor):
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        _ensure_not_in_transaction(schema_editor)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+
+class AddPostgresIndexConcurrently(AddIndexConcurrentlyIfPostgres):
+    """
+    For PostgreSQL-specific indexes (GIN, tsvector expressions, ...). Other
+    backends only record the index in the migration state.
+    """
+
+    def describe(self):
+        return "Create index %s on %s (PostgreSQL only)" % (self.index.name, self.model_name)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if _is_postgres(schema_editor):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if _is_postgres(schema_editor):
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class RemoveIndexConcurrentlyIfPostgres(RemoveIndex):
+    """The DROP INDEX counterpart of AddIndexConcurrentlyIfPostgres."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not _is_postgres(schema_editor):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        _ensure_not_in_transaction(schema_editor)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            from_model_state = from_state.models[app_label, self.model_name_lower]
+            index = from_model_state.get_index_by_name(self.name)
+            schema_editor.remove_index(model, index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not _is_postgres(schema_editor):
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        _ensure_not_in_transaction(schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            to_model_state = to_state.models[app_label, self.model_name_lower]
+            index = to_model_state.get_index_by_name(self.name)
+            schema_editor.add_index(model, index, concurrently=True)
@@ -0,0 +1,168 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from ninja.errors import HttpError
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+DEFAULT_ORDERING = ("created_at", "id")
+
+
+@dataclass
+class Page:
+    items: List
+    next: Optional[str]
+    prev: Optional[str]
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keeps full microsecond precision, which DjangoJSONEncoder truncates."""
+
+    def default(self, o):
+        if hasattr(o, "isoformat"):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values: Sequence, direction: str, ordering: Sequence[str]) -> str:
+    payload = json.dumps(
+        {"o": ",".join(ordering), "v": list(values), "d": direction}, cls=CursorEncoder
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, model, ordering: Sequence[str]):
+    """
+    Returns (values, direction) for an opaque cursor, raising a 400 if it was
+    tampered with or was issued for a different ordering.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        raw_values, direction = payload["v"], payload["d"]
+        if direction not in ("n", "p") or payload["o"] != ",".join(ordering):
+            raise ValueError
+        # One non-null value per ordering column, or keyset_filter can't build
+        # its predicate
+        if not isinstance(raw_values, list) or len(raw_values) != len(ordering) or None in raw_values:
+            raise ValueError
+        values = [
+            model._meta.get_field(name.lstrip("-")).to_python(value)
+            for name, value in zip(ordering, raw_values)
+        ]
+        if None in values:
+            raise ValueError
+    except (ValueError, KeyError, TypeError, AttributeError, binascii.Error, ValidationError):
+        raise HttpError(400, "Invalid cursor")
+    return values, direction
+
+
+def keyset_filter(ordering: Sequence[str], values: Sequence, reverse=False) -> Q:
+    """
+    Builds the "rows strictly after `values`" predicate for a multi-column
+    ordering, e.g. for ("created_at", "id"):
+
+        created_at >= v0 AND (created_at > v0 OR (created_at = v0 AND id > v1))
+
+    The redundant leading bound lets the planner turn it into an index range
+    scan instead of filtering the OR branches row by row.
+    """
+    names = [field.lstrip("-") for field in ordering]
+    ops = []
+    for field in ordering:
+        descending = field.startswith("-")
+        ops.append("lt" if descending != reverse else "gt")
+
+    condition = Q()
+    for i, name in enumerate(names):
+        clause = Q(**{f"{name}__{ops[i]}": values[i]})
+        for prev_name, prev_value in zip(names[:i], values[:i]):
+            clause &= Q(**{prev_name: prev_value})
+        condition |= clause
+
+    return Q(**{f"{names[0]}__{ops[0]}e": values[0]}) & condition
+
+
+def _reverse_ordering(ordering: Sequence[str]) -> List[str]:
+    return [field[1:] if field.startswith("-") else f"-{field}" for field in ordering]
+
+
+def _row_key(obj, ordering: Sequence[str]) -> List:
+    # Rows are model instances, or dicts when paginating a .values() queryset
+    if isinstance(obj, dict):
+        return [obj[field.lstrip("-")] for field in ordering]
+    return [getattr(obj, field.lstrip("-")) for field in ordering]
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _page_query(queryset, limit, cursor, ordering):
+    direction = "n"
+    if cursor:
+        values, direction = decode_cursor(cursor, queryset.model, ordering)
+
+    if direction == "n":
+        if cursor:
+            queryset = queryset.filter(keyset_filter(ordering, values))
+        return queryset.order_by(*ordering)[: limit + 1], direction
+
+    queryset = queryset.filter(keyset_filter(ordering, values, reverse=True))
+    return queryset.order_by(*_reverse_ordering(ordering))[: limit + 1], direction
+
+
+def _page_from_rows(rows, limit, cursor, ordering, direction) -> Page:
+    def cursor_for(obj, direction):
+        return encode_cursor(_row_key(obj, ordering), direction, ordering)
+
+    has_more = len(rows) > limit
+    if direction == "n":
+        items = rows[:limit]
+        next_cursor = cursor_for(items[-1], "n") if has_more else None
+        prev_cursor = cursor_for(items[0], "p") if cursor and items else None
+    else:
+        items = rows[:limit][::-1]
+        prev_cursor = cursor_for(items[0], "p") if has_more else None
+        next_cursor = cursor_for(items[-1], "n") if items else None
+
+    return Page(items=items, next=next_cursor, prev=prev_cursor)
+
+
+def paginate_keyset(
+    queryset,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    ordering: Sequence[str] = DEFAULT_ORDERING,
+) -> Page:
+    """
+    Cursor (keyset) pagination: every page is a bounded index range scan, so
+    page 1000 costs the same as page 1, unlike OFFSET pagination.
+
+    `ordering` must end in a unique column so that cursors are unambiguous.
+    """
+    limit = clamp_limit(limit)
+    ordering = list(ordering)
+    query, direction = _page_query(queryset, limit, cursor, ordering)
+    return _page_from_rows(list(query), limit, cursor, ordering, direction)
+
+
+async def apaginate_keyset(
+    queryset,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    ordering: Sequence[str] = DEFAULT_ORDERING,
+) -> Page:
+    """Async version of paginate_keyset."""
+    limit = clamp_limit(limit)
+    ordering = list(ordering)
+    query, direction = _page_query(queryset, limit, cursor, ordering)
+    rows = [obj async for obj in query]
+    return _page_from_rows(rows, limit, cursor, ordering, direction)
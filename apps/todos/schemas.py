@@ -1,6 +1,10 @@
 from ninja import Schema
 from pydantic import ConfigDict, Field
 from datetime import datetime
+from typing import List, Literal, Optional
+from apps.todos.pagination import DEFAULT_PAGE_SIZE
+
+MAX_BULK_ITEMS = 1000
 
 class TodoSchema(Schema):
     model_config = ConfigDict(from_attributes=True)
@@ -14,3 +18,62 @@ class TodoCreateSchema(Schema):
     title: str = Field(..., max_length=200)
     description: str
     completed: bool = False
+
+class TodoPatchSchema(Schema):
+    # Omitted fields are left untouched; explicit nulls are rejected because
+    # the defaults are not validated against the (non-optional) types.
+    title: str = Field(None, max_length=200)
+    description: str = None
+    completed: bool = None
+
+class TodoFilterQuery(Schema):
+    completed: Optional[bool] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    q: Optional[str] = Field(None, max_length=200)
+
+class TodoListQuery(TodoFilterQuery):
+    limit: int = Field(DEFAULT_PAGE_SIZE, ge=1)
+    cursor: Optional[str] = None
+    ordering: Literal["created_at", "-created_at", "title", "-title"] = "created_at"
+
+class TodoExportQuery(TodoFilterQuery):
+    format: Literal["ndjson", "csv"] = "ndjson"
+
+class TodoPageSchema(Schema):
+    items: List[TodoSchema]
+    next: Optional[str] = None
+    prev: Optional[str] = None
+
+class TodoBulkCreateSchema(Schema):
+    items: List[TodoCreateSchema] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+class TodoBulkUpdateItemSchema(TodoPatchSchema):
+    id: int
+
+class TodoBulkUpdateSchema(Schema):
+    items: List[TodoBulkUpdateItemSchema] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+class TodoBulkDeleteSchema(Schema):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+class TodoBulkResultSchema(Schema):
+    id: Optional[int] = None
+    status: Literal["created", "updated", "deleted", "not_found"]
+    todo: Optional[TodoSchema] = None
+
+class TodoBulkResponseSchema(Schema):
+    results: List[TodoBulkResultSchema]
+
+class TodoImportErrorSchema(Schema):
+    batch: int
+    line: Optional[int] = None
+    error: str
+
+class TodoImportResultSchema(Schema):
+    imported: int
+    failed: int
+    batches: int
+    elapsed: float
+    rows_per_sec: float
+    errors: List[TodoImportErrorSchema]
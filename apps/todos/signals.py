@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.todos.cache import invalidate_user_todos
+from apps.todos.models import Todo
+
+
+@receiver(post_save, sender=Todo)
+@receiver(post_delete, sender=Todo)
+def invalidate_todo_cache(sender, instance, **kwargs):
+    invalidate_user_todos(instance.user_id)
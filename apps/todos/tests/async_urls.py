@@ -0,0 +1,11 @@
+from django.urls import path
+from ninja import NinjaAPI
+from apps.todos.async_api import api as async_todos_api
+
+# The project urls with TODOS_ASYNC_API turned on
+api = NinjaAPI(csrf=True, urls_namespace='async-api')
+api.add_router('/todos', async_todos_api)
+
+urlpatterns = [
+    path('api/v1/', api.urls),
+]
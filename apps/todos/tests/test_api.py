@@ -1,5 +1,6 @@
 import json
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 from apps.todos.models import Todo
@@ -7,6 +8,7 @@ from apps.todos.models import Todo
 class TodoAPITestCase(TestCase):
 
     def setUp(self):
+        cache.clear()
         self.client = Client()
         # Create two users
         self.user1 = User.objects.create_user(username='user1', password='password1')
@@ -29,8 +31,9 @@ class TodoAPITestCase(TestCase):
         self.client.login(username='user1', password='password1')
         response = self.client.get(self.todo_list_create_url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.json()), 1)
-        self.assertEqual(response.json()[0]['title'], 'User1 Todo')
+        self.assertEqual(len(response.json()['items']), 1)
+        self.assertEqual(response.json()['items'][0]['title'], 'User1 Todo')
+        self.assertIsNone(response.json()['next'])
 
     def test_todo_list_unauthenticated(self):
         # Test listing todos for an unauthenticated user
@@ -113,3 +116,30 @@ class TodoAPITestCase(TestCase):
         self.client.login(username='user2', password='password2')
         response = self.client.get(self.todo_detail_url)
         self.assertEqual(response.status_code, 404)
+
+    def test_todo_patch_authenticated(self):
+        # Test partially updating a todo writes only the supplied fields in one statement
+        self.client.login(username='user1', password='password1')
+        with self.assertNumQueries(3):  # session, user, update ... returning
+            response = self.client.patch(self.todo_detail_url, json.dumps({'completed': True}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['completed'], True)
+        self.assertEqual(response.json()['title'], 'User1 Todo')
+        self.assertEqual(response.json()['created_at'][:19], self.todo1.created_at.isoformat()[:19])
+        self.todo1.refresh_from_db()
+        self.assertEqual(self.todo1.completed, True)
+        self.assertEqual(self.todo1.description, 'Todo description for user1')
+
+    def test_todo_patch_rejects_null(self):
+        # Test that explicit nulls are rejected instead of reaching the database
+        self.client.login(username='user1', password='password1')
+        response = self.client.patch(self.todo_detail_url, json.dumps({'title': None}), content_type='application/json')
+        self.assertEqual(response.status_code, 422)
+
+    def test_todo_patch_another_user_todo(self):
+        # Test that user2 cannot patch user1's todo
+        self.client.login(username='user2', password='password2')
+        response = self.client.patch(self.todo_detail_url, json.dumps({'completed': True}), content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+        self.todo1.refresh_from_db()
+        self.assertEqual(self.todo1.completed, False)
@@ -0,0 +1,94 @@
+import json
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from apps.todos import async_api
+from apps.todos.models import Todo
+
+
+@override_settings(ROOT_URLCONF='apps.todos.tests.async_urls')
+class AsyncTodoAPITestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='user1', password='password1')
+        self.other = User.objects.create_user(username='user2', password='password2')
+        self.todo = Todo.objects.create(user=self.user, title='Todo', description='desc')
+        self.list_url = '/api/v1/todos/'
+        self.detail_url = f'/api/v1/todos/{self.todo.id}'
+        self.client.login(username='user1', password='password1')
+
+    def test_handlers_are_async(self):
+        for handler in (async_api.list_todos, async_api.get_todo, async_api.create_todo,
+                        async_api.update_todo, async_api.delete_todo):
+            self.assertTrue(handler._ninja_operation.is_async)
+
+    def test_list_and_304(self):
+        Todo.objects.create(user=self.other, title='Not mine', description='')
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['title'] for item in response.json()['items']], ['Todo'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        # Same validators as the sync API
+        with self.settings(ROOT_URLCONF='DjTodos.urls'):
+            self.assertEqual(self.client.get(self.list_url)['ETag'], response['ETag'])
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_not_found_has_no_validators(self):
+        response = self.client.get('/api/v1/todos/999999')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_pagination(self):
+        for i in range(3):
+            Todo.objects.create(user=self.user, title=f'Todo {i}', description='')
+        page = self.client.get(self.list_url, {'limit': 2}).json()
+        self.assertEqual(len(page['items']), 2)
+        page = self.client.get(self.list_url, {'limit': 2, 'cursor': page['next']}).json()
+        self.assertEqual([item['title'] for item in page['items']], ['Todo 1', 'Todo 2'])
+        self.assertIsNone(page['next'])
+
+    def test_create_get_update_delete(self):
+        response = self.client.post(
+            self.list_url, json.dumps({'title': 'New', 'description': 'd'}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        todo_id = response.json()['id']
+        self.assertEqual(Todo.objects.get(id=todo_id).user, self.user)
+
+        url = f'/api/v1/todos/{todo_id}'
+        etag = self.client.get(url)['ETag']
+        response = self.client.put(
+            url, json.dumps({'title': 'Renamed', 'description': 'd', 'completed': True}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.json()['title'], 'Renamed')
+        # The write went through the model signals and invalidated the cache
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['completed'])
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_shared_sync_routes(self):
+        response = self.client.patch(self.detail_url, json.dumps({'completed': True}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.delete('/api/v1/todos/bulk', json.dumps({'ids': [self.todo.id]}), content_type='application/json')
+        self.assertEqual(response.json()['results'][0]['status'], 'deleted')
+
+    def test_other_users_todo(self):
+        self.client.login(username='user2', password='password2')
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+        self.assertEqual(self.client.delete(self.detail_url).status_code, 404)
+        self.assertTrue(Todo.objects.filter(id=self.todo.id).exists())
+
+    def test_unauthenticated(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.list_url).status_code, 401)
+        self.assertEqual(self.client.get(self.detail_url).status_code, 401)
@@ -0,0 +1,73 @@
+import json
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, Client
+from apps.todos.models import Todo
+
+
+class TodoBulkAPITestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user1 = User.objects.create_user(username='user1', password='password1')
+        self.user2 = User.objects.create_user(username='user2', password='password2')
+        self.todos = [
+            Todo.objects.create(user=self.user1, title=f'Todo {i}', description='desc') for i in range(3)
+        ]
+        self.other = Todo.objects.create(user=self.user2, title='Other', description='desc')
+        self.url = '/api/v1/todos/bulk'
+        self.client.login(username='user1', password='password1')
+
+    def _send(self, method, data):
+        return getattr(self.client, method)(self.url, json.dumps(data), content_type='application/json')
+
+    def test_bulk_create(self):
+        items = [{'title': f'New {i}', 'description': 'bulk'} for i in range(5)]
+        with self.assertNumQueries(5):  # session, user, savepoint, insert, release
+            response = self._send('post', {'items': items})
+        self.assertEqual(response.status_code, 201)
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['created'] * 5)
+        self.assertEqual([r['todo']['title'] for r in results], [f'New {i}' for i in range(5)])
+        self.assertEqual(Todo.objects.filter(user=self.user1, description='bulk').count(), 5)
+
+    def test_bulk_create_rejects_invalid_item(self):
+        response = self._send('post', {'items': [{'title': 'ok', 'description': ''}, {'title': 'x' * 201, 'description': ''}]})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Todo.objects.count(), 4)
+
+    def test_bulk_update(self):
+        data = {'items': [
+            {'id': self.todos[0].id, 'completed': True},
+            {'id': self.todos[1].id, 'title': 'Renamed'},
+            {'id': self.other.id, 'completed': True},
+            {'id': 999999, 'completed': True},
+        ]}
+        response = self._send('patch', data)
+        self.assertEqual(response.status_code, 200)
+        statuses = [r['status'] for r in response.json()['results']]
+        self.assertEqual(statuses, ['updated', 'updated', 'not_found', 'not_found'])
+
+        for todo in self.todos:
+            todo.refresh_from_db()
+        self.assertTrue(self.todos[0].completed)
+        self.assertEqual(self.todos[0].title, 'Todo 0')
+        self.assertEqual(self.todos[1].title, 'Renamed')
+        self.assertFalse(self.todos[1].completed)
+        self.other.refresh_from_db()
+        self.assertFalse(self.other.completed)
+
+    def test_bulk_delete(self):
+        ids = [self.todos[0].id, self.todos[2].id, self.other.id]
+        response = self._send('delete', {'ids': ids})
+        self.assertEqual(response.status_code, 200)
+        statuses = [r['status'] for r in response.json()['results']]
+        self.assertEqual(statuses, ['deleted', 'deleted', 'not_found'])
+        self.assertEqual(list(Todo.objects.filter(user=self.user1).values_list('id', flat=True)), [self.todos[1].id])
+        self.assertTrue(Todo.objects.filter(id=self.other.id).exists())
+
+    def test_bulk_unauthenticated(self):
+        self.client.logout()
+        response = self._send('delete', {'ids': [self.todos[0].id]})
+        self.assertEqual(response.status_code, 401)
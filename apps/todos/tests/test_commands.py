@@ -0,0 +1,46 @@
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from apps.todos.fake_data import generate_batch
+from apps.todos.models import Todo
+
+
+class CreateTodosCommandTest(TestCase):
+
+    def _run(self, *args, **kwargs):
+        call_command('create_todos', *args, stdout=io.StringIO(), **kwargs)
+
+    def test_defaults_to_first_user(self):
+        user = User.objects.order_by('pk').first()
+        self._run(25, batch_size=10)
+        self.assertEqual(Todo.objects.filter(user=user).count(), 25)
+
+    def test_generates_users_and_spreads_todos(self):
+        self._run(60, users=3, batch_size=25, seed=1)
+        users = User.objects.filter(username__startswith='loadtest_user_')
+        self.assertEqual(users.count(), 3)
+        self.assertEqual(Todo.objects.filter(user__in=users).count(), 60)
+        self.assertEqual(Todo.objects.filter(user__in=users).values('user').distinct().count(), 3)
+        self.assertTrue(users.first().check_password('loadtest'))
+
+        # Existing load test users are reused on a second run
+        self._run(10, users=3, batch_size=25)
+        self.assertEqual(User.objects.filter(username__startswith='loadtest_user_').count(), 3)
+
+    def test_workers_can_be_spawned(self):
+        # A spawned worker imports generate_batch's module without Django set up
+        spawn = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            rows = pool.submit(generate_batch, 3, 5, 2, 42).result()
+        self.assertEqual(rows, generate_batch(3, 5, 2, 42))
+
+    def test_seed_is_reproducible(self):
+        self._run(20, users=2, batch_size=7, seed=42)
+        first = list(Todo.objects.order_by('id').values_list('user__username', 'title', 'created_at'))
+        Todo.objects.all().delete()
+        self._run(20, users=2, batch_size=7, seed=42)
+        second = list(Todo.objects.order_by('id').values_list('user__username', 'title', 'created_at'))
+        self.assertEqual(first, second)
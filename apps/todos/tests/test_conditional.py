@@ -0,0 +1,83 @@
+import json
+import time
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.utils.http import http_date
+from apps.todos.models import Todo
+
+
+class TodoConditionalGetTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='user1', password='password1')
+        self.todo = Todo.objects.create(user=self.user, title='Todo', description='desc')
+        self.list_url = '/api/v1/todos/'
+        self.detail_url = f'/api/v1/todos/{self.todo.id}'
+        self.client.login(username='user1', password='password1')
+
+    def test_list_etag_and_304(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with self.assertNumQueries(2):  # session and user lookups, no todo query
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_depends_on_query(self):
+        etag = self.client.get(self.list_url)['ETag']
+        response = self.client.get(self.list_url, {'completed': 'true'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_write_changes_etag(self):
+        list_etag = self.client.get(self.list_url)['ETag']
+        detail_etag = self.client.get(self.detail_url)['ETag']
+        self.client.patch(self.detail_url, json.dumps({'completed': True}), content_type='application/json')
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['items'][0]['completed'])
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], detail_etag)
+
+    def test_etag_is_per_user(self):
+        etag = self.client.get(self.list_url)['ETag']
+        User.objects.create_user(username='user2', password='password2')
+        self.client.login(username='user2', password='password2')
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unauthenticated_has_no_etag(self):
+        self.client.logout()
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn('ETag', response)
+
+    def test_not_found_has_no_validators(self):
+        response = self.client.get('/api/v1/todos/999999')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_if_modified_since_alone_never_304s(self):
+        # Last-Modified would have one-second resolution: a write in the same
+        # second as the previous read must still be seen
+        self.client.get(self.detail_url)
+        since = http_date(time.time() + 1)
+        self.client.patch(self.detail_url, json.dumps({'title': 'Patched'}), content_type='application/json')
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'Patched')
+
+    def test_invalid_list_query_has_no_validators(self):
+        for params in ({'ordering': 'bogus'}, {'cursor': 'not-a-cursor'}):
+            response = self.client.get(self.list_url, params)
+            self.assertIn(response.status_code, (400, 422))
+            self.assertNotIn('ETag', response)
@@ -0,0 +1,57 @@
+import csv
+import gzip
+import io
+import json
+from django.contrib.auth.models import User
+from django.test import TestCase, Client
+from apps.todos.models import Todo
+
+
+class TodoExportTestCase(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='user1', password='password1')
+        other = User.objects.create_user(username='user2', password='password2')
+        Todo.objects.bulk_create(
+            Todo(user=self.user, title=f'Todo {i}', description='line one\nline "two"', completed=i % 2 == 0)
+            for i in range(25)
+        )
+        Todo.objects.create(user=other, title='Other', description='')
+        self.url = '/api/v1/todos/export'
+        self.client.login(username='user1', password='password1')
+
+    def _body(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_ndjson(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self._body(response).decode().splitlines()]
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[0]['title'], 'Todo 0')
+        self.assertEqual(rows[0]['description'], 'line one\nline "two"')
+        self.assertEqual(set(rows[0]), {'id', 'title', 'description', 'completed', 'created_at'})
+
+    def test_csv_with_filter(self):
+        response = self.client.get(self.url, {'format': 'csv', 'completed': 'true'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(self._body(response).decode())))
+        self.assertEqual(len(rows), 13)
+        self.assertEqual(rows[0]['description'], 'line one\nline "two"')
+
+    def test_gzip(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(self._body(response)).decode().splitlines()
+        self.assertEqual(len(lines), 25)
+
+    def test_gzip_refused(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(len(self._body(response).decode().splitlines()), 25)
+
+    def test_unauthenticated(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
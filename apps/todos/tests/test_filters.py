@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, Client
+from apps.todos.models import Todo
+
+
+class TodoFilterTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='user1', password='password1')
+        other = User.objects.create_user(username='user2', password='password2')
+
+        self.milk = Todo.objects.create(user=self.user, title='Buy milk', description='From the corner shop')
+        self.report = Todo.objects.create(user=self.user, title='Write report', description='Quarterly numbers', completed=True)
+        self.call = Todo.objects.create(user=self.user, title='Call mom', description='About the shop opening')
+        Todo.objects.create(user=other, title='Buy milk', description='Not yours')
+
+        Todo.objects.filter(id=self.milk.id).update(created_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        Todo.objects.filter(id=self.report.id).update(created_at=datetime(2024, 2, 1, tzinfo=timezone.utc))
+        Todo.objects.filter(id=self.call.id).update(created_at=datetime(2024, 3, 1, tzinfo=timezone.utc))
+
+        self.url = '/api/v1/todos/'
+        self.client.login(username='user1', password='password1')
+
+    def _ids(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()['items']]
+
+    def test_filter_completed(self):
+        self.assertEqual(self._ids({'completed': 'true'}), [self.report.id])
+        self.assertEqual(self._ids({'completed': 'false'}), [self.milk.id, self.call.id])
+
+    def test_filter_created_range(self):
+        params = {'created_after': '2024-01-15T00:00:00Z', 'created_before': '2024-03-01T00:00:00Z'}
+        self.assertEqual(self._ids(params), [self.report.id])
+
+    def test_ordering(self):
+        self.assertEqual(self._ids({'ordering': '-created_at'}), [self.call.id, self.report.id, self.milk.id])
+        self.assertEqual(self._ids({'ordering': 'title'}), [self.milk.id, self.call.id, self.report.id])
+
+    def test_invalid_ordering(self):
+        response = self.client.get(self.url, {'ordering': 'description'})
+        self.assertEqual(response.status_code, 422)
+
+    def test_search(self):
+        self.assertEqual(self._ids({'q': 'shop'}), [self.milk.id, self.call.id])
+        self.assertEqual(self._ids({'q': 'milk corner'}), [self.milk.id])
+
+    def test_cursor_is_tied_to_ordering(self):
+        response = self.client.get(self.url, {'ordering': 'title', 'limit': 1})
+        cursor = response.json()['next']
+        self.assertEqual(self._ids({'ordering': 'title', 'limit': 1, 'cursor': cursor}), [self.call.id])
+        response = self.client.get(self.url, {'ordering': 'created_at', 'cursor': cursor})
+        self.assertEqual(response.status_code, 400)
@@ -1,4 +1,7 @@
-from django.test import TestCase
+from contextvars import copy_context
+from unittest import mock
+from django.db import connection
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from apps.todos.models import Todo
 
@@ -84,3 +87,14 @@ class TodoModelTest(TestCase):
         self.todo.save()
         updated_todo = Todo.objects.get(id=self.todo.id)
         self.assertEqual(updated_todo.created_at, original_created_at)
+
+    @override_settings(DB_REPLICAS=['replica_0'])
+    def test_update_returning_writes_to_the_primary(self):
+        # replica_0 isn't a configured database: any query routed there fails
+        def update(title):
+            todos = Todo.objects.filter(user=self.user)
+            return [todo.title for todo in todos.update_returning(title=title)]
+
+        self.assertEqual(copy_context().run(update, "Returning"), ["Returning"])
+        with mock.patch.object(connection, "vendor", "mysql"):  # update() then SELECT
+            self.assertEqual(copy_context().run(update, "Fallback"), ["Fallback"])
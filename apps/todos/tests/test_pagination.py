@@ -0,0 +1,86 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, Client
+from apps.todos.models import Todo
+from apps.todos.pagination import MAX_PAGE_SIZE
+
+
+class TodoPaginationTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='user1', password='password1')
+        other = User.objects.create_user(username='user2', password='password2')
+
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        todos = [
+            # Pairs of todos share a timestamp so the id tie-breaker is exercised
+            Todo(user=self.user, title=f'Todo {i}', description='', created_at=base + timedelta(minutes=i // 2))
+            for i in range(7)
+        ]
+        todos.append(Todo(user=other, title='Other', description='', created_at=base))
+        Todo.objects.bulk_create(todos)
+        # created_at is auto_now_add, so bulk_create overwrote our timestamps
+        for i, todo in enumerate(Todo.objects.filter(user=self.user).order_by('id')):
+            Todo.objects.filter(id=todo.id).update(created_at=base + timedelta(minutes=i // 2))
+
+        self.expected = list(
+            Todo.objects.filter(user=self.user).order_by('created_at', 'id').values_list('id', flat=True)
+        )
+        self.url = '/api/v1/todos/'
+        self.client.login(username='user1', password='password1')
+
+    def _ids(self, response):
+        return [item['id'] for item in response.json()['items']]
+
+    def test_walk_forward_and_back(self):
+        seen = []
+        response = self.client.get(self.url, {'limit': 3})
+        self.assertIsNone(response.json()['prev'])
+        pages = [response.json()]
+        while True:
+            seen.extend(self._ids(response))
+            cursor = response.json()['next']
+            if not cursor:
+                break
+            response = self.client.get(self.url, {'limit': 3, 'cursor': cursor})
+            pages.append(response.json())
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(pages), 3)
+
+        # Follow prev from the last page back to the first
+        response = self.client.get(self.url, {'limit': 3, 'cursor': pages[-1]['prev']})
+        self.assertEqual(self._ids(response), self.expected[3:6])
+        response = self.client.get(self.url, {'limit': 3, 'cursor': response.json()['prev']})
+        self.assertEqual(self._ids(response), self.expected[0:3])
+        self.assertIsNone(response.json()['prev'])
+
+    def test_limit_is_capped(self):
+        Todo.objects.bulk_create(
+            Todo(user=self.user, title='Bulk', description='') for _ in range(MAX_PAGE_SIZE)
+        )
+        response = self.client.get(self.url, {'limit': MAX_PAGE_SIZE * 10})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['items']), MAX_PAGE_SIZE)
+        self.assertIsNotNone(response.json()['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_tampered_cursor_values(self):
+        for values in (['2024-01-01T00:00:00Z'], [None, None], '2024-01-01T00:00:00Z', ['', 1]):
+            payload = json.dumps({'o': 'created_at,id', 'v': values, 'd': 'n'})
+            cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+            response = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(response.status_code, 400, values)
+
+    def test_constant_query_count(self):
+        response = self.client.get(self.url, {'limit': 2})
+        cursor = response.json()['next']
+        with self.assertNumQueries(3):  # session, user, page
+            self.client.get(self.url, {'limit': 2, 'cursor': cursor})
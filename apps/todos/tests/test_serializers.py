@@ -0,0 +1,46 @@
+import json
+from datetime import datetime, timezone
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import TestCase
+from ninja.responses import NinjaJSONEncoder
+from apps.todos import serializers
+from apps.todos.models import Todo
+from apps.todos.pagination import paginate_keyset
+from apps.todos.schemas import TodoPageSchema
+from apps.todos.serializers import TODO_FIELDS, dumps_page, format_datetime
+
+
+class TodoSerializerTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', password='password1')
+        for i in range(5):
+            Todo.objects.create(user=self.user, title=f'Todo "{i}" é', description='line\nbreak', completed=i % 2 == 0)
+        # Whole seconds are rendered without a fraction
+        Todo.objects.filter(title__startswith='Todo "0"').update(
+            created_at=datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        )
+
+    def expected(self, limit):
+        page = paginate_keyset(Todo.objects.all(), limit=limit)
+        return json.loads(json.dumps(TodoPageSchema.from_orm(page).dict(), cls=NinjaJSONEncoder))
+
+    def fast(self, limit):
+        page = paginate_keyset(Todo.objects.values(*TODO_FIELDS), limit=limit)
+        return json.loads(dumps_page(page))
+
+    def test_same_output_as_schema(self):
+        # Cursors included: they are computed from the same row values
+        self.assertEqual(self.fast(3), self.expected(3))
+        self.assertEqual(self.fast(10), self.expected(10))
+
+    def test_without_orjson(self):
+        with mock.patch.object(serializers, 'orjson', None):
+            self.assertEqual(self.fast(10), self.expected(10))
+
+    def test_format_datetime(self):
+        self.assertEqual(
+            format_datetime(datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=timezone.utc)), '2024-05-06T07:08:09.123Z'
+        )
+        self.assertEqual(format_datetime(datetime(2024, 5, 6, 7, 8, 9, tzinfo=timezone.utc)), '2024-05-06T07:08:09Z')
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from apps.users.hashing import run_hashing
+
+# The hashers below take their cost parameters from settings (see
+# PASSWORD_HASHER in DjTodos/settings.py) and never go below these floors,
+# so a typo in the environment can't silently weaken stored hashes. Raising
+# a parameter rehashes each password on its owner's next login.
+
+PBKDF2_MIN_ITERATIONS = hashers.PBKDF2PasswordHasher.iterations
+# OWASP's minimum for scrypt: N=2**17 (128 MiB per hash with r=8), p=1.
+# Django's own default, 2**14, is below it.
+SCRYPT_MIN_WORK_FACTOR = 2**17
+# OWASP's minimum for argon2id: 19 MiB, 2 iterations, 1 lane
+ARGON2_MIN_MEMORY_COST = 19456
+ARGON2_MIN_TIME_COST = 2
+
+
+class PooledHasherMixin:
+    """Runs encode and verify on the password hashing pool (PASSWORD_HASH_WORKERS)."""
+
+    def encode(self, password, salt, *args, **kwargs):
+        return run_hashing(super().encode, password, salt, *args, **kwargs)
+
+    def verify(self, password, encoded):
+        return run_hashing(super().verify, password, encoded)
+
+
+class PBKDF2PasswordHasher(PooledHasherMixin, hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return max(settings.PASSWORD_PBKDF2_ITERATIONS, PBKDF2_MIN_ITERATIONS)
+
+
+class ScryptPasswordHasher(PooledHasherMixin, hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return max(settings.PASSWORD_SCRYPT_WORK_FACTOR, SCRYPT_MIN_WORK_FACTOR)
+
+    @property
+    def maxmem(self):
+        # scrypt needs 128 * r * N bytes; OpenSSL refuses more than 32 MiB
+        # unless told otherwise
+        return 2 * 128 * self.block_size * self.work_factor
+
+
+class Argon2PasswordHasher(PooledHasherMixin, hashers.Argon2PasswordHasher):
+    """Needs the argon2-cffi package."""
+
+    @property
+    def time_cost(self):
+        return max(settings.PASSWORD_ARGON2_TIME_COST, ARGON2_MIN_TIME_COST)
+
+    @property
+    def memory_cost(self):
+        return max(settings.PASSWORD_ARGON2_MEMORY_COST, ARGON2_MIN_MEMORY_COST)
+
+    @property
+    def parallelism(self):
+        return max(settings.PASSWORD_ARGON2_PARALLELISM, 1)
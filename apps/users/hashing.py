@@ -0,0 +1,67 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+class PasswordHashingBusy(Exception):
+    """Every hashing worker is busy and the queue in front of them is full."""
+
+
+_local = threading.local()
+
+
+class HashingPool:
+    """
+    Runs password hashing on at most `workers` threads, with at most
+    `max_pending` more hashes queued behind them; beyond that callers get
+    PasswordHashingBusy right away instead of piling up.
+
+    PBKDF2, scrypt and argon2 all release the GIL while hashing, so the
+    workers run in parallel, while the cap leaves the other cores to the
+    request threads serving everything but logins.
+    """
+
+    def __init__(self, workers, max_pending):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hashing")
+        self.slots = threading.BoundedSemaphore(workers + max_pending)
+
+    def run(self, func, *args, **kwargs):
+        if not self.slots.acquire(blocking=False):
+            raise PasswordHashingBusy
+        try:
+            return self.executor.submit(_in_worker, func, *args, **kwargs).result()
+        finally:
+            self.slots.release()
+
+
+def _in_worker(func, *args, **kwargs):
+    _local.in_pool = True
+    return func(*args, **kwargs)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool, _pool_pid
+    # Worker threads don't survive a fork (uWSGI starts workers that way)
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = HashingPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def run_hashing(func, *args, **kwargs):
+    """
+    Calls func (a hasher's encode or verify) on the hashing pool when
+    PASSWORD_HASH_WORKERS is set, in the calling thread otherwise.
+    """
+    if not settings.PASSWORD_HASH_WORKERS or getattr(_local, "in_pool", False):
+        return func(*args, **kwargs)
+    return get_pool().run(func, *args, **kwargs)
@@ -1,3 +1,122 @@
-from django.test import TestCase
+import json
+import threading
+from hashlib import pbkdf2_hmac
+from unittest import mock
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from apps.users.hashers import PBKDF2PasswordHasher, ScryptPasswordHasher
+from apps.users.hashing import HashingPool, PasswordHashingBusy, run_hashing
 
-# Create your tests here.
+
+class PasswordHasherTest(TestCase):
+
+    def login(self, username, password):
+        return self.client.post(
+            '/api/v1/auth/login/', json.dumps({'username': username, 'password': password}), content_type='application/json'
+        )
+
+    def test_new_passwords_use_the_preferred_hasher(self):
+        user = User.objects.create_user(username='user1', password='password1')
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$600000$'))
+
+    def test_older_hashes_are_upgraded_on_login(self):
+        user = User.objects.create_user(username='user1')
+        user.password = make_password('password1', hasher='pbkdf2_sha1')
+        user.save()
+
+        self.assertEqual(self.login('user1', 'wrong').status_code, 401)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha1$'))
+
+        self.assertEqual(self.login('user1', 'password1').status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+        self.assertTrue(user.check_password('password1'))
+
+    def test_raised_cost_rehashes_on_login(self):
+        user = User.objects.create_user(username='user1', password='password1')
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$600000$'))
+
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=700000):
+            self.assertEqual(self.login('user1', 'password1').status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$700000$'))
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000, PASSWORD_SCRYPT_WORK_FACTOR=2)
+    def test_costs_cannot_go_below_the_floor(self):
+        self.assertEqual(PBKDF2PasswordHasher().iterations, 600000)
+        self.assertEqual(ScryptPasswordHasher().work_factor, 2**17)
+
+    @override_settings(PASSWORD_HASHER='scrypt', PASSWORD_HASHERS=[
+        'apps.users.hashers.ScryptPasswordHasher', 'apps.users.hashers.PBKDF2PasswordHasher',
+    ])
+    def test_preferred_hasher_is_configurable(self):
+        self.assertEqual(get_hasher().algorithm, 'scrypt')
+        self.assertRegex(make_password('password1'), r'^scrypt\$131072\$\w+\$8\$1\$')
+
+
+class HashingPoolTest(TestCase):
+
+    def test_runs_on_worker_threads(self):
+        pool = HashingPool(workers=2, max_pending=0)
+        self.assertTrue(pool.run(threading.current_thread).name.startswith('password-hashing'))
+
+    def test_busy_when_full(self):
+        pool = HashingPool(workers=1, max_pending=1)
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        waiting = [threading.Thread(target=pool.run, args=(block,)) for _ in range(2)]
+        for thread in waiting:
+            thread.start()
+        started.wait(5)
+        try:
+            with self.assertRaises(PasswordHashingBusy):
+                pool.run(lambda: None)
+        finally:
+            release.set()
+            for thread in waiting:
+                thread.join()
+        self.assertEqual(pool.run(lambda: 'free again'), 'free again')
+
+    @override_settings(PASSWORD_HASH_WORKERS=2)
+    def test_hashers_use_the_pool(self):
+        threads = []
+
+        def pbkdf2(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return pbkdf2_hmac(*args, **kwargs)
+
+        with mock.patch('hashlib.pbkdf2_hmac', pbkdf2):
+            user = User.objects.create_user(username='user1', password='password1')
+            self.assertTrue(user.check_password('password1'))
+        self.assertEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith('password-hashing') for name in threads))
+
+    def test_inline_without_workers(self):
+        self.assertIs(run_hashing(threading.current_thread), threading.current_thread())
+
+
+class LoginViewTest(TestCase):
+
+    @mock.patch('apps.users.views.authenticate', side_effect=PasswordHashingBusy)
+    def test_busy_login(self, authenticate):
+        response = self.client.post(
+            '/api/v1/auth/login/', json.dumps({'username': 'user1', 'password': 'x'}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    @mock.patch('apps.users.views.User.objects.create_user', side_effect=PasswordHashingBusy)
+    def test_busy_signup(self, create_user):
+        response = self.client.post(
+            '/api/v1/auth/signup/',
+            json.dumps({'username': 'new', 'email': 'new@example.com', 'password': 'pw', 'password2': 'pw'}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 503)
@@ -6,10 +6,19 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.contrib.auth import authenticate
+from apps.users.hashing import PasswordHashingBusy
 
 # Create your views here.
 
 
+def hashing_busy():
+    return Response(
+        {"detail": "Too many logins at the moment, try again shortly."},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    )
+
+
 class LoginView(APIView):
     permission_classes = [AllowAny]
 
@@ -18,7 +27,10 @@ class LoginView(APIView):
         password = request.data.get("password")
         next_url = request.data.get("next", "/r/dashboard")  # Default redirect
 
-        user = authenticate(username=username, password=password)
+        try:
+            user = authenticate(username=username, password=password)
+        except PasswordHashingBusy:
+            return hashing_busy()
 
         if user is not None:
             login(request, user)
@@ -54,9 +66,12 @@ class SignupView(APIView):
                 {"detail": "Email already exists"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        user = User.objects.create_user(
-            username=username, email=email, password=password
-        )
+        try:
+            user = User.objects.create_user(
+                username=username, email=email, password=password
+            )
+        except PasswordHashingBusy:
+            return hashing_busy()
 
         return Response(
             {"user": "User created successfully"}, status=status.HTTP_201_CREATED
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Tuple
+
+from django.conf import settings
+
+
+class ViteManifestError(Exception):
+    pass
+
+
+class ViteManifest:
+    """
+    Process-level cache of a parsed Vite manifest and of the HTML rendered for
+    each entry point. The file is only re-read when its mtime or size changes,
+    so a page view costs one stat() and a dictionary lookup.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._manifest = {}
+        self._tags = {}
+        self._links = {}
+
+    def _current_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self):
+        stamp = self._current_stamp()
+        if stamp is not None and stamp == self._stamp:
+            return
+        with self._lock:
+            if stamp is not None and stamp == self._stamp:
+                return
+            try:
+                with open(self.path, "r") as fd:
+                    manifest = json.load(fd)
+            except (OSError, ValueError):
+                raise ViteManifestError(
+                    f"Vite manifest file not found or invalid. Maybe your {self.path} file is empty?"
+                )
+            assets = {name: collect_assets(manifest, name) for name in manifest}
+            self._tags = {name: render_assets(entry) for name, entry in assets.items()}
+            self._links = {name: link_header(entry) for name, entry in assets.items()}
+            self._manifest = manifest
+            self._stamp = stamp
+
+    @property
+    def manifest(self):
+        self._load()
+        return self._manifest
+
+    @property
+    def stamp(self):
+        """Changes whenever the manifest file does; used to rebuild derived caches."""
+        self._load()
+        return self._stamp
+
+    def resolve(self, entry):
+        """
+        Maps an entry name as used in templates ("index", "auth") to its
+        manifest key ("index.html"). Full manifest keys are accepted as is.
+        """
+        manifest = self.manifest
+        for name in (entry, f"{entry}.html"):
+            if manifest.get(name, {}).get("isEntry"):
+                return name
+        raise ViteManifestError(f"Entry {entry!r} not found in {self.path}")
+
+    def render(self, entry="index"):
+        name = self.resolve(entry)
+        return self._tags[name]
+
+    def link_header(self, entry="index"):
+        """Value for an HTTP Link header preloading everything the entry needs."""
+        name = self.resolve(entry)
+        return self._links[name]
+
+
+@dataclass(frozen=True)
+class EntryAssets:
+    script: str
+    # Files of every chunk statically imported by the entry, dependencies first
+    modules: Tuple[str, ...]
+    # CSS of the entry and of all those chunks
+    css: Tuple[str, ...]
+    # Lazily imported chunks, only fetched at idle priority
+    prefetch: Tuple[str, ...]
+
+
+def collect_assets(manifest, name):
+    """
+    Walks the static import graph of `name` transitively and de-duplicates it,
+    so the browser can fetch every module up front instead of discovering them
+    one import level at a time.
+    """
+    static = []
+    seen = {name}
+
+    def walk(chunk_name):
+        for dependency in manifest[chunk_name].get("imports", []):
+            if dependency not in seen:
+                seen.add(dependency)
+                walk(dependency)
+                static.append(dependency)
+
+    walk(name)
+
+    css = []
+    for chunk_name in static + [name]:
+        for file in manifest[chunk_name].get("css", []):
+            if file not in css:
+                css.append(file)
+
+    dynamic = []
+    for chunk_name in [name] + static:
+        for dependency in manifest[chunk_name].get("dynamicImports", []):
+            if dependency not in seen and dependency not in dynamic:
+                dynamic.append(dependency)
+
+    return EntryAssets(
+        script=manifest[name]["file"],
+        modules=tuple(manifest[chunk_name]["file"] for chunk_name in static),
+        css=tuple(css),
+        prefetch=tuple(manifest[chunk_name]["file"] for chunk_name in dynamic),
+    )
+
+
+def render_assets(assets):
+    static_url = settings.STATIC_URL
+    tags = [f'<link rel="stylesheet" type="text/css" href="{static_url}{file}" />' for file in assets.css]
+    tags += [f'<link rel="modulepreload" href="{static_url}{file}" />' for file in assets.modules]
+    if settings.VITE_PREFETCH_DYNAMIC_IMPORTS:
+        tags += [f'<link rel="prefetch" href="{static_url}{file}" />' for file in assets.prefetch]
+    tags.append(f'<script type="module" src="{static_url}{assets.script}"></script>')
+    return "\n        ".join(tags)
+
+
+def link_header(assets):
+    static_url = settings.STATIC_URL
+    links = [f"<{static_url}{file}>; rel=preload; as=style" for file in assets.css]
+    links.append(f"<{static_url}{assets.script}>; rel=modulepreload")
+    links += [f"<{static_url}{file}>; rel=modulepreload" for file in assets.modules]
+    return ", ".join(links)
+
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest():
+    path = os.path.join(settings.FRONTEND_BUILD_DIR, ".vite", "manifest.json")
+    manifest = _manifests.get(path)
+    if manifest is None:
+        with _manifests_lock:
+            manifest = _manifests.setdefault(path, ViteManifest(path))
+    return manifest
@@ -0,0 +1,264 @@
+import mimetypes
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from apps.vite_integration.manifest import ViteManifestError, get_manifest
+from DjTodos.http import accepted_encodings
+
+# Vite writes its build output to build.assetsDir with a content hash in every
+# name (assets/index-BcLxC5Ei.js); such a file never changes, so browsers may
+# keep it forever without revalidating. Names elsewhere, like Django admin's
+# admin/img/icon-calendar.svg, may look hashed but aren't.
+VITE_ASSETS_DIR = "assets/"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Preferred first when the client accepts several
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class StaticFile:
+    stamp: Tuple[int, int]
+    content_type: str
+    etag: str
+    last_modified: str
+    # Content-Encoding -> (path, size), identity included as ""
+    variants: Dict[str, Tuple[str, int]]
+
+
+_manifest_files = {}
+
+
+def _vite_manifest_files():
+    """Every file the current Vite manifest lists, computed once per build."""
+    try:
+        manifest = get_manifest()
+        stamp = manifest.stamp
+    except ViteManifestError:
+        return frozenset()
+    files = _manifest_files.get(stamp)
+    if files is None:
+        files = frozenset(
+            file
+            for chunk in manifest.manifest.values()
+            for file in (chunk.get("file"), *chunk.get("css", ()), *chunk.get("assets", ()))
+            if file
+        )
+        _manifest_files.clear()
+        _manifest_files[stamp] = files
+    return files
+
+
+def is_immutable(name):
+    """
+    Whether the static file `name` has a content hash in its name: Vite build
+    output, or a name hashed by ManifestStaticFilesStorage.
+    """
+    if name.startswith(VITE_ASSETS_DIR) or name in _vite_manifest_files():
+        return True
+    if isinstance(staticfiles_storage, ManifestFilesMixin):
+        return name in staticfiles_storage.hashed_files.values()
+    return False
+
+
+def _parse_range(header, size):
+    """
+    Returns (start, end) inclusive for a single byte range, None to ignore the
+    header (multiple or malformed ranges get the full file), or False when it
+    can't be satisfied.
+    """
+    match = RANGE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        return False
+    if start > end:
+        return None
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+class StaticFilesMiddleware:
+    """
+    Serves STATIC_URL from STATIC_ROOT ahead of the rest of the middleware
+    stack, for deployments where uWSGI itself answers static requests.
+
+    - Picks the precompressed .br/.gz sibling written at collectstatic time
+      (see CompressedStaticFilesStorage) from Accept-Encoding
+    - Marks content-hashed files immutable (see is_immutable); anything else
+      gets a short max-age and is revalidated with its ETag/Last-Modified
+    - Answers single byte-range requests with 206 from the uncompressed file
+
+    Enabled by SERVE_STATIC. Under DEBUG, runserver serves static files itself.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SERVE_STATIC:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.root = os.path.realpath(settings.STATIC_ROOT)
+        self.max_age = settings.STATIC_MAX_AGE
+        self._files = {}
+        self._lock = threading.Lock()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def is_static(self, request):
+        return request.path_info.startswith(self.prefix) and request.method in ("GET", "HEAD")
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.is_static(request):
+            response = self.serve(request, request.path_info[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Under ASGI only static requests pay for a thread hop (file I/O)
+        if self.is_static(request):
+            response = await sync_to_async(self.serve)(request, request.path_info[len(self.prefix):])
+            if response is not None:
+                return response
+        return await self.get_response(request)
+
+    def resolve(self, name):
+        path = os.path.realpath(os.path.join(self.root, name))
+        if not path.startswith(self.root + os.sep):
+            return None
+        return path
+
+    def get_file(self, path):
+        """
+        Stats the file on each request, so a new collectstatic is picked up
+        without a restart, but only looks for compressed siblings again when
+        the file itself changed.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        static_file = self._files.get(path)
+        if static_file is None or static_file.stamp != stamp:
+            variants = {"": (path, stat.st_size)}
+            for encoding, suffix in ENCODINGS:
+                try:
+                    sibling = os.stat(path + suffix)
+                except OSError:
+                    continue
+                if sibling.st_mtime_ns >= stat.st_mtime_ns:
+                    variants[encoding] = (path + suffix, sibling.st_size)
+            content_type, _ = mimetypes.guess_type(path)
+            static_file = StaticFile(
+                stamp=stamp,
+                content_type=content_type or "application/octet-stream",
+                etag='"%x-%x"' % stamp,
+                last_modified=http_date(stat.st_mtime),
+                variants=variants,
+            )
+            with self._lock:
+                self._files[path] = static_file
+        return static_file
+
+    def serve(self, request, name):
+        path = self.resolve(name)
+        static_file = path and self.get_file(path)
+        if not static_file:
+            return None
+
+        range_header = request.META.get("HTTP_RANGE")
+        encoding = ""
+        if not range_header:
+            accepted = accepted_encodings(request)
+            encoding = next((e for e, _ in ENCODINGS if e in accepted and e in static_file.variants), "")
+        file_path, size = static_file.variants[encoding]
+        etag = static_file.etag if not encoding else static_file.etag[:-1] + '-%s"' % encoding
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=static_file.stamp[0] // 10**9
+        )
+        if response is None and range_header:
+            response = self.range_response(request, range_header, file_path, size, etag)
+        if response is None:
+            if request.method == "HEAD":
+                response = HttpResponse(content_type=static_file.content_type)
+            else:
+                response = FileResponse(open(file_path, "rb"), content_type=static_file.content_type)
+                # FileResponse derives one from the name of the .gz/.br sibling
+                del response["Content-Disposition"]
+            response["Content-Length"] = str(size)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = static_file.last_modified
+        response["Accept-Ranges"] = "bytes"
+        response["Cache-Control"] = IMMUTABLE if is_immutable(name) else f"public, max-age={self.max_age}"
+        if response.status_code in (200, 206):
+            response["Content-Type"] = static_file.content_type
+        if encoding:
+            response["Content-Encoding"] = encoding
+        if len(static_file.variants) > 1:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+    def range_response(self, request, header, path, size, etag):
+        # A stale If-Range means the client's partial copy is outdated
+        if_range = request.META.get("HTTP_IF_RANGE")
+        if if_range and if_range != etag:
+            return None
+        byte_range = _parse_range(header, size)
+        if byte_range is None:
+            return None
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        start, end = byte_range
+        length = end - start + 1
+        if request.method == "HEAD":
+            response = HttpResponse(status=206)
+        else:
+            response = StreamingHttpResponse(_read_range(path, start, length), status=206)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(length)
+        return response
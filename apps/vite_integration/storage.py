@@ -0,0 +1,51 @@
+import gzip
+
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # optional, only .gz siblings are written without it
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".js", ".mjs", ".css", ".html", ".json", ".map", ".svg", ".txt", ".xml", ".wasm")
+
+# Skip files where compression saves too little to be worth a second lookup
+MIN_SIZE = 256
+MIN_RATIO = 0.95
+
+
+def compressors():
+    yield ".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield ".br", lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedStaticFilesStorage(StaticFilesStorage):
+    """
+    Writes .gz (and, with the brotli package, .br) siblings next to every
+    compressible file at collectstatic time, at maximum compression, so
+    StaticFilesMiddleware never compresses anything at request time.
+
+    Names are kept as is: Vite already puts content hashes in them and
+    manifest.json refers to those names.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        for name in paths:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(name) as f:
+                data = f.read()
+            for suffix, compress in compressors():
+                # A sibling left by a previous build would be served instead
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                if len(data) < MIN_SIZE:
+                    continue
+                compressed = compress(data)
+                if len(compressed) <= len(data) * MIN_RATIO:
+                    self._save(name + suffix, ContentFile(compressed))
+            yield name, name, True
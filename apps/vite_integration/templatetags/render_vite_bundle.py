@@ -1,48 +1,26 @@
 # This template tag is needed for production
 # Add it to one of your django apps (/appdir/templatetags/render_vite_bundle.py, for example)
 
-import json
-
 from django import template
-from django.conf import settings
 from django.utils.safestring import mark_safe
 
+from apps.vite_integration.manifest import get_manifest
+
 register = template.Library()
 
 
 @register.simple_tag
-def render_vite_bundle():
+def render_vite_bundle(entry="index"):
     """
-    Template tag to render a vite bundle.
+    Template tag to render a vite bundle, e.g. {% render_vite_bundle "auth" %}.
     Supposed to only be used in production.
     For development, see other files.
+
+    `entry` names one of the inputs in vite.config.ts; each page only loads
+    the chunks its own entry imports.
+
+    The manifest is parsed once per process (and again only when the file
+    changes), with the tags for every entry rendered up front.
     """
 
-    try:
-        fd = open(f"{settings.FRONTEND_BUILD_DIR}/.vite/manifest.json", "r")
-        manifest = json.load(fd)
-    except Exception:
-        raise Exception(
-            f"Vite manifest file not found or invalid. Maybe your {settings.FRONTEND_BUILD_DIR}/.vite/manifest.json file is empty?"
-        )
-    if 'imports' in manifest["index.html"]:
-
-        imports_files = "".join(
-            [
-                f'<script type="module" src="/static/{manifest[file]["file"]}"></script>'
-                for file in manifest["index.html"]["imports"]
-            ]
-        )
-    else:
-        imports_files = ''
-    
-    if "css" in manifest["index.html"]:
-        css_file = f"""<link rel="stylesheet" type="text/css" href="/static/{manifest['index.html']['css'][0]}" />"""
-    else:
-        css_file = ''
-
-    return mark_safe(
-        f"""<script type="module" src="/static/{manifest['index.html']['file']}"></script>
-        {css_file}
-        {imports_files}"""
-    )
+    return mark_safe(get_manifest().render(entry))
@@ -0,0 +1,355 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.vite_integration.manifest import ViteManifestError, get_manifest
+
+MANIFEST = {
+    "index.html": {
+        "file": "assets/index-abc123.js",
+        "src": "index.html",
+        "isEntry": True,
+        "imports": ["_vendor-def456.js", "_ui-ccc333.js"],
+        "dynamicImports": ["pages/Todo/index.tsx"],
+        "css": ["assets/index-aaa111.css"],
+    },
+    "auth.html": {
+        "file": "assets/auth-a1b2c3.js",
+        "src": "auth.html",
+        "isEntry": True,
+        "imports": ["_vendor-def456.js"],
+        "dynamicImports": ["pages/Auth/Login.tsx"],
+    },
+    "_vendor-def456.js": {"file": "assets/vendor-def456.js"},
+    "_ui-ccc333.js": {
+        "file": "assets/ui-ccc333.js",
+        "imports": ["_vendor-def456.js", "_icons-eee555.js"],
+        "css": ["assets/ui-bbb222.css"],
+    },
+    "_icons-eee555.js": {"file": "assets/icons-eee555.js"},
+    "pages/Auth/Login.tsx": {
+        "file": "assets/Login-987zyx.js",
+        "isDynamicEntry": True,
+        "imports": ["_vendor-def456.js"],
+    },
+    "pages/Todo/index.tsx": {
+        "file": "assets/index-fff666.js",
+        "isDynamicEntry": True,
+        "imports": ["_vendor-def456.js"],
+        "css": ["assets/todo-ddd444.css"],
+    },
+}
+
+
+class ViteTestMixin:
+
+    def setUp(self):
+        super().setUp()
+        self.build_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.build_dir, ".vite"))
+        self.manifest_path = os.path.join(self.build_dir, ".vite", "manifest.json")
+        self.write_manifest(MANIFEST)
+        self.settings_override = override_settings(FRONTEND_BUILD_DIR=self.build_dir)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.build_dir)
+        super().tearDown()
+
+    def write_manifest(self, manifest, mtime=None):
+        with open(self.manifest_path, "w") as f:
+            json.dump(manifest, f)
+        if mtime is not None:
+            os.utime(self.manifest_path, (mtime, mtime))
+
+
+class RenderViteBundleTest(ViteTestMixin, SimpleTestCase):
+
+    def render(self, entry=""):
+        return Template("{% load render_vite_bundle %}{% render_vite_bundle " + entry + " %}").render(Context())
+
+    def test_renders_entry_css_and_imports(self):
+        html = self.render()
+        self.assertIn('<script type="module" src="/static/assets/index-abc123.js"></script>', html)
+        self.assertIn('href="/static/assets/index-aaa111.css"', html)
+        self.assertIn('<link rel="modulepreload" href="/static/assets/vendor-def456.js" />', html)
+
+    def test_walks_the_static_import_graph(self):
+        html = self.render()
+        # Transitive imports are preloaded once each, dependencies first
+        preloads = [line for line in html.split("\n") if "modulepreload" in line]
+        self.assertEqual(
+            [line.split('href="/static/')[1].split('"')[0] for line in preloads],
+            ["assets/vendor-def456.js", "assets/icons-eee555.js", "assets/ui-ccc333.js"],
+        )
+        # CSS of imported chunks is included, lazily imported pages are not
+        self.assertIn('href="/static/assets/ui-bbb222.css"', html)
+        self.assertNotIn("todo-ddd444.css", html)
+        self.assertNotIn("index-fff666.js", html)
+
+    def test_prefetch_dynamic_imports(self):
+        with self.settings(VITE_PREFETCH_DYNAMIC_IMPORTS=True):
+            self.write_manifest(MANIFEST, mtime=os.path.getmtime(self.manifest_path) + 10)
+            html = self.render()
+        self.assertIn('<link rel="prefetch" href="/static/assets/index-fff666.js" />', html)
+
+    def test_manifest_is_parsed_once(self):
+        self.render()
+        with mock.patch("apps.vite_integration.manifest.json.load", wraps=json.load) as load:
+            self.render()
+            self.render()
+        load.assert_not_called()
+
+    def test_reloads_when_file_changes(self):
+        self.render()
+        changed = json.loads(json.dumps(MANIFEST))
+        changed["index.html"]["file"] = "assets/index-new999.js"
+        self.write_manifest(changed, mtime=os.path.getmtime(self.manifest_path) + 10)
+        self.assertIn("assets/index-new999.js", self.render())
+
+    def test_named_entry(self):
+        html = self.render('"auth"')
+        self.assertIn('<script type="module" src="/static/assets/auth-a1b2c3.js"></script>', html)
+        self.assertIn("assets/vendor-def456.js", html)
+        # Nothing from the main entry's graph
+        self.assertNotIn("index-abc123.js", html)
+        self.assertNotIn("ui-ccc333.js", html)
+        self.assertNotIn(".css", html)
+        # Manifest keys work too
+        self.assertEqual(html, self.render('"auth.html"'))
+
+    def test_unknown_entry(self):
+        with self.assertRaises(ViteManifestError):
+            self.render('"admin"')
+        # Chunks that aren't entry points can't be rendered on their own
+        with self.assertRaises(ViteManifestError):
+            self.render('"_vendor-def456.js"')
+
+    def test_missing_manifest(self):
+        os.remove(self.manifest_path)
+        with self.assertRaises(ViteManifestError):
+            get_manifest().render()
+
+
+class SPAShellDevServerTest(TestCase):
+
+    @override_settings(VITE_PRERENDER_SHELL=False, DEBUG=True, INTERNAL_IPS=["127.0.0.1"])
+    def test_dev_server_module_per_entry(self):
+        response = self.client.get("/r/login")
+        self.assertIn(b"http://127.0.0.1:9900/auth.tsx", response.content)
+        self.assertNotIn(b"main.tsx", response.content)
+
+
+@override_settings(VITE_PRERENDER_SHELL=True)
+class SPAShellViewTest(ViteTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="user1", password="password1")
+
+    def test_public_shell_and_304(self):
+        response = self.client.get("/r/login/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"/static/assets/auth-a1b2c3.js", response.content)
+        self.assertNotIn(b"@vite/client", response.content)
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        self.assertEqual(
+            response["Link"],
+            "</static/assets/auth-a1b2c3.js>; rel=modulepreload, "
+            "</static/assets/vendor-def456.js>; rel=modulepreload",
+        )
+        etag = response["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+
+        response = self.client.get("/r/signup", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_protected_shell_requires_login(self):
+        response = self.client.get("/r/todo")
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response["Location"].startswith("/r/login/"))
+
+        self.client.login(username="user1", password="password1")
+        response = self.client.get("/r/todo")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"/static/assets/index-abc123.js", response.content)
+        self.assertNotIn(b"auth-a1b2c3.js", response.content)
+        self.assertIn("</static/assets/ui-bbb222.css>; rel=preload; as=style", response["Link"])
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        etag = response["ETag"]
+        self.assertNotEqual(etag, self.client.get("/r/login").get("ETag"))
+
+        self.client.logout()
+        self.assertEqual(self.client.get("/r/todo", HTTP_IF_NONE_MATCH=etag).status_code, 302)
+
+        self.client.login(username="user1", password="password1")
+        self.assertEqual(self.client.get("/r/todo", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_shell_is_rebuilt_after_a_new_build(self):
+        etag = self.client.get("/r/login").get("ETag")
+        changed = json.loads(json.dumps(MANIFEST))
+        changed["auth.html"]["file"] = "assets/auth-new999.js"
+        self.write_manifest(changed, mtime=os.path.getmtime(self.manifest_path) + 10)
+
+        response = self.client.get("/r/login", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"assets/auth-new999.js", response.content)
+
+
+class CompressedStaticFilesStorageTest(SimpleTestCase):
+
+    def setUp(self):
+        self.source_dir = tempfile.mkdtemp()
+        self.static_root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.source_dir, "assets"))
+        self.write("assets/index-BcLxC5Ei.js", "console.log('todos');\n" * 200)
+        self.write("assets/tiny-Df3kQ9aZ.js", "export {};\n")
+        self.write("logo.png", "\x89PNG" * 200)
+
+    def tearDown(self):
+        shutil.rmtree(self.source_dir)
+        shutil.rmtree(self.static_root)
+
+    def write(self, name, content):
+        with open(os.path.join(self.source_dir, name), "w") as f:
+            f.write(content)
+
+    def collectstatic(self):
+        with self.settings(STATICFILES_DIRS=[self.source_dir], STATIC_ROOT=self.static_root):
+            call_command("collectstatic", interactive=False, verbosity=0)
+
+    def test_writes_compressed_siblings(self):
+        self.collectstatic()
+        path = os.path.join(self.static_root, "assets", "index-BcLxC5Ei.js")
+        with open(path, "rb") as original, gzip.open(path + ".gz") as compressed:
+            self.assertEqual(compressed.read(), original.read())
+        # Too small to be worth it, or not a compressible type
+        self.assertFalse(os.path.exists(os.path.join(self.static_root, "assets", "tiny-Df3kQ9aZ.js.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.static_root, "logo.png.gz")))
+
+    def test_stale_sibling_is_removed(self):
+        self.collectstatic()
+        self.write("assets/index-BcLxC5Ei.js", "x")
+        future = os.path.getmtime(os.path.join(self.static_root, "assets", "index-BcLxC5Ei.js")) + 10
+        os.utime(os.path.join(self.source_dir, "assets", "index-BcLxC5Ei.js"), (future, future))
+        self.collectstatic()
+        self.assertFalse(os.path.exists(os.path.join(self.static_root, "assets", "index-BcLxC5Ei.js.gz")))
+
+
+class StaticFilesMiddlewareTest(SimpleTestCase):
+
+    BODY = b"console.log('todos');\n" * 200
+
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.static_root, "assets"))
+        self.path = os.path.join(self.static_root, "assets", "index-BcLxC5Ei.js")
+        with open(self.path, "wb") as f:
+            f.write(self.BODY)
+        with open(self.path + ".gz", "wb") as f:
+            f.write(gzip.compress(self.BODY))
+        with open(os.path.join(self.static_root, "robots.txt"), "wb") as f:
+            f.write(b"User-agent: *\n")
+        self.settings_override = override_settings(SERVE_STATIC=True, STATIC_ROOT=self.static_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.static_root)
+
+    def test_serves_precompressed_variant(self):
+        response = self.client.get("/static/assets/index-BcLxC5Ei.js", HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/javascript")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), self.BODY)
+        self.assertNotIn("Content-Disposition", response)
+
+        # Session and auth middleware never ran
+        self.assertNotIn("Cookie", response.get("Vary"))
+
+    def test_identity_when_not_accepted(self):
+        for accept in ("", "gzip;q=0, identity"):
+            response = self.client.get("/static/assets/index-BcLxC5Ei.js", HTTP_ACCEPT_ENCODING=accept)
+            self.assertNotIn("Content-Encoding", response)
+            self.assertEqual(response["Content-Length"], str(len(self.BODY)))
+            self.assertEqual(b"".join(response.streaming_content), self.BODY)
+
+    def test_unhashed_files_are_revalidated(self):
+        response = self.client.get("/static/robots.txt")
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+        self.assertNotIn("Vary", response)
+
+        response = self.client.get("/static/robots.txt", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_only_hashed_files_are_immutable(self):
+        # Looks hashed, but it's Django admin's and changes in place
+        os.makedirs(os.path.join(self.static_root, "admin", "img"))
+        with open(os.path.join(self.static_root, "admin", "img", "icon-calendar.svg"), "wb") as f:
+            f.write(b"<svg/>")
+        response = self.client.get("/static/admin/img/icon-calendar.svg")
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+
+        # Listed in the Vite manifest, outside assets/
+        build_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, build_dir)
+        os.makedirs(os.path.join(build_dir, ".vite"))
+        with open(os.path.join(build_dir, ".vite", "manifest.json"), "w") as f:
+            json.dump({"logo.png": {"file": "img/logo-4f2a9c1e.png", "src": "logo.png"}}, f)
+        os.makedirs(os.path.join(self.static_root, "img"))
+        with open(os.path.join(self.static_root, "img", "logo-4f2a9c1e.png"), "wb") as f:
+            f.write(b"png")
+        with self.settings(FRONTEND_BUILD_DIR=build_dir):
+            response = self.client.get("/static/img/logo-4f2a9c1e.png")
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+
+    def test_etag_differs_per_encoding(self):
+        plain = self.client.get("/static/assets/index-BcLxC5Ei.js")["ETag"]
+        gzipped = self.client.get("/static/assets/index-BcLxC5Ei.js", HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+        self.assertNotEqual(plain, gzipped)
+        response = self.client.get(
+            "/static/assets/index-BcLxC5Ei.js", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=plain
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_range_requests(self):
+        url = "/static/assets/index-BcLxC5Ei.js"
+        response = self.client.get(url, HTTP_RANGE="bytes=22-43", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 22-43/{len(self.BODY)}")
+        self.assertEqual(response["Content-Length"], "22")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(b"".join(response.streaming_content), self.BODY[22:44])
+
+        response = self.client.get(url, HTTP_RANGE="bytes=-10")
+        self.assertEqual(b"".join(response.streaming_content), self.BODY[-10:])
+
+        response = self.client.get(url, HTTP_RANGE=f"bytes={len(self.BODY)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.BODY)}")
+
+        # Outdated If-Range: the whole file instead
+        response = self.client.get(url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_falls_through_for_unknown_paths(self):
+        self.assertEqual(self.client.get("/static/missing.js").status_code, 404)
+        self.assertEqual(self.client.get("/static/../../etc/passwd").status_code, 404)
+        self.assertEqual(self.client.get("/static/assets").status_code, 404)
+
+    def test_disabled(self):
+        with self.settings(SERVE_STATIC=False):
+            self.assertEqual(self.client.get("/static/robots.txt").status_code, 404)
@@ -1,27 +1,31 @@
 from django.contrib import admin
 from django.urls import re_path
-from django.views.generic import TemplateView
 from django.contrib.auth.decorators import login_required
 
+from apps.vite_integration.views import SPAShellView
+
 urlpatterns = [
-    # Public routes for authentication
+    # Public routes for authentication. They get their own, much smaller,
+    # Vite entry (frontend/src/auth.html) instead of the whole dashboard.
     re_path(
         r"^r/login/?$",
-        TemplateView.as_view(template_name="react_base.html")
+        SPAShellView.as_view(entry="auth", dev_module="auth.tsx")
     ),
     re_path(
         r"^r/signup/?$",
-        TemplateView.as_view(template_name="react_base.html")
+        SPAShellView.as_view(entry="auth", dev_module="auth.tsx")
     ),
     
-    # Protected routes that require login
+    # Protected routes that require login. "private" keeps shared caches from
+    # answering for an unauthenticated visitor; browsers revalidate each time,
+    # so login_required is still enforced.
     re_path(
         r"^r/.*$",
-        login_required(TemplateView.as_view(template_name="react_base.html"))
+        login_required(SPAShellView.as_view(cache_control="private, no-cache"))
     ),
     
 ]
 
 admin.site.site_header = "React Ninja Vite"
 admin.site.site_title = "React Ninja Vite Portal"
-admin.site.index_title = "Welcome to the React Ninja Portal" 
\ No newline at end of file
+admin.site.index_title = "Welcome to the React Ninja Portal" 
@@ -0,0 +1,83 @@
+import hashlib
+import threading
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+from django.views import View
+
+from apps.vite_integration.manifest import get_manifest
+
+
+@dataclass(frozen=True)
+class PrerenderedShell:
+    stamp: tuple
+    content: bytes
+    etag: str
+    link: str
+
+
+_shells = {}
+_shells_lock = threading.Lock()
+
+
+def get_shell(template_name, context):
+    """
+    Returns the shell rendered to bytes, re-rendering only when the Vite
+    manifest changes (i.e. after a new frontend build).
+    """
+    manifest = get_manifest()
+    stamp = manifest.stamp
+    key = (template_name, context["vite_entry"])
+    shell = _shells.get(key)
+    if shell is None or shell.stamp != stamp:
+        with _shells_lock:
+            shell = _shells.get(key)
+            if shell is None or shell.stamp != stamp:
+                content = render_to_string(template_name, {**context, "debug": False}).encode()
+                etag = '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+                link = manifest.link_header(context["vite_entry"])
+                shell = _shells[key] = PrerenderedShell(stamp, content, etag, link)
+    return shell
+
+
+class SPAShellView(View):
+    """
+    Serves react_base.html for the /r/ routes.
+
+    With VITE_PRERENDER_SHELL (the default when DEBUG is off) the page is
+    rendered once per frontend build and served from memory with a strong
+    ETag, so most requests end in a 304 without touching the template engine.
+    Otherwise the template is rendered per request, which the Vite dev server
+    integration needs.
+
+    `entry` is the Vite entry point served on the route and `dev_module` the
+    matching source module loaded from the dev server.
+    """
+
+    template_name = "react_base.html"
+    cache_control = "no-cache"
+    entry = "index"
+    dev_module = "main.tsx"
+
+    def get_context_data(self):
+        return {"vite_entry": self.entry, "vite_dev_module": self.dev_module}
+
+    def get(self, request, *args, **kwargs):
+        if not settings.VITE_PRERENDER_SHELL:
+            return render(request, self.template_name, self.get_context_data())
+
+        shell = get_shell(self.template_name, self.get_context_data())
+        response = get_conditional_response(request, etag=shell.etag)
+        if response is None:
+            response = HttpResponse(shell.content, content_type="text/html; charset=utf-8")
+        response["ETag"] = shell.etag
+        response["Cache-Control"] = self.cache_control
+        if settings.VITE_LINK_HEADER and response.status_code == 200:
+            # Lets the browser (or a CDN turning it into 103 Early Hints) start
+            # fetching the bundle before it has parsed the HTML.
+            response["Link"] = shell.link
+        return response
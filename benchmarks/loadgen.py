@@ -0,0 +1,174 @@
+"""
+A small closed-loop HTTP load generator: `concurrency` threads, each with its
+own keep-alive connection, send requests back to back until `requests` have
+been made in total. Standard library only, so it runs anywhere the project
+does.
+
+Being Python, one process tops out at a few thousand requests/sec; for
+servers faster than that, compare relative numbers or use a dedicated tool.
+"""
+import http.client
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+
+@dataclass
+class LoadResult:
+    requests: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    # Seconds, one per successful request
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def rps(self):
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p):
+        """Nearest-rank percentile of the latencies, in milliseconds."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        return ordered[rank - 1] * 1000
+
+    def summary(self):
+        def ms(p):
+            value = self.percentile(p)
+            return None if value is None else round(value, 2)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "elapsed": round(self.elapsed, 3),
+            "rps": round(self.rps, 1),
+            "p50_ms": ms(50),
+            "p95_ms": ms(95),
+            "p99_ms": ms(99),
+            "statuses": self.statuses,
+        }
+
+
+def _connection(base_url, timeout=30):
+    parts = urlsplit(base_url)
+    cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    return cls(parts.hostname, parts.port, timeout=timeout)
+
+
+def login(base_url, username, password):
+    """
+    Logs in through the session login endpoint and returns the headers that
+    authenticate later requests: the session and CSRF cookies, plus the
+    X-CSRFToken header unsafe methods need.
+    """
+    connection = _connection(base_url)
+    body = json.dumps({"username": username, "password": password})
+    connection.request("POST", "/api/v1/auth/login/", body, {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    response.read()
+    if response.status != 200:
+        raise RuntimeError(f"login as {username!r} failed on {base_url}: HTTP {response.status}")
+    cookies = SimpleCookie()
+    for header in response.headers.get_all("Set-Cookie") or []:
+        cookies.load(header)
+    connection.close()
+    headers = {"Cookie": "; ".join(f"{name}={morsel.value}" for name, morsel in cookies.items())}
+    if "csrftoken" in cookies:
+        headers["X-CSRFToken"] = cookies["csrftoken"].value
+    return headers
+
+
+def wait_until_up(base_url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection = _connection(base_url, timeout=1)
+            connection.request("GET", "/api/v1/todos/")
+            connection.getresponse().read()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{base_url} did not come up within {timeout}s")
+            time.sleep(0.2)
+
+
+def run_load(base_url, paths=None, requests=1000, concurrency=10, headers=None, warmup=0, make_request=None, on_response=None):
+    """
+    Sends `requests` requests and returns a LoadResult. By default they are
+    GETs spread over `paths` (round-robin); `make_request(index)` can return
+    (method, path, body) instead. `on_response(index, status, body)` sees
+    every response. The first `warmup` requests of each thread aren't
+    recorded, and are GETs of the first path.
+    """
+    result = LoadResult()
+    lock = threading.Lock()
+    counter = iter(range(requests))
+    headers = dict(headers or {})
+    if make_request is None:
+        def make_request(index):
+            return "GET", paths[index % len(paths)], None
+    warmup_path = paths[0] if paths else make_request(0)[1]
+    # The clock starts once every thread has finished its warmup
+    warmed_up = threading.Barrier(concurrency + 1)
+
+    def next_index():
+        with lock:
+            return next(counter, None)
+
+    def worker(worker_index):
+        connection = _connection(base_url)
+        latencies, statuses, errors = [], {}, 0
+        for _ in range(warmup):
+            try:
+                connection.request("GET", warmup_path, headers=headers)
+                connection.getresponse().read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = _connection(base_url)
+        warmed_up.wait()
+        while (index := next_index()) is not None:
+            method, path, body = make_request(index)
+            request_headers = headers
+            if body is not None:
+                body = json.dumps(body)
+                request_headers = {**headers, "Content-Type": "application/json"}
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body, headers=request_headers)
+                response = connection.getresponse()
+                content = response.read()
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                connection.close()
+                connection = _connection(base_url)
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+            if response.status >= 400:
+                errors += 1
+            if on_response is not None:
+                on_response(index, response.status, content)
+        connection.close()
+        with lock:
+            result.latencies.extend(latencies)
+            result.errors += errors
+            for status, count in statuses.items():
+                result.statuses[status] = result.statuses.get(status, 0) + count
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(worker, i) for i in range(concurrency)]
+        warmed_up.wait()
+        started = time.perf_counter()
+        for future in futures:
+            future.result()
+    result.elapsed = time.perf_counter() - started
+    result.requests = len(result.latencies)
+    return result
@@ -0,0 +1,123 @@
+"""
+Logins/sec per core for each password hasher (apps/users/hashers.py), with
+the cost parameters from the current settings.
+
+In-process, it times verifying a password, which is nearly all of a login's
+CPU, first on one thread (logins/sec per core) and then on --threads
+threads, which shows whether hashing scales across cores:
+
+    python -m benchmarks.login --hashers pbkdf2 scrypt argon2 --threads 4
+
+Against a running server it POSTs /api/v1/auth/login/ instead, e.g. for the
+user the suite seeds (`python -m benchmarks.suite seed`):
+
+    python -m benchmarks.login --base-url http://127.0.0.1:8000 \\
+        --username bench_writes --password bench --server-cores 2
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.loadgen import run_load, wait_until_up
+
+HASHERS = ["pbkdf2", "scrypt", "argon2"]
+
+
+def rate(func, count, threads):
+    """Calls per second of `func`, called `count` times over `threads` threads."""
+    started = time.perf_counter()
+    if threads == 1:
+        for _ in range(count):
+            func()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for future in [pool.submit(func) for _ in range(count)]:
+                future.result()
+    return count / (time.perf_counter() - started)
+
+
+def in_process(args):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "DjTodos.settings")
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+
+    results = []
+    for name in args.hashers:
+        hasher = import_string(settings.PASSWORD_HASHER_CHOICES[name])()
+        if hasher.library:
+            try:
+                hasher._load_library()
+            except ValueError as e:
+                print(f"{name}: skipped ({e})")
+                continue
+        encoded = hasher.encode("correct horse battery staple", hasher.salt())
+        hasher.verify("correct horse battery staple", encoded)  # warm up
+        single = rate(lambda: hasher.verify("correct horse battery staple", encoded), args.count, 1)
+        parallel = rate(lambda: hasher.verify("correct horse battery staple", encoded), args.count * args.threads, args.threads)
+        results.append(
+            {
+                "hasher": name,
+                "params": {k: v for k, v in hasher.decode(encoded).items() if k not in ("hash", "salt", "algorithm")},
+                "ms_per_login": round(1000 / single, 1),
+                "logins_per_sec_per_core": round(single, 1),
+                "threads": args.threads,
+                "logins_per_sec": round(parallel, 1),
+            }
+        )
+
+    print(f"hash workers: {settings.PASSWORD_HASH_WORKERS or 'inline'}, cpus: {os.cpu_count()}")
+    print(f"{'hasher':8} {'ms/login':>9} {'logins/s/core':>14} {'logins/s @' + str(args.threads) + ' threads':>20}  params")
+    for result in results:
+        print(
+            f"{result['hasher']:8} {result['ms_per_login']:>9.1f} {result['logins_per_sec_per_core']:>14.1f} "
+            f"{result['logins_per_sec']:>20.1f}  {result['params']}"
+        )
+    return {"mode": "in-process", "cpus": os.cpu_count(), "results": results}
+
+
+def over_http(args):
+    wait_until_up(args.base_url)
+    body = {"username": args.username, "password": args.password}
+    result = run_load(
+        args.base_url,
+        requests=args.count,
+        concurrency=args.concurrency,
+        make_request=lambda index: ("POST", "/api/v1/auth/login/", body),
+    )
+    summary = result.summary()
+    summary["logins_per_sec_per_core"] = round(result.rps / args.server_cores, 1)
+    print(
+        f"{summary['rps']:.1f} logins/s ({summary['logins_per_sec_per_core']:.1f} per core), "
+        f"p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms, p99 {summary['p99_ms']} ms, "
+        f"statuses {summary['statuses']}"
+    )
+    return {"mode": "http", "base_url": args.base_url, "server_cores": args.server_cores, "results": summary}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hashers", nargs="+", choices=HASHERS, default=HASHERS)
+    parser.add_argument("--count", type=int, default=20, help="Logins per measurement (per thread in-process)")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--base-url", help="Measure logins over HTTP against this server instead")
+    parser.add_argument("--username", default="bench_writes")
+    parser.add_argument("--password", default="bench")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--server-cores", type=int, default=1, help="Cores the server may use, for the per-core rate")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = over_http(args) if args.base_url else in_process(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Micro-benchmark of the todos list serialization: model instances validated
+through TodoSchema and rendered by ninja's JSON encoder (the old list path)
+versus .values() rows encoded by apps.todos.serializers.dumps_page.
+
+    python -m benchmarks.serialization --sizes 1000 10000 100000
+
+Rows are inserted for a throwaway user inside a transaction that is rolled
+back at the end, so any configured database can be used. Times include the
+query, as skipping model instantiation is part of the gain.
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+
+class Rollback(Exception):
+    pass
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--database", default="default")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "DjTodos.settings")
+    import django
+
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.db import transaction
+    from ninja.responses import NinjaJSONEncoder
+
+    from apps.todos import serializers
+    from apps.todos.imports import insert_rows
+    from apps.todos.models import Todo
+    from apps.todos.pagination import Page
+    from apps.todos.schemas import TodoPageSchema
+
+    def schema_path(queryset):
+        page = Page(items=list(queryset), next=None, prev=None)
+        return json.dumps(TodoPageSchema.from_orm(page).dict(), cls=NinjaJSONEncoder).encode()
+
+    def fast_path(queryset):
+        page = Page(items=list(queryset.values(*serializers.TODO_FIELDS)), next=None, prev=None)
+        return serializers.dumps_page(page)
+
+    results = []
+    try:
+        with transaction.atomic(using=args.database):
+            user = User.objects.db_manager(args.database).create_user(username="serialization_benchmark")
+            start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+            inserted = 0
+            for size in sorted(args.sizes):
+                insert_rows(
+                    [
+                        (user.pk, f"Todo {i}", f"Description of todo {i}", i % 2 == 0, start + timedelta(seconds=i, microseconds=i))
+                        for i in range(inserted, size)
+                    ],
+                    using=args.database,
+                )
+                inserted = size
+                queryset = Todo.objects.using(args.database).filter(user=user).order_by("created_at", "id")[:size]
+                if json.loads(schema_path(queryset)) != json.loads(fast_path(queryset)):
+                    raise AssertionError("fast path output differs from TodoPageSchema")
+                schema = best_of(args.repeat, lambda: schema_path(queryset))
+                fast = best_of(args.repeat, lambda: fast_path(queryset))
+                results.append(
+                    {"rows": size, "schema_s": round(schema, 4), "fast_s": round(fast, 4), "speedup": round(schema / fast, 2)}
+                )
+            raise Rollback
+    except Rollback:
+        pass
+
+    encoder = "orjson" if serializers.orjson is not None else "pydantic TypeAdapter"
+    print(f"fast path encoder: {encoder}")
+    print(f"{'rows':>8} {'schema s':>10} {'fast s':>10} {'speedup':>8}")
+    for result in results:
+        print(f"{result['rows']:>8} {result['schema_s']:>10.4f} {result['fast_s']:>10.4f} {result['speedup']:>7.1f}x")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"encoder": encoder, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
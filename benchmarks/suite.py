@@ -0,0 +1,396 @@
+"""
+Load and latency suite for the todos API and the SPA shell. Every scenario
+reports req/s, p50/p95/p99 latency and the number of SQL queries one request
+makes; results are saved as JSON so runs can be compared.
+
+1. Seed the benchmark users (once; re-running only tops them up):
+
+    python -m benchmarks.suite seed --sizes 100 10000 100000
+
+2. Start the server to measure against the same database, with DEBUG=false,
+   e.g. `uwsgi --http :8000 --module DjTodos.wsgi:application --processes 2`
+   or `DB_CONN_MAX_AGE=0 uvicorn DjTodos.asgi:application --port 8000`, then:
+
+    python -m benchmarks.suite run --base-url http://127.0.0.1:8000 --output new.json
+
+3. Compare against an earlier run; exits 1 when something regressed:
+
+    python -m benchmarks.suite compare old.json new.json --threshold 10
+
+Load goes over HTTP. Query counts are measured in this process with the
+Django test client, one request per scenario, so this process must see the
+same settings and database as the server (DB_NAME, DATABASE_URL, ...).
+
+The list scenarios page through a user owning 100/10k/100k todos with a
+different `created_after` per request, so they measure cache misses. Create
+writes to a separate user; update and delete then touch exactly the todos
+that were created, which leaves the seeded data as it was.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.loadgen import login, run_load, wait_until_up
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SIZES = [100, 10000, 100000]
+
+LIST_USERNAME = "bench_rows_{}"
+WRITE_USERNAME = "bench_writes"
+PASSWORD = "bench"
+
+# created_at of the n-th seeded todo is START + n seconds
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "DjTodos.settings")
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.test.utils import setup_test_environment
+
+    # Lets the in-process test client through ALLOWED_HOSTS
+    setup_test_environment(debug=settings.DEBUG)
+
+
+def size_label(size):
+    return f"{size // 1000}k" if size >= 1000 and size % 1000 == 0 else str(size)
+
+
+def created_at(n):
+    return START + timedelta(seconds=n)
+
+
+# Seeding
+
+
+def seed(sizes, batch_size=5000):
+    from django.contrib.auth.models import User
+
+    from apps.todos.cache import invalidate_user_todos
+    from apps.todos.imports import insert_rows
+    from apps.todos.models import Todo
+
+    for username in [LIST_USERNAME.format(size) for size in sizes] + [WRITE_USERNAME]:
+        user, created = User.objects.get_or_create(username=username)
+        if created:
+            user.set_password(PASSWORD)
+            user.save()
+
+    for size in sizes:
+        user = User.objects.get(username=LIST_USERNAME.format(size))
+        existing = Todo.objects.filter(user=user).count()
+        if existing > size:
+            Todo.objects.filter(user=user).delete()
+            existing = 0
+        for offset in range(existing, size, batch_size):
+            insert_rows(
+                [
+                    (user.pk, f"Benchmark todo {n}", f"Seeded row {n} of {size}", n % 2 == 0, created_at(n))
+                    for n in range(offset, min(offset + batch_size, size))
+                ]
+            )
+        if existing != size:
+            invalidate_user_todos(user.pk)
+        print(f"{user.username}: {size} todos ({size - existing} inserted)")
+
+
+# Scenarios
+
+
+class Scenario:
+    """
+    One measured workload. `request(index)` returns (method, path, body)
+    for the index-th request of the run, and `requests` is how many to send
+    (None: whatever --requests says).
+    """
+
+    username = None
+    requests = None
+
+    def __init__(self, name):
+        self.name = name
+
+    def prepare(self):
+        pass
+
+    def request(self, index):
+        raise NotImplementedError
+
+    def on_response(self, index, status, body):
+        pass
+
+
+class ListScenario(Scenario):
+    def __init__(self, size, limit):
+        super().__init__(f"list_{size_label(size)}")
+        self.size = size
+        self.limit = limit
+        self.username = LIST_USERNAME.format(size)
+
+    def request(self, index):
+        # Spread the starting points over the whole table; each one is a
+        # separate cache entry, so the server builds every page.
+        after = created_at((index * 7919) % self.size).isoformat().replace("+00:00", "Z")
+        return "GET", f"/api/v1/todos/?limit={self.limit}&created_after={after}", None
+
+
+class GetScenario(Scenario):
+    def __init__(self, size):
+        super().__init__("get")
+        self.username = LIST_USERNAME.format(size)
+        self.ids = []
+
+    def prepare(self):
+        from apps.todos.models import Todo
+
+        self.ids = list(Todo.objects.filter(user__username=self.username).values_list("id", flat=True))
+        random.Random(1).shuffle(self.ids)
+        if not self.ids:
+            raise RuntimeError(f"{self.username} owns no todos; run `python -m benchmarks.suite seed` first")
+
+    def request(self, index):
+        return "GET", f"/api/v1/todos/{self.ids[index % len(self.ids)]}", None
+
+
+class WriteScenarios:
+    """Create, then update and delete exactly the todos that create made."""
+
+    def __init__(self):
+        self.created_ids = {}
+
+    def scenarios(self):
+        owner = self
+
+        class Create(Scenario):
+            username = WRITE_USERNAME
+
+            def request(self, index):
+                return "POST", "/api/v1/todos/", {"title": f"Benchmark {index}", "description": "Created by the suite"}
+
+            def on_response(self, index, status, body):
+                if status == 200:
+                    owner.created_ids[index] = json.loads(body)["id"]
+
+        class Update(Scenario):
+            username = WRITE_USERNAME
+
+            def prepare(self):
+                # The last id is left for count_queries
+                self.ids = sorted(owner.created_ids.values())
+                self.requests = max(0, len(self.ids) - 1)
+
+            def request(self, index):
+                return "PUT", f"/api/v1/todos/{self.ids[index]}", {
+                    "title": f"Benchmark {index} (updated)",
+                    "description": "Updated by the suite",
+                    "completed": True,
+                }
+
+        class Delete(Update):
+            def request(self, index):
+                return "DELETE", f"/api/v1/todos/{self.ids[index]}", None
+
+        return [Create("create"), Update("update"), Delete("delete")]
+
+
+class ShellScenario(Scenario):
+    def __init__(self, size):
+        super().__init__("shell")
+        self.username = LIST_USERNAME.format(size)
+
+    def request(self, index):
+        return "GET", "/r/todos", None
+
+
+def build_scenarios(sizes, limit):
+    sizes = sorted(sizes)
+    scenarios = [ListScenario(size, limit) for size in sizes]
+    scenarios.append(GetScenario(sizes[-1]))
+    scenarios.extend(WriteScenarios().scenarios())
+    scenarios.append(ShellScenario(sizes[0]))
+    return scenarios
+
+
+def count_queries(scenario, index):
+    """
+    Runs the scenario's index-th request in-process and returns the number
+    of queries and their total time, session and user lookups included.
+    """
+    from django.contrib.auth.models import User
+    from django.db import connections
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    client = Client()
+    client.force_login(User.objects.get(username=scenario.username))
+    method, path, body = scenario.request(index)
+    kwargs = {} if body is None else {"data": json.dumps(body), "content_type": "application/json"}
+    with CaptureQueriesContext(connections["default"]) as queries:
+        response = getattr(client, method.lower())(path, **kwargs)
+    if response.status_code >= 400:
+        raise RuntimeError(f"{scenario.name}: {method} {path} returned {response.status_code} in-process")
+    scenario.on_response(index, response.status_code, response.content)
+    return len(queries), round(sum(float(query["time"]) for query in queries.captured_queries) * 1000, 2)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    from django.conf import settings
+    from django.db import connection
+
+    if settings.DEBUG:
+        print(
+            "warning: DEBUG is on; if the server runs with these settings, it records and logs "
+            "every query and the numbers aren't representative. Set DEBUG=false for both.",
+            file=sys.stderr,
+        )
+    scenarios = [s for s in build_scenarios(args.sizes, args.limit) if not args.only or s.name in args.only]
+    wait_until_up(args.base_url)
+    headers = {}
+    results = {}
+    for scenario in scenarios:
+        scenario.prepare()
+        if scenario.username not in headers:
+            headers[scenario.username] = login(args.base_url, scenario.username, PASSWORD)
+        requests = args.requests if scenario.requests is None else scenario.requests
+        if not requests:
+            print(f"{scenario.name}: nothing to do, skipped")
+            continue
+        # Uses an index the load never reaches, so the request is not cached
+        queries, query_ms = count_queries(scenario, requests)
+        result = run_load(
+            args.base_url,
+            requests=requests,
+            concurrency=args.concurrency,
+            headers=headers[scenario.username],
+            make_request=scenario.request,
+            on_response=scenario.on_response,
+        )
+        summary = result.summary()
+        summary["queries"] = queries
+        summary["query_ms"] = query_ms
+        results[scenario.name] = summary
+
+    print_results(results)
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "limit": args.limit,
+            "database": connection.vendor,
+            "debug": settings.DEBUG,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.output}")
+    return 1 if any(summary["errors"] for summary in results.values()) else 0
+
+
+def print_results(results):
+    print(f"{'':10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'errors':>7}")
+    for name, summary in results.items():
+        queries = "-" if summary["queries"] is None else summary["queries"]
+        print(
+            f"{name:10} {summary['rps']:>9.1f} {summary['p50_ms'] or 0:>9.2f} {summary['p95_ms'] or 0:>9.2f} "
+            f"{summary['p99_ms'] or 0:>9.2f} {queries:>8} {summary['errors']:>7}"
+        )
+
+
+# Comparison
+
+
+def compare_results(old, new, threshold):
+    """
+    Returns a list of regressions of `new` against `old`: req/s down or p95
+    up by more than `threshold` percent, more queries, or new errors.
+    """
+    regressions = []
+    for name, after in new["results"].items():
+        before = old["results"].get(name)
+        if before is None:
+            continue
+        if before["rps"] and after["rps"] < before["rps"] * (1 - threshold / 100):
+            regressions.append(f"{name}: req/s {before['rps']} -> {after['rps']}")
+        if before["p95_ms"] and after["p95_ms"] and after["p95_ms"] > before["p95_ms"] * (1 + threshold / 100):
+            regressions.append(f"{name}: p95 {before['p95_ms']} ms -> {after['p95_ms']} ms")
+        if before.get("queries") is not None and after.get("queries") is not None and after["queries"] > before["queries"]:
+            regressions.append(f"{name}: queries {before['queries']} -> {after['queries']}")
+        if after["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {after['errors']}")
+    return regressions
+
+
+def compare(args):
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    print(f"{'':10} {'req/s old':>9} {'new':>9} {'p95 old':>9} {'new':>9} {'q old':>5} {'new':>4}")
+    for name, after in new["results"].items():
+        before = old["results"].get(name, {})
+        print(
+            f"{name:10} {before.get('rps', '-'):>9} {after['rps']:>9} {before.get('p95_ms', '-'):>9} "
+            f"{after['p95_ms']:>9} {before.get('queries', '-')!s:>5} {after['queries']!s:>4}"
+        )
+    regressions = compare_results(old, new, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Create the benchmark users and their todos")
+    seed_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+
+    run_parser = commands.add_parser("run", help="Run every scenario against a running server")
+    run_parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run_parser.add_argument("--requests", type=int, default=1000, help="Per scenario; update/delete follow create")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--limit", type=int, default=50, help="Page size of the list scenarios")
+    run_parser.add_argument("--only", nargs="+", help="Scenario names to run, e.g. list_10k get shell")
+    run_parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    compare_parser = commands.add_parser("compare", help="Flag regressions between two result files")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change in percent")
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        return compare(args)
+    setup_django()
+    if args.command == "seed":
+        seed(args.sizes)
+        return 0
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
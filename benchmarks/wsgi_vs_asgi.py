@@ -0,0 +1,111 @@
+"""
+Compares the todos API served by uWSGI (DjTodos.wsgi, sync handlers) with
+the same API under uvicorn (DjTodos.asgi, TODOS_ASYNC_API=true): requests/sec
+and p50/p95/p99 latency for the read endpoints.
+
+Either point it at servers you started yourself:
+
+    python -m benchmarks.wsgi_vs_asgi --wsgi-url http://127.0.0.1:8000 \\
+        --asgi-url http://127.0.0.1:8001 --username loadtest_user_0 --password loadtest
+
+or let it start both with the same worker count (needs uwsgi and uvicorn):
+
+    python -m benchmarks.wsgi_vs_asgi --start-servers --workers 2 --threads 8
+
+An ASGI server you start yourself needs DB_CONN_MAX_AGE=0, as --start-servers
+sets: Django doesn't support persistent connections under ASGI.
+
+Seed data first, e.g. `python manage.py create_todos 100000 --users 10`.
+Both servers must use the same database and a shared CACHE_URL, or neither
+should cache (TODOS_CACHE_TIMEOUT=0) -- otherwise one side measures cache hits.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from contextlib import ExitStack
+
+from benchmarks.loadgen import login, run_load, wait_until_up
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PATHS = ["/api/v1/todos/", "/api/v1/todos/?limit=200", "/api/v1/todos/?completed=true"]
+
+
+def start_server(command, env, stack):
+    process = subprocess.Popen(command, cwd=BASE_DIR, env={**os.environ, **env})
+    stack.callback(process.wait)
+    stack.callback(process.terminate)
+    return process
+
+
+def server_commands(args):
+    wsgi = [
+        "uwsgi", "--http", f"127.0.0.1:{args.wsgi_port}", "--module", "DjTodos.wsgi:application",
+        "--master", "--processes", str(args.workers), "--threads", str(args.threads),
+        "--enable-threads", "--disable-logging",
+    ]
+    asgi = [
+        sys.executable, "-m", "uvicorn", "DjTodos.asgi:application", "--port", str(args.asgi_port),
+        "--workers", str(args.workers), "--no-access-log",
+    ]
+    return wsgi, asgi
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wsgi-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--asgi-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--start-servers", action="store_true")
+    parser.add_argument("--wsgi-port", type=int, default=8000)
+    parser.add_argument("--asgi-port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=8, help="uWSGI threads per worker")
+    parser.add_argument("--username", default="loadtest_user_0")
+    parser.add_argument("--password", default="loadtest")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=20, help="Unrecorded requests per client thread")
+    parser.add_argument("--path", action="append", dest="paths", help="Repeatable; defaults to list endpoints")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or DEFAULT_PATHS
+    targets = {"wsgi": args.wsgi_url, "asgi": args.asgi_url}
+
+    with ExitStack() as stack:
+        if args.start_servers:
+            wsgi, asgi = server_commands(args)
+            targets = {"wsgi": f"http://127.0.0.1:{args.wsgi_port}", "asgi": f"http://127.0.0.1:{args.asgi_port}"}
+            common = {"DJANGO_SETTINGS_MODULE": "DjTodos.settings", "LOG_MODE": "production"}
+            start_server(wsgi, {**common, "TODOS_ASYNC_API": "false"}, stack)
+            # Django doesn't support persistent connections under ASGI
+            start_server(asgi, {**common, "TODOS_ASYNC_API": "true", "DB_CONN_MAX_AGE": "0"}, stack)
+
+        results = {}
+        for name, url in targets.items():
+            wait_until_up(url)
+            result = run_load(
+                url, paths, requests=args.requests, concurrency=args.concurrency,
+                headers=login(url, args.username, args.password), warmup=args.warmup,
+            )
+            results[name] = result.summary()
+
+    print(f"{'':6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, summary in results.items():
+        print(
+            f"{name:6} {summary['rps']:>9.1f} {summary['p50_ms'] or 0:>9.2f} "
+            f"{summary['p95_ms'] or 0:>9.2f} {summary['p99_ms'] or 0:>9.2f} {summary['errors']:>7}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"paths": paths, "concurrency": args.concurrency, "workers": args.workers, "results": results},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import { lazy, Suspense, useEffect } from 'react';
+import { createBrowserRouter, RouterProvider, useLocation } from 'react-router-dom';
+import { frontEndURL } from './lib/constants';
+import LoadingLayout from './pages/Auth/LoadingLayout';
+import { SnackbarProvider } from './context/SnackbarContext';
+
+const Login = lazy(() => import('./pages/Auth/Login'));
+const Signup = lazy(() => import('./pages/Auth/Signup'));
+
+// Any other route belongs to the main entry: leave this bundle with a full
+// page load instead of a client-side navigation.
+const MainAppRedirect = () => {
+    const location = useLocation();
+
+    useEffect(() => {
+        const path = `${frontEndURL}${location.pathname.replace(/^\//, '')}`;
+        window.location.replace(`${path}${location.search}${location.hash}`);
+    }, [location]);
+
+    return <LoadingLayout />;
+};
+
+const router = createBrowserRouter(
+    [
+        {
+            path: "/login",
+            element: (
+                <Suspense fallback={<LoadingLayout />}>
+                    <SnackbarProvider>
+                        <Login />
+                    </SnackbarProvider>
+                </Suspense>
+            ),
+        },
+        {
+            path: "/signup",
+            element: (
+                <Suspense fallback={<LoadingLayout />}>
+                    <SnackbarProvider>
+                        <Signup />
+                    </SnackbarProvider>
+                </Suspense>
+            ),
+        },
+        {
+            path: "*",
+            element: <MainAppRedirect />,
+        },
+    ],
+    {
+        basename: frontEndURL,
+    }
+);
+
+const AuthApp = () => {
+    return <RouterProvider router={router} />;
+};
+
+export default AuthApp;
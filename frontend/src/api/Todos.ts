@@ -1,10 +1,44 @@
 import { useAxios } from "@/lib/axios";
 import { BaseURL } from "@/lib/constants";
 
-export const fetchTodos = async () => {
-    const url = `${BaseURL}/api/v1/todo/`;
-    const response = await useAxios.get(url);
-    return response;
+// The list endpoint returns one cursor page at a time: pass `next` or `prev`
+// of the page on screen as `cursor` to move forward or back.
+export interface TodoPage<T> {
+    items: T[];
+    next: string | null;
+    prev: string | null;
+}
+
+// Filtering and sorting happen on the server too: `ordering` is one of
+// created_at, title (prefixed with "-" for descending), `q` a search query.
+export interface TodoQuery {
+    ordering?: string;
+    completed?: boolean;
+    q?: string;
+}
+
+export interface TodoPageParams extends TodoQuery {
+    limit: number;
+    cursor?: string | null;
+}
+
+export const fetchTodos = async <T>({ limit, cursor, ordering, completed, q }: TodoPageParams) => {
+    const url = `${BaseURL}/api/v1/todos/`;
+    const params: Record<string, string | number | boolean> = { limit };
+    if (cursor) {
+        params.cursor = cursor;
+    }
+    if (ordering) {
+        params.ordering = ordering;
+    }
+    if (completed !== undefined) {
+        params.completed = completed;
+    }
+    if (q) {
+        params.q = q;
+    }
+    const response = await useAxios.get<TodoPage<T>>(url, { params });
+    return response.data;
 };
 
 interface TodoDataType {
@@ -22,7 +56,7 @@ export const updateTodo = async (
     row: TodoDataType & { id: number; completed: boolean }
 ) => {
     const url = `${BaseURL}/api/v1/todo/${row.id}/`;
-    const response = await useAxios.put(url, row);
+    const response = await useAxios.patch(url, row);
     return response;
 };
 
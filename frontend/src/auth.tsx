@@ -0,0 +1,18 @@
+import React from "react";
+import ReactDOM from "react-dom/client";
+import AuthApp from "./AuthApp.tsx";
+
+import { QueryClientProvider, QueryClient } from "@tanstack/react-query";
+
+// Entry point for the public login/signup pages. It ships only what those
+// pages need; the dashboard, todo grid and charts live in the main entry.
+
+const queryClient = new QueryClient();
+
+ReactDOM.createRoot(document.getElementById("root")!).render(
+    <React.StrictMode>
+        <QueryClientProvider client={queryClient}>
+            <AuthApp />
+        </QueryClientProvider>
+    </React.StrictMode>
+);
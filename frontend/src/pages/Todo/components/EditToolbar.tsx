@@ -1,3 +1,4 @@
+import Box from "@mui/material/Box";
 import Button from "@mui/material/Button";
 import AddIcon from "@mui/icons-material/Add";
 import {
@@ -5,6 +6,8 @@ import {
     GridRowModesModel,
     GridRowModes,
     GridToolbarContainer,
+    GridToolbarFilterButton,
+    GridToolbarQuickFilter,
 } from "@mui/x-data-grid";
 import { randomId } from "@mui/x-data-grid-generator";
 
@@ -46,6 +49,9 @@ export default function EditToolbar(props: EditToolbarProps) {
             >
                 Add Todo
             </Button>
+            <GridToolbarFilterButton />
+            <Box sx={{ flexGrow: 1 }} />
+            <GridToolbarQuickFilter />
         </GridToolbarContainer>
     );
 }
@@ -27,13 +27,23 @@ export const TodoColumns = ({
     handleDeleteClick,
 }: TodoColumnsProps): GridColDef[] => {
     return [
-        { field: "id", headerName: "ID", flex: 1, minWidth: 70 },
+        // Only title and created_at can be ordered by, and only completed
+        // filtered on, by the server (the quick filter searches the text).
+        {
+            field: "id",
+            headerName: "ID",
+            flex: 1,
+            minWidth: 70,
+            sortable: false,
+            filterable: false,
+        },
         {
             field: "title",
             headerName: "Title",
             flex: 2,
             minWidth: 150,
             editable: true,
+            filterable: false,
         },
         {
             field: "description",
@@ -41,6 +51,8 @@ export const TodoColumns = ({
             flex: 3,
             minWidth: 330,
             editable: true,
+            sortable: false,
+            filterable: false,
         },
         {
             field: "created_at",
@@ -48,6 +60,7 @@ export const TodoColumns = ({
             type: "dateTime",
             flex: 2,
             minWidth: 160,
+            filterable: false,
             valueGetter: (value) => new Date(value),
             valueFormatter: (value) =>
                 dayjs(value).format("DD/MM/YYYY hh:mm A"),
@@ -59,6 +72,7 @@ export const TodoColumns = ({
             flex: 1,
             minWidth: 100,
             editable: true,
+            sortable: false,
         },
         {
             field: "actions",
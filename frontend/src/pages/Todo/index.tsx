@@ -5,12 +5,13 @@ import {
     GridRowModes,
     DataGrid, GridEventListener,
     GridRowId, GridRowEditStopReasons,
-    GridSlots
+    GridSlots, GridPaginationModel,
+    GridSortModel, GridFilterModel
 } from "@mui/x-data-grid";
 
-import { useQuery } from "@tanstack/react-query";
+import { keepPreviousData, useQuery } from "@tanstack/react-query";
 
-import { fetchTodos } from "@/api/Todos";
+import { fetchTodos, TodoQuery } from "@/api/Todos";
 import { useTodoMutations } from "@/pages/Todo/Hooks/useTodos";
 import Loading from "@/components/Loading";
 import EditToolbar from "@/pages/Todo/components/EditToolbar";
@@ -27,23 +28,93 @@ interface Todo {
 
 type NewTodo = Todo & { isNew?: boolean };
 
+const PAGE_SIZES = [25, 50, 100];
+
+// Columns the list endpoint can order by
+const SORTABLE_FIELDS = ["created_at", "title"];
+
+const toOrdering = (sortModel: GridSortModel) => {
+    const sort = sortModel.find((item) => SORTABLE_FIELDS.includes(item.field));
+    if (!sort || !sort.sort) return undefined;
+    return `${sort.sort === "desc" ? "-" : ""}${sort.field}`;
+};
+
+const toFilters = (filterModel: GridFilterModel) => {
+    const filters: Pick<TodoQuery, "completed" | "q"> = {};
+    const completed = filterModel.items.find(
+        (item) => item.field === "completed" && item.operator === "is"
+    );
+    // The boolean filter holds "true"/"false", or nothing for "any"
+    if (completed?.value !== undefined && completed.value !== "") {
+        filters.completed = String(completed.value) === "true";
+    }
+    const q = (filterModel.quickFilterValues ?? []).join(" ").trim();
+    if (q) {
+        filters.q = q;
+    }
+    return filters;
+};
+
 export default function Todo() {
     const [rows, setRows] = React.useState<Todo[]>([]);
     const [rowModesModel, setRowModesModel] = React.useState<GridRowModesModel>({});
     const { createTodoMutation, deleteTodoMutation, updateTodoMutation } = useTodoMutations();
 
+    // The server pages by cursor, so the grid only moves one page at a time,
+    // following the `next`/`prev` cursors of the page on screen.
+    const [paginationModel, setPaginationModel] = React.useState<GridPaginationModel>({
+        page: 0,
+        pageSize: 50,
+    });
+    const [cursor, setCursor] = React.useState<string | null>(null);
+    const [sortModel, setSortModel] = React.useState<GridSortModel>([]);
+    const [filterModel, setFilterModel] = React.useState<GridFilterModel>({ items: [] });
+
+    const query: TodoQuery = { ordering: toOrdering(sortModel), ...toFilters(filterModel) };
     const { data, isLoading, isError } = useQuery({
-        queryKey: ["todos"],
-        queryFn: fetchTodos,
+        queryKey: ["todos", { ...query, cursor, limit: paginationModel.pageSize }],
+        queryFn: () => fetchTodos<Todo>({ ...query, cursor, limit: paginationModel.pageSize }),
+        placeholderData: keepPreviousData,
     });
 
 
     React.useEffect(() => {
         if (data) {
-            setRows(data.data);
+            setRows(data.items);
         }
     }, [data]);
 
+    const handlePaginationModelChange = (model: GridPaginationModel) => {
+        if (model.pageSize !== paginationModel.pageSize || model.page === 0) {
+            setCursor(null);
+            model = { ...model, page: 0 };
+        } else if (model.page === paginationModel.page + 1 && data?.next) {
+            setCursor(data.next);
+        } else if (model.page === paginationModel.page - 1 && data?.prev) {
+            setCursor(data.prev);
+        } else {
+            return;
+        }
+        setPaginationModel(model);
+    };
+
+    // Cursors are only valid for the query they came from, so a new order or
+    // filter starts again from the first page.
+    const resetToFirstPage = () => {
+        setCursor(null);
+        setPaginationModel((model) => ({ ...model, page: 0 }));
+    };
+
+    const handleSortModelChange = (model: GridSortModel) => {
+        setSortModel(model);
+        resetToFirstPage();
+    };
+
+    const handleFilterModelChange = (model: GridFilterModel) => {
+        setFilterModel(model);
+        resetToFirstPage();
+    };
+
 
     const handleRowEditStop: GridEventListener<"rowEditStop"> = (
         params,
@@ -138,6 +209,19 @@ export default function Todo() {
                     onRowModesModelChange={handleRowModesModelChange}
                     onRowEditStop={handleRowEditStop}
                     processRowUpdate={processRowUpdate}
+                    paginationMode="server"
+                    paginationModel={paginationModel}
+                    onPaginationModelChange={handlePaginationModelChange}
+                    pageSizeOptions={PAGE_SIZES}
+                    // The total isn't known, only whether there is a next page
+                    rowCount={-1}
+                    paginationMeta={{ hasNextPage: Boolean(data?.next) }}
+                    sortingMode="server"
+                    sortModel={sortModel}
+                    onSortModelChange={handleSortModelChange}
+                    filterMode="server"
+                    filterModel={filterModel}
+                    onFilterModelChange={handleFilterModelChange}
                     slots={{
                         toolbar: EditToolbar as GridSlots["toolbar"],
                     }}
@@ -21,6 +21,14 @@ export default defineConfig({
         manifest: true,
         outDir: "../dist",
         emptyOutDir: true,
+        rollupOptions: {
+            // Separate entries so the public auth pages don't download the
+            // dashboard. Django picks one per route, see apps/vite_integration/urls.py
+            input: {
+                index: path.resolve(__dirname, "src/index.html"),
+                auth: path.resolve(__dirname, "src/auth.html"),
+            },
+        },
     },
     base: process.env.NODE_ENV === "production" ? "/static/" : "/",
     test: {